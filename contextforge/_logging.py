@@ -26,6 +26,9 @@ class NoopLogger:
 
     info = warning = error = exception = critical = debug
 
+    def isEnabledFor(self, level: int) -> bool:  # noqa: N802 - mirrors logging.Logger
+        return False
+
 
 def _ensure_default_handler(lg: logging.Logger) -> None:
     # Let logs bubble to the root so pytest's caplog can capture them.
@@ -56,3 +59,12 @@ def resolve_logger(
         _ensure_default_handler(lg)
         return lg
     return NoopLogger()
+
+
+def debug_enabled(log: object) -> bool:
+    """
+    True if *log* would emit DEBUG records. Use it to skip building expensive
+    debug-only output. Duck-typed loggers without isEnabledFor count as enabled.
+    """
+    is_enabled = getattr(log, "isEnabledFor", None)
+    return True if is_enabled is None else bool(is_enabled(logging.DEBUG))
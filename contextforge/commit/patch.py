@@ -1,21 +1,136 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Iterator, List
 import itertools
 import difflib
 import logging
 import re
+import sys
 import unicodedata
 
 
-from .._logging import resolve_logger
+from .._logging import debug_enabled, resolve_logger
 from ..errors.patch import PatchFailedError
 
+try:
+    from rapidfuzz.distance import Indel as _rf_indel
+except ImportError:
+    _rf_indel = None
+
 __all__ = ["patch_text", "fuzzy_patch_partial"]
 
 
 # ---------- core helpers ----------
 
+# Lines at or above this length are left un-interned; they are rarely repeated
+# and interning them would only grow the interpreter's string table.
+_INTERN_MAX_LEN = 256
+
+
+def _intern_line(line: str) -> str:
+    """Intern short lines so repeated equality checks hit the identity fast path."""
+    return sys.intern(line) if len(line) < _INTERN_MAX_LEN else line
+
+
+def _intern_lines(lines: list[str]) -> list[str]:
+    """Intern every short line of *lines* (see _intern_line)."""
+    return [_intern_line(ln) for ln in lines]
+
+
+def _line_ids(lines: list[str], ids: dict[str, int]) -> list[int]:
+    """
+    Map lines to small integer ids, numbering unseen lines as they appear. Sequences
+    built from one shared *ids* table compare equal exactly when their lines do, so
+    scorers can work on ints instead of re-comparing strings.
+    """
+    return [ids.setdefault(ln, len(ids)) for ln in lines]
+
+
+def _split_keepends(content: str) -> tuple[list[str], list[str]]:
+    """
+    Split *content* into bare lines (for matching) and the original line terminators,
+    so the patched text can be re-emitted with a single join.
+    """
+    bare = content.splitlines()
+    kept = content.splitlines(keepends=True)
+    terms = [k[len(b) :] for k, b in zip(kept, bare)]
+    return bare, terms
+
+
+def _splice_terminators(terms: list[str], start: int, end: int, count: int, eol: str) -> None:
+    """
+    Replace terms[start:end] in place with *count* terminators borrowed from the first
+    replaced line.
+    """
+    term = terms[start] if start < len(terms) and terms[start] else eol
+    terms[start:end] = [term] * count
+
+
+def _detect_eol(s: str) -> str:
+    """
+    Line ending of *s*: CRLF if it contains any, else CR if it contains any, else LF.
+    LF-only text (the common case) is settled by a single scan for "\r".
+    """
+    if "\r" not in s:
+        return "\n"
+    return "\r\n" if "\r\n" in s else "\r"
+
+
+def _join_keepends(lines: list[str], terms: list[str], eol: str, had_trailing_nl: bool) -> str:
+    """Join bare lines with their terminators, fixing up the final line's terminator."""
+    if not lines:
+        return eol if had_trailing_nl else ""
+    if had_trailing_nl:
+        if not terms[-1]:
+            terms[-1] = eol
+    else:
+        # Only the original last line lacks a terminator; if hunks added lines after it,
+        # give it one and move the "no trailing newline" onto the new last line.
+        try:
+            bare_idx = terms.index("")
+        except ValueError:
+            bare_idx = -1
+        if 0 <= bare_idx < len(terms) - 1:
+            terms[bare_idx] = eol
+        terms[-1] = ""
+    return "".join(itertools.chain.from_iterable(zip(lines, terms)))
+
+
+def _apply_locations(
+    lines: list[str], terms: list[str], locations: list[dict], eol: str
+) -> tuple[list[str], list[str]]:
+    """
+    Apply placed hunks (sorted bottom-to-top, failed ones excluded) to *lines* and their
+    terminators. Disjoint edits are stitched together in one forward pass over the
+    original, so untouched stretches are copied once instead of shifted per hunk;
+    overlapping edits fall back to splicing bottom-to-top.
+    """
+    out_lines: list[str] = []
+    out_terms: list[str] = []
+    cursor = 0
+    for loc in reversed(locations):
+        start, end = loc["start_idx"], loc["end_idx"]
+        if start < cursor:
+            break
+        repl = loc["replacement_lines"]
+        out_lines += lines[cursor:start]
+        out_terms += terms[cursor:start]
+        out_lines += repl
+        out_terms += [terms[start] if start < len(terms) and terms[start] else eol] * len(repl)
+        cursor = max(start, end)
+    else:
+        out_lines += lines[cursor:]
+        out_terms += terms[cursor:]
+        return out_lines, out_terms
+
+    out_lines, out_terms = lines[:], terms[:]
+    for loc in locations:
+        out_lines[loc["start_idx"] : loc["end_idx"]] = loc["replacement_lines"]
+        _splice_terminators(
+            out_terms, loc["start_idx"], loc["end_idx"], len(loc["replacement_lines"]), eol
+        )
+    return out_lines, out_terms
+
 
 def _find_best_match_window(
     target_lines: list[str],
@@ -49,7 +164,7 @@ def _find_best_match_window(
     # Slide window over target
     for i in range(n - m + 1):
         window = target_normalized[i : i + m]
-        ratio = difflib.SequenceMatcher(None, search_normalized, window, autojunk=False).ratio()
+        ratio = _seq_ratio(search_normalized, window, max(best_ratio, 0.0))
 
         if ratio > best_ratio:
             best_ratio = ratio
@@ -117,17 +232,15 @@ def _eq_loose(a: str, b: str) -> bool:
     return a_no_semi == b_no_semi
 
 
+def _loose_key(s: str) -> str:
+    """Canonical form for _eq_loose: _eq_loose(a, b) == (_loose_key(a) == _loose_key(b))."""
+    return s.strip().rstrip(";")
+
+
 def _indent(s: str) -> int:
     """Count leading spaces/tabs as indentation depth (tabs count as 4)."""
-    spaces = 0
-    for ch in s:
-        if ch == " ":
-            spaces += 1
-        elif ch == "\t":
-            spaces += 4
-        else:
-            break
-    return spaces
+    width = len(s) - len(s.lstrip(" \t"))
+    return width + 3 * s.count("\t", 0, width)
 
 
 def _flatten_ws_outside_quotes(text: str) -> str:
@@ -218,13 +331,9 @@ def _flatten_ws_outside_quotes(text: str) -> str:
     return "".join(out)
 
 
-_LEADING_WS_RE = re.compile(r"^[\t ]*")
-
-
 def _leading_ws(s: str) -> str:
     """Return the exact leading whitespace (tabs/spaces)."""
-    m = _LEADING_WS_RE.match(s)
-    return m.group(0) if m else ""
+    return s[: len(s) - len(s.lstrip(" \t"))]
 
 
 def _normalize_quotes(s: str) -> str:
@@ -241,13 +350,38 @@ def _normalize_quotes(s: str) -> str:
     return "".join(tbl.get(ch, ch) for ch in s)
 
 
-def _similarity(a_lines: list[str], b_lines: list[str]) -> float:
+def _seq_ratio(a, b, cutoff: float = 0.0) -> float:
+    """
+    difflib.SequenceMatcher ratio in [0, 1] of two sequences (strings or lists of lines).
+    Returns 0.0 as soon as the ratio is known to fall below *cutoff*, so callers that
+    only keep scores at or above a threshold skip the full comparison for poor windows.
+
+    With RapidFuzz installed, its C Indel similarity (2 * LCS / total length) rejects
+    windows first. difflib's matching blocks form a common subsequence, so the Indel
+    score is never below ratio(); the scores themselves always come from difflib.
+    """
+    # Compare here, with slack for rounding: RapidFuzz's score_cutoff can reject a
+    # score equal to the cutoff, and its float may differ from difflib's by an ulp.
+    if (
+        cutoff > 0.0
+        and _rf_indel is not None
+        and _rf_indel.normalized_similarity(a, b) < cutoff - 1e-9
+    ):
+        return 0.0
+    sm = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    if cutoff > 0.0 and (sm.real_quick_ratio() < cutoff or sm.quick_ratio() < cutoff):
+        return 0.0
+    return sm.ratio()
+
+
+def _similarity(a_lines: list[str], b_lines: list[str], cutoff: float = 0.0) -> float:
     """
     Line-wise similarity using SequenceMatcher on trimmed, quote-normalized lines.
+    Scores below *cutoff* may be reported as 0.0 (see _seq_ratio).
     """
     a = [_normalize_quotes(x.strip()) for x in a_lines]
     b = [_normalize_quotes(x.strip()) for x in b_lines]
-    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+    return _seq_ratio(a, b, cutoff)
 
 
 _NUMBAR_RE = re.compile(r"^\s*\d+\s*\|\s?")
@@ -362,20 +496,32 @@ def _middle_out_best_window(
         for pos in [mid] if d == 0 else [mid - d, mid + d]:
             if pos < lo or pos > hi - m:
                 continue
-            ratio = _similarity(needle[:m], target[pos : pos + m])
+            ratio = _similarity(needle[:m], target[pos : pos + m], max(best_ratio, 0.0))
             if ratio > best_ratio:
                 best_idx, best_ratio = pos, ratio
     return best_idx, best_ratio
 
 
+def _wanted_indent(new_content: list[str], lead_ctx: list[str]) -> int:
+    """Indentation a hunk expects at its insertion point (see _structure_penalty)."""
+    # Prefer the indentation of the incoming content if available; fall back to lead context.
+    return _indent(new_content[0]) if new_content else (_indent(lead_ctx[-1]) if lead_ctx else 0)
+
+
 def _structure_penalty(
-    target: list[str], pos: int, new_content: list[str], lead_ctx: list[str]
+    target: list[str],
+    pos: int,
+    new_content: list[str],
+    lead_ctx: list[str],
+    want_indent: int | None = None,
 ) -> int:
-    """Lower is better. Penalize positions whose indentation resembles context poorly."""
-    # Prefer the indentation of the incoming content if available; fall back to lead context.
-    want_indent = (
-        _indent(new_content[0]) if new_content else (_indent(lead_ctx[-1]) if lead_ctx else 0)
-    )
+    """
+    Lower is better. Penalize positions whose indentation resembles context poorly.
+    Callers scoring many positions for one hunk can pass *want_indent* precomputed
+    with _wanted_indent.
+    """
+    if want_indent is None:
+        want_indent = _wanted_indent(new_content, lead_ctx)
     have_indent = _indent(target[pos - 1]) if pos > 0 else 0
     indent_pen = abs(want_indent - have_indent)
     return min(indent_pen, 8)
@@ -398,36 +544,45 @@ def _split_lead_tail_context(hunk_lines: list[str]) -> tuple[list[str], list[str
     return lead, tail
 
 
-def _parse_patch_hunks(patch_str: str) -> list[dict]:
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_STANDARD_HUNK_RE = re.compile(r"^@@\s+-\d+(?:,\d+)?\s+\+\d+(?:,\d+)?\s+@@", re.MULTILINE)
+_DIFF_SIGNATURE_RE = re.compile(
+    r"^(?:diff --git |index [0-9a-f]+\.\.[0-9a-f]+|new file mode |deleted file mode |--- (?:a/|/dev/null)|\+\+\+ (?:b/|/dev/null))",
+    re.MULTILINE,
+)
+
+
+def _iter_patch_hunks(patch_str: str) -> Iterator[dict]:
     """
-    Parse patch string into hunks. Keep header fields and include valid hunk lines.
-    Also accept raw empty lines inside hunks (treat as context).
+    Single pass over *patch_str* yielding each hunk as soon as the next '@@' header
+    (or the end of the patch) closes it. Only the hunk being built is held open.
     """
-    hunks: list[dict] = []
-    hunk_header_re = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
     cur = None
-    for raw in patch_str.splitlines():
-        line = raw.rstrip("\r\n")
-        m = hunk_header_re.match(line.strip())
+    for line in patch_str.splitlines():
+        m = _HUNK_HEADER_RE.match(line.strip()) if "@@" in line else None
         if m:
             if cur:
-                hunks.append(cur)
-            old_start = int(m.group(1))
-            old_len = int(m.group(2) or "1")
-            new_start = int(m.group(3))
-            new_len = int(m.group(4) or "1")
+                yield cur
             cur = {
-                "old_start": old_start,
-                "old_len": old_len,
-                "new_start": new_start,
-                "new_len": new_len,
+                "old_start": int(m.group(1)),
+                "old_len": int(m.group(2) or "1"),
+                "new_start": int(m.group(3)),
+                "new_len": int(m.group(4) or "1"),
                 "lines": [],
             }
             continue
         if cur is not None and (line == "" or line[:1] in (" ", "+", "-")):
-            cur["lines"].append(line)
+            cur["lines"].append(_intern_line(line))
     if cur:
-        hunks.append(cur)
+        yield cur
+
+
+def _parse_patch_hunks(patch_str: str) -> list[dict]:
+    """
+    Parse patch string into hunks. Keep header fields and include valid hunk lines.
+    Also accept raw empty lines inside hunks (treat as context).
+    """
+    hunks = list(_iter_patch_hunks(patch_str))
     if not hunks:
         raise PatchFailedError("Patch string contains no valid hunks.")
     return hunks
@@ -457,11 +612,9 @@ def _parse_simplified_patch_hunks(patch_str: str) -> list[dict]:
             start_idx = i
             break
 
-    # Process the lines after headers
-    lines = lines[start_idx:]
-
-    for line in lines:
-        if line.strip() == "@@":
+    # Process the lines after headers (interned, as in _iter_patch_hunks)
+    for line in itertools.islice(lines, start_idx, None):
+        if "@@" in line and line.strip() == "@@":
             if current_hunk_lines:
                 hunks.append({"lines": current_hunk_lines})
                 current_hunk_lines = []
@@ -470,7 +623,7 @@ def _parse_simplified_patch_hunks(patch_str: str) -> list[dict]:
                 line[:1] in (" ", "+", "-")
                 and not (line.startswith("--- ") or line.startswith("+++ "))
             ):
-                current_hunk_lines.append(line)
+                current_hunk_lines.append(_intern_line(line))
 
     if current_hunk_lines:
         hunks.append({"lines": current_hunk_lines})
@@ -594,26 +747,61 @@ def _split_noncontiguous_hunks(hunks: list[dict]) -> list[dict]:
     return split_hunks
 
 
-def _find_block_matches(target: list[str], block: list[str], loose: bool = False) -> list[int]:
-    """Find all start indices where block appears in target."""
+def _build_line_index(lines: list[str]) -> dict[str, list[int]]:
+    """Map each distinct line to the ascending indices where it occurs."""
+    index: dict[str, list[int]] = {}
+    for i, ln in enumerate(lines):
+        index.setdefault(ln, []).append(i)
+    return index
+
+
+def _find_block_matches(
+    target: list[str],
+    block: list[str],
+    loose: bool = False,
+    line_index: dict[str, list[int]] | None = None,
+) -> list[int]:
+    """
+    Find all start indices where block appears in target.
+    For exact matching, *line_index* (from _build_line_index over *target*) lets the
+    search start from the block's rarest line instead of scanning the target.
+    Loose matching compares _loose_key forms with the same exact search.
+    """
     matches: list[int] = []
     m = len(block)
     if m == 0:
         return matches
     n = len(target)
-    for i in range(n - m + 1):
-        ok = True
-        for j in range(m):
-            if loose:
-                if not _eq_loose(target[i + j], block[j]):
-                    ok = False
-                    break
-            else:
-                if target[i + j] != block[j]:
-                    ok = False
-                    break
-        if ok:
+    if loose:
+        target = [_loose_key(x) for x in target]
+        block = [_loose_key(x) for x in block]
+        line_index = None
+    if line_index is not None:
+        best_j, best_hits = 0, None
+        for j, ln in enumerate(block):
+            hits = line_index.get(ln)
+            if not hits:
+                return matches
+            if best_hits is None or len(hits) < len(best_hits):
+                best_j, best_hits = j, hits
+        for p in best_hits:
+            i = p - best_j
+            if 0 <= i <= n - m and target[i : i + m] == block:
+                matches.append(i)
+        return matches
+    # Jump between occurrences of the first line with list.index and compare the
+    # whole window as one C-level slice comparison.
+    first = block[0]
+    last_start = n - m
+    i = 0
+    while i <= last_start:
+        try:
+            i = target.index(first, i, last_start + 1)
+        except ValueError:
+            break
+        if target[i : i + m] == block:
             matches.append(i)
+        i += 1
     return matches
 
 
@@ -632,15 +820,15 @@ def _split_hunk_components(hunk_lines: list[str]) -> tuple[list[str], list[str],
             continue
         tag = line[0]
         if tag == " ":
-            content = line[1:]
+            content = _intern_line(line[1:])
             old_content.append(content)
             new_content.append(content)
             context_only.append(content)
         elif tag == "-":
-            content = line[1:]
+            content = _intern_line(line[1:])
             old_content.append(content)
         elif tag == "+":
-            content = line[1:]
+            content = _intern_line(line[1:])
             new_content.append(content)
         else:
             # ignore unknown tags
@@ -649,6 +837,19 @@ def _split_hunk_components(hunk_lines: list[str]) -> tuple[list[str], list[str],
     return old_content, new_content, context_only
 
 
+def _hunk_components(hunk: dict) -> tuple[list[str], list[str], list[str]]:
+    """
+    Return _split_hunk_components(hunk["lines"]), memoized on the hunk dict itself.
+    A hunk is searched in phase 1, possibly again during refinement, and once more
+    when building conflicts or failure reports; the split only needs to happen once.
+    """
+    comp = hunk.get("_components")
+    if comp is None:
+        comp = _split_hunk_components(hunk["lines"])
+        hunk["_components"] = comp
+    return comp
+
+
 def _adaptive_ctx_window(lead_ctx: list[str], tail_ctx: list[str]) -> int:
     """Pick a context slice size based on available context."""
     # Use all available context to ensure precision, falling back to 3 lines minimum
@@ -712,6 +913,20 @@ def _locate_insertion_index(
     return max(0, min(start_hint, n))
 
 
+def _header_hints(hunks: list[dict], n: int) -> list[int | None]:
+    """
+    Start-line hint for each hunk from its '@@' header (new_start, 0-based, clamped to
+    the target's *n* lines), or None for headerless hunks. Computed once per patch.
+    """
+    hints: list[int | None] = []
+    for h in hunks:
+        if h.get("new_start"):
+            hints.append(min(n, max(0, int(h["new_start"]) - 1)))
+        else:
+            hints.append(None)
+    return hints
+
+
 # ---------- Finding ALL candidates for a hunk ----------
 
 
@@ -724,41 +939,64 @@ def _find_all_hunk_candidates(
     search_max: int,
     log: logging.Logger,
     max_candidates: int = 10,
+    line_index: dict[str, list[int]] | None = None,
 ) -> list[dict]:
     """
     Find ALL candidate locations where a hunk could be applied.
     Only searches between [search_min, search_max].
+    *line_index* is an optional _build_line_index over target_lines, shared across hunks.
     Returns a list of dicts sorted by quality, each with:
       start_idx, end_idx, replacement_lines, match_type, confidence
     Returns empty list if no acceptable match is found.
     """
-    old_content, new_content, context_only = _split_hunk_components(hunk["lines"])
-    lead_ctx, tail_ctx = _split_lead_tail_context(hunk["lines"])
+    hunk_lines = hunk["lines"]
+    old_content, new_content, context_only = _hunk_components(hunk)
+    if not old_content:
+        # Only '+' lines: nothing to search for, insert at the header's position.
+        ins_pos = max(0, min(start_hint, len(target_lines)))
+        log.debug("Pure addition without context, inserting at line %s", ins_pos)
+        return [
+            {
+                "start_idx": ins_pos,
+                "end_idx": ins_pos,
+                "replacement_lines": list(new_content),
+                "match_type": "pure_addition",
+                "confidence": 0.9,
+            }
+        ]
+
+    lead_ctx, tail_ctx = _split_lead_tail_context(hunk_lines)
     ctx_probe = _adaptive_ctx_window(lead_ctx, tail_ctx)
+    verbose = debug_enabled(log)
 
     candidates = []
 
     log.debug(
-        f"\n=== FINDING CANDIDATES (hint={start_hint}, range=[{search_min}, {search_max}]) ==="
+        "\n=== FINDING CANDIDATES (hint=%s, range=[%s, %s]) ===", start_hint, search_min, search_max
     )
     log.debug(
-        f"Old content ({len(old_content)} lines): {old_content[:3] if old_content else '(empty)'}"
+        "Old content (%s lines): %s",
+        len(old_content),
+        old_content[:3] if old_content else "(empty)",
     )
     log.debug(
-        f"New content ({len(new_content)} lines): {new_content[:3] if new_content else '(empty)'}"
+        "New content (%s lines): %s",
+        len(new_content),
+        new_content[:3] if new_content else "(empty)",
     )
 
     # Log the full hunk for debugging
-    log.debug(f"Full hunk lines ({len(hunk['lines'])} lines):")
-    for i, line in enumerate(hunk["lines"]):
-        log.debug(f"  [{i}] {repr(line)}")
+    log.debug("Full hunk lines (%s lines):", len(hunk_lines))
+    if verbose:
+        for i, line in enumerate(hunk_lines):
+            log.debug("  [%s] %r", i, line)
 
     # Extract changed content (only the - lines, without context)
     changed_lines = []
     leading_context_count = 0
     found_first_change = False
 
-    for ln in hunk["lines"]:
+    for ln in hunk_lines:
         if not found_first_change:
             if ln == "" or (ln and ln[0] == " "):
                 leading_context_count += 1
@@ -768,28 +1006,31 @@ def _find_all_hunk_candidates(
         if ln and ln[0] == "-":
             changed_lines.append(ln[1:])
 
-    log.debug(f"Changed lines (- lines only, {len(changed_lines)} lines):")
-    log.debug(f"Leading context lines before first change: {leading_context_count}")
+    log.debug("Changed lines (- lines only, %s lines):", len(changed_lines))
+    log.debug("Leading context lines before first change: %s", leading_context_count)
 
-    for i, line in enumerate(changed_lines):
-        log.debug(f"  [{i}] {repr(line)}")
+    if verbose:
+        for i, line in enumerate(changed_lines):
+            log.debug("  [%s] %r", i, line)
 
     # For pure additions, extract only the + lines (not context)
     if not changed_lines:
         addition_lines = []
-        for ln in hunk["lines"]:
+        for ln in hunk_lines:
             if ln and ln[0] == "+":
                 addition_lines.append(ln[1:])
 
-        log.debug(f"Addition lines (+ lines only, {len(addition_lines)} lines):")
-        for i, line in enumerate(addition_lines):
-            log.debug(f"  [{i}] {repr(line)}")
+        log.debug("Addition lines (+ lines only, %s lines):", len(addition_lines))
+        if verbose:
+            for i, line in enumerate(addition_lines):
+                log.debug("  [%s] %r", i, line)
 
     # --- Prepare full block for matching ---
-    from_lines, to_lines = _compose_from_to(hunk["lines"])
-    log.debug(f"Composed from_lines ({len(from_lines)} lines):")
-    for i, line in enumerate(from_lines):
-        log.debug(f"  [{i}] {repr(line)}")
+    from_lines, to_lines = _compose_from_to(hunk_lines)
+    log.debug("Composed from_lines (%s lines):", len(from_lines))
+    if verbose:
+        for i, line in enumerate(from_lines):
+            log.debug("  [%s] %r", i, line)
 
     # Check if this is a pure contiguous addition (no deletions AND additions are contiguous)
     if not changed_lines:
@@ -797,7 +1038,7 @@ def _find_all_hunk_candidates(
         state = "context"  # context, addition
         additions_contiguous = True
 
-        for ln in hunk["lines"]:
+        for ln in hunk_lines:
             if ln and ln[0] == "+":
                 if state == "post_addition":
                     # We had additions, then context, now more additions = not contiguous
@@ -811,7 +1052,7 @@ def _find_all_hunk_candidates(
                 # Moved from addition to context
                 state = "post_addition"
 
-        log.debug(f"Pure addition detected (no - lines), contiguous={additions_contiguous}")
+        log.debug("Pure addition detected (no - lines), contiguous=%s", additions_contiguous)
 
         # Only use pure addition insertion logic for contiguous additions
         if additions_contiguous:
@@ -841,10 +1082,18 @@ def _find_all_hunk_candidates(
                 # Find both exact and loose matches
                 # Exact matches preserve whitespace, loose matches ignore it
                 lead_hits_exact = set(
-                    _find_block_matches(target_lines, lead_slice, loose=False) if lead_slice else []
+                    _find_block_matches(
+                        target_lines, lead_slice, loose=False, line_index=line_index
+                    )
+                    if lead_slice
+                    else []
                 )
                 tail_hits_exact = set(
-                    _find_block_matches(target_lines, tail_slice, loose=False) if tail_slice else []
+                    _find_block_matches(
+                        target_lines, tail_slice, loose=False, line_index=line_index
+                    )
+                    if tail_slice
+                    else []
                 )
                 lead_hits_loose = set(
                     _find_block_matches(target_lines, lead_slice, loose=True) if lead_slice else []
@@ -1010,13 +1259,14 @@ def _find_all_hunk_candidates(
         last_delete_idx = -10  # Track position of last deletion
         deletions_scattered = False
 
-        for i, line in enumerate(hunk["lines"]):
+        for i, line in enumerate(hunk_lines):
             if line and line[0] == "-":
                 # Check if there was context since last deletion
                 if last_delete_idx >= 0 and i - last_delete_idx > 1:
                     deletions_scattered = True
                     log.debug(
-                        f"Deletions are scattered: gap of {i - last_delete_idx - 1} lines between deletions"
+                        "Deletions are scattered: gap of %s lines between deletions",
+                        i - last_delete_idx - 1,
                     )
                     break
                 last_delete_idx = i
@@ -1033,41 +1283,37 @@ def _find_all_hunk_candidates(
     anchor_candidates = []
 
     if changed_lines and not skip_anchor_approach:
-        log.debug(f"Searching for anchor (changed content): {len(changed_lines)} lines")
-
-        # Search for changed content with fuzzy matching
-        for i in range(
-            max(0, search_min), min(len(target_lines) - len(changed_lines) + 1, search_max)
-        ):
-            window = target_lines[i : i + len(changed_lines)]
-
-            # Exact match on changed lines
-            exact_match = all(
-                target_lines[i + j] == changed_lines[j] for j in range(len(changed_lines))
-            )
-
-            if exact_match:
-                anchor_candidates.append(i)
-                continue
-
-            # Loose match on changed lines (whitespace-insensitive)
-            loose_match = all(
-                _eq_loose(target_lines[i + j], changed_lines[j]) for j in range(len(changed_lines))
-            )
-
-            if loose_match:
+        log.debug("Searching for anchor (changed content): %s lines", len(changed_lines))
+
+        # Search for changed content with fuzzy matching. Strip and number each line once
+        # up front so the per-window fuzzy check only slices and compares ints.
+        trim_ids: dict[str, int] = {}
+        a_ids = _line_ids([x.strip() for x in changed_lines], trim_ids)
+        target_ids = _line_ids([x.strip() for x in target_lines], trim_ids)
+        # An exact match is also a loose one, so a single slice comparison of the
+        # _loose_key views covers both checks.
+        changed_loose = [_loose_key(x) for x in changed_lines]
+        first_loose = changed_loose[0]
+        scan_lo = max(0, search_min)
+        scan_hi = min(len(target_lines) - len(changed_lines) + 1, search_max)
+        target_loose = [_loose_key(x) for x in target_lines[scan_lo : scan_hi + len(changed_lines)]]
+        for i in range(scan_lo, scan_hi):
+            # Exact or loose (whitespace-insensitive) match on changed lines
+            k = i - scan_lo
+            if (
+                target_loose[k] == first_loose
+                and target_loose[k : k + len(changed_lines)] == changed_loose
+            ):
                 anchor_candidates.append(i)
                 continue
 
             # Fuzzy match on changed lines
-            a_trim = [x.strip() for x in changed_lines]
-            b_trim = [x.strip() for x in window]
-            ratio = difflib.SequenceMatcher(None, a_trim, b_trim, autojunk=False).ratio()
+            ratio = _seq_ratio(a_ids, target_ids[i : i + len(changed_lines)], 0.8)
 
             if ratio >= 0.8:  # High similarity threshold for anchor
                 anchor_candidates.append(i)
 
-        log.debug(f"Found {len(anchor_candidates)} anchor candidates at: {anchor_candidates}")
+        log.debug("Found %s anchor candidates at: %s", len(anchor_candidates), anchor_candidates)
 
     # If no anchor candidates found but we have context, try matching on context alone
     # This handles cases where the deletion target doesn't exist but context is clear
@@ -1077,7 +1323,7 @@ def _find_all_hunk_candidates(
         and (lead_ctx or tail_ctx)
         and not skip_anchor_approach
     ):
-        log.debug(f"No anchors found for changed lines, trying context-only matching")
+        log.debug("No anchors found for changed lines, trying context-only matching")
 
         # Build a pattern from the context
         context_pattern = []
@@ -1087,7 +1333,7 @@ def _find_all_hunk_candidates(
             context_pattern.extend(tail_ctx[: min(3, len(tail_ctx))])
 
         if context_pattern:
-            log.debug(f"Searching for context pattern ({len(context_pattern)} lines)")
+            log.debug("Searching for context pattern (%s lines)", len(context_pattern))
 
             # Search for the context pattern
             for i in range(
@@ -1096,7 +1342,7 @@ def _find_all_hunk_candidates(
                 window = target_lines[i : i + len(context_pattern)]
 
                 # Check similarity
-                ratio = _similarity(context_pattern, window)
+                ratio = _similarity(context_pattern, window, 0.8)
 
                 if ratio >= 0.8:  # Strong context match
                     # Calculate where the changed lines WOULD be
@@ -1104,7 +1350,10 @@ def _find_all_hunk_candidates(
                     anchor_position = i + len(lead_ctx[-min(3, len(lead_ctx)) :]) if lead_ctx else i
                     anchor_candidates.append(anchor_position)
                     log.debug(
-                        f"  Found context match at {i}, implies anchor at {anchor_position}, ratio={ratio:.3f}"
+                        "  Found context match at %s, implies anchor at %s, ratio=%.3f",
+                        i,
+                        anchor_position,
+                        ratio,
                     )
 
     # Additional fallback: if still no candidates and we have both lead and tail context,
@@ -1125,7 +1374,7 @@ def _find_all_hunk_candidates(
                 if insertion_pos <= T and search_min <= insertion_pos < search_max:
                     anchor_candidates.append(L + len(lead_slice))
                     log.debug(
-                        f"  Found lead at {L} and tail at {T}, anchor at {L + len(lead_slice)}"
+                        "  Found lead at %s and tail at %s, anchor at %s", L, T, L + len(lead_slice)
                     )
 
     # Step 2: Score each anchor candidate by surrounding context
@@ -1134,7 +1383,7 @@ def _find_all_hunk_candidates(
 
         # The anchor is the position of the changed line, not the hunk start
         # We need to adjust by subtracting the leading context count
-        log.debug(f"Adjusting anchor positions by -{leading_context_count} (leading context)")
+        log.debug("Adjusting anchor positions by -%s (leading context)", leading_context_count)
 
         for anchor_idx in anchor_candidates:
             # Calculate how well the context matches
@@ -1154,12 +1403,12 @@ def _find_all_hunk_candidates(
                     lead_ratio = _similarity(lead_ctx, file_lead_content)
                     context_score += lead_ratio
                     context_weight += 1
-                    log.debug(f"  Anchor {anchor_idx}: lead_context_ratio={lead_ratio:.3f}")
+                    log.debug("  Anchor %s: lead_context_ratio=%.3f", anchor_idx, lead_ratio)
                 else:
                     # Hunk out of bounds - penalize
                     context_score += 0.0
                     context_weight += 1
-                    log.debug(f"  Anchor {anchor_idx}: lead_context out of bounds")
+                    log.debug("  Anchor %s: lead_context out of bounds", anchor_idx)
 
             # Check trailing context
             if tail_ctx:
@@ -1169,7 +1418,7 @@ def _find_all_hunk_candidates(
                 tail_ratio = _similarity(tail_slice, after[: len(tail_slice)] if after else [])
                 context_score += tail_ratio
                 context_weight += 1
-                log.debug(f"  Anchor {anchor_idx}: tail_context_ratio={tail_ratio:.3f}")
+                log.debug("  Anchor %s: tail_context_ratio=%.3f", anchor_idx, tail_ratio)
 
             # Overall confidence: base score with context adjustment
             # Perfect lead context (>=0.98) gets a boost since it confirms correct positioning
@@ -1186,8 +1435,8 @@ def _find_all_hunk_candidates(
             # Count non-addition lines between leading context and the first deletion
             # to correctly calculate where the hunk starts in the file
             context_lines_before_anchor = leading_context_count
-            for i in range(leading_context_count, len(hunk["lines"])):
-                line = hunk["lines"][i]
+            for i in range(leading_context_count, len(hunk_lines)):
+                line = hunk_lines[i]
                 if line and line[0] == "-":
                     # Found first deletion, stop counting
                     break
@@ -1198,14 +1447,17 @@ def _find_all_hunk_candidates(
 
             hunk_start = anchor_idx - context_lines_before_anchor
             log.debug(
-                f"Calculated hunk_start={hunk_start} (anchor={anchor_idx}, context_before={context_lines_before_anchor})"
+                "Calculated hunk_start=%s (anchor=%s, context_before=%s)",
+                hunk_start,
+                anchor_idx,
+                context_lines_before_anchor,
             )
 
             # Build replacement using surgical reconstruction
             # Use old_content length for the match window
             match_len = len(old_content) if old_content else len(changed_lines)
             surg = _surgical_reconstruct_block(
-                hunk["lines"],
+                hunk_lines,
                 target_lines[hunk_start : hunk_start + match_len],
                 old_content[0] if old_content else "",
                 target_lines[hunk_start] if hunk_start < len(target_lines) else "",
@@ -1225,25 +1477,33 @@ def _find_all_hunk_candidates(
         # Sort by confidence desc, then by distance from hint
         scored_candidates.sort(key=lambda c: (-c["confidence"], c["distance_from_hint"]))
 
-        log.debug(f"Scored candidates:")
+        log.debug("Scored candidates:")
         for idx, cand in enumerate(scored_candidates[:max_candidates]):
             log.debug(
-                f"  [{idx}] hunk_start={cand['start_idx']}, confidence={cand['confidence']:.3f}"
+                "  [%s] hunk_start=%s, confidence=%.3f", idx, cand['start_idx'], cand['confidence']
             )
 
         return scored_candidates[:max_candidates]
 
     # 1) Exact content match
-    exact = _find_block_matches(target_lines, old_content, loose=False)
+    exact = _find_block_matches(
+        target_lines, old_content, loose=False, line_index=line_index
+    )
     exact = [e for e in exact if search_min <= e < search_max]
     if exact:
-        log.debug(f"Exact content matches: {len(exact)} hits at {exact}")
+        log.debug("Exact content matches: %s hits at %s", len(exact), exact)
 
         # Show what we're matching against at each hit location
-        for hit_idx in exact:
-            log.debug(f"  Exact content match at line {hit_idx}:")
-            for i, line in enumerate(target_lines[hit_idx : hit_idx + len(old_content)]):
-                log.debug(f"    [{i}] {repr(line)}")
+        if verbose:
+            for hit_idx in exact:
+                log.debug("  Exact content match at line %s:", hit_idx)
+                for i, line in enumerate(target_lines[hit_idx : hit_idx + len(old_content)]):
+                    log.debug("    [%s] %r", i, line)
+
+        # Everything that depends only on the hunk is computed once, not per hit.
+        lead_probe = [x.strip() for x in lead_ctx[-min(ctx_probe, len(lead_ctx)) :]]
+        tail_probe = [x.strip() for x in tail_ctx[: min(ctx_probe, len(tail_ctx))]]
+        want_indent = _wanted_indent(new_content, lead_ctx)
 
         def _score_exact(p: int) -> tuple[int, int, int, int]:
             before = target_lines[max(0, p - ctx_probe) : p]
@@ -1252,12 +1512,10 @@ def _find_all_hunk_candidates(
                 0
                 if not lead_ctx
                 else int(
-                    difflib.SequenceMatcher(
-                        None,
-                        [x.strip() for x in lead_ctx[-min(ctx_probe, len(lead_ctx)) :]],
+                    _seq_ratio(
+                        lead_probe,
                         [x.strip() for x in before[-min(ctx_probe, len(before)) :]],
-                        autojunk=False,
-                    ).ratio()
+                    )
                     * 1000
                 )
             )
@@ -1265,21 +1523,21 @@ def _find_all_hunk_candidates(
                 0
                 if not tail_ctx
                 else int(
-                    difflib.SequenceMatcher(
-                        None,
-                        [x.strip() for x in tail_ctx[: min(ctx_probe, len(tail_ctx))]],
+                    _seq_ratio(
+                        tail_probe,
                         [x.strip() for x in after[: min(ctx_probe, len(after))]],
-                        autojunk=False,
-                    ).ratio()
+                    )
                     * 1000
                 )
             )
-            struct_pen = _structure_penalty(target_lines, p, new_content, lead_ctx)
+            struct_pen = _structure_penalty(
+                target_lines, p, new_content, lead_ctx, want_indent=want_indent
+            )
             return (abs(p - start_hint), -(lead_hit + tail_hit), struct_pen, p)
 
         for i in sorted(exact, key=_score_exact):
             surg = _surgical_reconstruct_block(
-                hunk["lines"],
+                hunk_lines,
                 target_lines[i : i + len(old_content)],
                 old_content[0] if old_content else "",
                 target_lines[i] if target_lines else "",
@@ -1299,19 +1557,20 @@ def _find_all_hunk_candidates(
     loose = _find_block_matches(target_lines, old_content, loose=True)
     loose = [l for l in loose if search_min <= l < search_max]
     if loose:
-        log.debug(f"Loose content matches: {len(loose)} hits at {loose}")
+        log.debug("Loose content matches: %s hits at %s", len(loose), loose)
 
         # Show what we're matching against at each hit location
-        for hit_idx in loose:
-            log.debug(f"  Loose content match at line {hit_idx}:")
-            for i, line in enumerate(target_lines[hit_idx : hit_idx + len(old_content)]):
-                log.debug(f"    [{i}] {repr(line)}")
+        if verbose:
+            for hit_idx in loose:
+                log.debug("  Loose content match at line %s:", hit_idx)
+                for i, line in enumerate(target_lines[hit_idx : hit_idx + len(old_content)]):
+                    log.debug("    [%s] %r", i, line)
 
         if len(loose) == 1:
             # Single match = high confidence
             i = loose[0]
             surg = _surgical_reconstruct_block(
-                hunk["lines"],
+                hunk_lines,
                 target_lines[i : i + len(old_content)],
                 old_content[0] if old_content else "",
                 target_lines[i] if target_lines else "",
@@ -1327,15 +1586,19 @@ def _find_all_hunk_candidates(
             ]
         else:
             # Multiple matches
+            want_indent = _wanted_indent(new_content, lead_ctx)
+
             def _score_loose(p: int) -> tuple[int, int]:
                 return (
                     abs(p - start_hint),
-                    _structure_penalty(target_lines, p, new_content, lead_ctx),
+                    _structure_penalty(
+                        target_lines, p, new_content, lead_ctx, want_indent=want_indent
+                    ),
                 )
 
             for i in sorted(loose, key=_score_loose):
                 surg = _surgical_reconstruct_block(
-                    hunk["lines"],
+                    hunk_lines,
                     target_lines[i : i + len(old_content)],
                     old_content[0] if old_content else "",
                     target_lines[i] if target_lines else "",
@@ -1368,81 +1631,79 @@ def _find_all_hunk_candidates(
     m = min(len(old_content), n)
     fuzzy_candidates = []
 
-    a_trim = [x.strip() for x in old_content[:m]]
+    target_trim = [x.strip() for x in target_lines]
+    trim_ids: dict[str, int] = {}
+    old_trim = [x.strip() for x in old_content]
+    a_ids = _line_ids(old_trim[:m], trim_ids)
+    target_ids = _line_ids(target_trim, trim_ids)
+    old_first = old_trim[0] if old_trim else ""
 
-    log.debug(f"Starting fuzzy window search with window size {m}")
-    log.debug(f"Search range: [{max(0, search_min)}, {min(n - m + 1, search_max)})")
+    log.debug("Starting fuzzy window search with window size %s", m)
+    log.debug("Search range: [%s, %s)", max(0, search_min), min(n - m + 1, search_max))
 
     for i in range(max(0, search_min), min(n - m + 1, search_max)):
-        window = target_lines[i : i + m]
-        b_trim = [x.strip() for x in window]
-        ratio = difflib.SequenceMatcher(None, a_trim, b_trim, autojunk=False).ratio()
+        ratio = _seq_ratio(a_ids, target_ids[i : i + m], threshold)
 
         # Enforce first-line alignment
         first_line_matches = False
         if old_content and i < len(target_lines):
-            old_first = old_content[0].strip()
-            file_first = target_lines[i].strip()
+            file_first = target_trim[i]
             if old_first == file_first:
                 first_line_matches = True
             elif old_first and file_first:
-                first_ratio = difflib.SequenceMatcher(
-                    None, old_first, file_first, autojunk=False
-                ).ratio()
+                first_ratio = _seq_ratio(old_first, file_first, 0.8)
                 first_line_matches = first_ratio > 0.8
         else:
             first_line_matches = True
 
         if first_line_matches and ratio >= threshold:
             fuzzy_candidates.append((i, ratio))
-            log.debug(f"  Fuzzy candidate at line {i}, ratio={ratio:.3f}")
-            if ratio >= 0.8:  # Log high-confidence fuzzy matches in detail
-                log.debug(f"    Window content:")
-                for j, line in enumerate(window[: min(5, len(window))]):
-                    log.debug(f"      [{j}] {repr(line)}")
+            log.debug("  Fuzzy candidate at line %s, ratio=%.3f", i, ratio)
+            if verbose and ratio >= 0.8:  # Log high-confidence fuzzy matches in detail
+                log.debug("    Window content:")
+                for j, line in enumerate(target_lines[i : i + min(5, m)]):
+                    log.debug("      [%s] %r", j, line)
 
     if fuzzy_candidates:
         # Sort by ratio desc, then by distance from hint
         fuzzy_candidates.sort(key=lambda x: (-x[1], abs(x[0] - start_hint)))
-        log.debug(f"  Found {len(fuzzy_candidates)} fuzzy matches:")
+        log.debug("  Found %s fuzzy matches:", len(fuzzy_candidates))
         for idx, (pos, ratio) in enumerate(fuzzy_candidates[:10]):  # Show top 10
-            log.debug(f"    [{idx}] line {pos}, ratio={ratio:.3f}")
+            log.debug("    [%s] line %s, ratio=%.3f", idx, pos, ratio)
     else:
-        log.debug(f"  No fuzzy matches found (threshold={threshold:.2f})")
-        # Show best ratios even if below threshold
-        log.debug(f"  Showing all positions checked (sample):")
-        sample_positions = list(
-            range(
-                max(0, search_min),
-                min(n - m + 1, search_max),
-                max(1, (min(n - m + 1, search_max) - max(0, search_min)) // 20),
+        log.debug("  No fuzzy matches found (threshold=%.2f)", threshold)
+        if verbose:
+            # Show best ratios even if below threshold
+            log.debug("  Showing all positions checked (sample):")
+            sample_positions = list(
+                range(
+                    max(0, search_min),
+                    min(n - m + 1, search_max),
+                    max(1, (min(n - m + 1, search_max) - max(0, search_min)) // 20),
+                )
             )
-        )
-        for i in sample_positions[:10]:
-            window = target_lines[i : i + m]
-            b_trim = [x.strip() for x in window]
-            ratio = difflib.SequenceMatcher(None, a_trim, b_trim, autojunk=False).ratio()
-            log.debug(f"    line {i}: ratio={ratio:.3f}")
+            for i in sample_positions[:10]:
+                ratio = _seq_ratio(a_ids, target_ids[i : i + m])
+                log.debug("    line %s: ratio=%.3f", i, ratio)
 
     for i, ratio in fuzzy_candidates[:max_candidates]:
         # Validate alignment for surgical reconstruction
         use_surgical = False
         if i + len(old_content) <= len(target_lines) and len(old_content) > 0:
+            # Compare on the stripped views built for the window scan above.
             alignment_checks = min(3, len(old_content))
             matches = 0
             for check_idx in range(alignment_checks):
                 if i + check_idx >= len(target_lines):
                     break
-                old_line = old_content[check_idx].strip()
-                file_line = target_lines[i + check_idx].strip()
-                if old_line == file_line:
+                if old_trim[check_idx] == target_trim[i + check_idx]:
                     matches += 1
 
             use_surgical = matches >= min(2, alignment_checks)
 
         if use_surgical:
             actual_old_file_lines = 0
-            for ln in hunk["lines"]:
+            for ln in hunk_lines:
                 if ln == "" or (ln and ln[0] in " -"):
                     actual_old_file_lines += 1
 
@@ -1450,7 +1711,7 @@ def _find_all_hunk_candidates(
                 actual_old_file_lines = len(target_lines) - i
 
             surg = _surgical_reconstruct_block(
-                hunk["lines"],
+                hunk_lines,
                 target_lines[i : i + actual_old_file_lines],
                 old_content[0],
                 target_lines[i],
@@ -1627,7 +1888,7 @@ def patch_text(
             if not (old or pattern):
                 raise PatchFailedError("missing 'old' or 'pattern' in structured patch")
             if pattern:
-                log.debug(f"[{i}] regex replace: pattern={pattern!r}")
+                log.debug("[%s] regex replace: pattern=%r", i, pattern)
                 text, n = re.subn(pattern, new, text, count=1)
                 if n == 0:
                     raise PatchFailedError(f"pattern not found: {pattern!r}")
@@ -1653,24 +1914,18 @@ def patch_text(
                 if start != -1:
                     end = text.find(tail, start + len(head))
                     if end != -1:
-                        log.debug(f"[{i}] sentinel replace between head/tail")
+                        log.debug("[%s] sentinel replace between head/tail", i)
                         text = text[: start + len(head)] + mid_new + text[end:]
                         continue
             if old in text:
-                log.debug(f"[{i}] exact replace of old block")
+                log.debug("[%s] exact replace of old block", i)
                 text = text.replace(old, new, 1)
                 continue
 
             # Fuzzy matching fallback: find approximate location using line similarity
-            log.debug(f"[{i}] exact match failed, trying fuzzy match...")
+            log.debug("[%s] exact match failed, trying fuzzy match...", i)
 
-            # Detect line ending
-            if "\r\n" in text:
-                eol = "\r\n"
-            elif "\r" in text:
-                eol = "\r"
-            else:
-                eol = "\n"
+            eol = _detect_eol(text)
 
             target_lines = text.split(eol)
             search_lines = old.splitlines()
@@ -1681,7 +1936,11 @@ def patch_text(
             if match:
                 start_idx, end_idx, ratio = match
                 log.debug(
-                    f"[{i}] fuzzy match found at lines {start_idx}-{end_idx} (ratio={ratio:.3f})"
+                    "[%s] fuzzy match found at lines %s-%s (ratio=%.3f)",
+                    i,
+                    start_idx,
+                    end_idx,
+                    ratio,
                 )
 
                 # Get the actual matched lines from the file to preserve indentation
@@ -1722,13 +1981,6 @@ def patch_text(
     if not patch.strip():
         return content
 
-    def _detect_eol(s: str) -> str:
-        if "\r\n" in s:
-            return "\r\n"
-        if "\r" in s:
-            return "\r"
-        return "\n"
-
     eol = _detect_eol(content)
     had_trailing_nl = content.endswith(("\r\n", "\n", "\r"))
 
@@ -1736,9 +1988,7 @@ def patch_text(
 
     log.debug("\n=== PATCH PARSING ===")
 
-    standard_match = re.search(
-        r"^@@\s+-\d+(?:,\d+)?\s+\+\d+(?:,\d+)?\s+@@", dedented_patch, re.MULTILINE
-    )
+    standard_match = _STANDARD_HUNK_RE.search(dedented_patch)
 
     if standard_match:
         hunks = _parse_patch_hunks(dedented_patch)
@@ -1770,11 +2020,7 @@ def patch_text(
     if should_fallback:
         # Check if it looks like a diff header (and thus is a broken patch)
         # If it has diff headers but no hunks, it's an error, not a full replacement.
-        is_diff_signature = re.search(
-            r"^(?:diff --git |index [0-9a-f]+\.\.[0-9a-f]+|new file mode |deleted file mode |--- (?:a/|/dev/null)|\+\+\+ (?:b/|/dev/null))",
-            dedented_patch,
-            re.MULTILINE,
-        )
+        is_diff_signature = _DIFF_SIGNATURE_RE.search(dedented_patch)
 
         if is_diff_signature:
             raise PatchFailedError(
@@ -1822,16 +2068,22 @@ def patch_text(
     hunks = _split_noncontiguous_hunks(hunks)
     if len(hunks) != original_hunk_count:
         log.debug(
-            f"Split {original_hunk_count} hunks into {len(hunks)} due to non-contiguous additions"
+            "Split %s hunks into %s due to non-contiguous additions",
+            original_hunk_count,
+            len(hunks),
         )
 
     if not hunks:
         raise PatchFailedError("no valid hunks")
 
-    log.debug(f"Parsed {len(hunks)} hunks")
+    log.debug("Parsed %s hunks", len(hunks))
+
+    original_lines, original_terms = _split_keepends(content)
+    original_lines = _intern_lines(original_lines)
+    log.debug("Target file has %s lines", len(original_lines))
 
-    original_lines = content.splitlines()
-    log.debug(f"Target file has {len(original_lines)} lines")
+    line_index = _build_line_index(original_lines)
+    header_hints = _header_hints(hunks, len(original_lines))
 
     # PHASE 1: Find ALL candidates for each hunk
     log.debug("\n" + "=" * 60)
@@ -1841,25 +2093,33 @@ def patch_text(
     all_candidates = []
 
     for i, h in enumerate(hunks):
-        log.debug(f"\nHunk #{i + 1}/{len(hunks)}")
+        log.debug("\nHunk #%s/%s", i + 1, len(hunks))
 
-        if h.get("new_start"):
-            start_hint = min(len(original_lines), max(0, int(h.get("new_start", 1)) - 1))
-        else:
-            start_hint = 0
+        start_hint = header_hints[i] if header_hints[i] is not None else 0
 
         candidates = _find_all_hunk_candidates(
-            original_lines, h, threshold, start_hint, 0, len(original_lines), log=log
+            original_lines,
+            h,
+            threshold,
+            start_hint,
+            0,
+            len(original_lines),
+            log=log,
+            line_index=line_index,
         )
 
         if candidates:
-            log.debug(f"  Found {len(candidates)} candidate(s):")
+            log.debug("  Found %s candidate(s):", len(candidates))
             for j, cand in enumerate(candidates):
                 log.debug(
-                    f"    [{j}] line {cand['start_idx']}, confidence={cand['confidence']:.2f}, type={cand['match_type']}"
+                    "    [%s] line %s, confidence=%.2f, type=%s",
+                    j,
+                    cand["start_idx"],
+                    cand["confidence"],
+                    cand["match_type"],
                 )
         else:
-            log.debug(f"  No candidates found")
+            log.debug("  No candidates found")
 
         all_candidates.append(candidates)
 
@@ -1873,7 +2133,7 @@ def patch_text(
     locations = []
     for i, assignment in enumerate(assignments):
         if assignment is None:
-            log.debug(f"Hunk #{i + 1}: no valid assignment")
+            log.debug("Hunk #%s: no valid assignment", i + 1)
             locations.append(
                 {
                     "hunk_index": i,
@@ -1891,7 +2151,10 @@ def patch_text(
             assignment["hunk"] = hunks[i]
             locations.append(assignment)
             log.debug(
-                f"Hunk #{i + 1}: assigned to line {assignment['start_idx']}, confidence={assignment['confidence']:.2f}"
+                "Hunk #%s: assigned to line %s, confidence=%.2f",
+                i + 1,
+                assignment["start_idx"],
+                assignment["confidence"],
             )
 
     # PHASE 3: Refine ambiguous/failed hunks using anchors
@@ -1905,7 +2168,7 @@ def patch_text(
         i for i, loc in enumerate(locations) if loc["confidence"] >= PERFECT_THRESHOLD
     ]
 
-    log.debug(f"Perfect hunks: {[locations[i]['hunk_index'] + 1 for i in perfect_indices]}")
+    log.debug("Perfect hunks: %s", [locations[i]["hunk_index"] + 1 for i in perfect_indices])
 
     for i, loc in enumerate(locations):
         # Skip hunks that are already placed with high confidence.
@@ -1915,7 +2178,7 @@ def patch_text(
         ):
             continue  # Already good
 
-        log.debug(f"\nRefining Hunk #{loc['hunk_index'] + 1} (confidence={loc['confidence']:.2f})")
+        log.debug("\nRefining Hunk #%s (confidence=%.2f)", loc["hunk_index"] + 1, loc["confidence"])
 
         # Find bounding perfect hunks
         prev_perfect = None
@@ -1933,36 +2196,44 @@ def patch_text(
             search_min = prev_perfect["end_idx"]
             search_max = next_perfect["start_idx"]
             log.debug(
-                f"  Bounded by hunks #{prev_perfect['hunk_index'] + 1} and #{next_perfect['hunk_index'] + 1}"
+                "  Bounded by hunks #%s and #%s",
+                prev_perfect["hunk_index"] + 1,
+                next_perfect["hunk_index"] + 1,
             )
-            log.debug(f"  Search range: [{search_min}, {search_max}]")
+            log.debug("  Search range: [%s, %s]", search_min, search_max)
         elif prev_perfect:
             search_min = prev_perfect["end_idx"]
             search_max = len(original_lines)
-            log.debug(f"  Bounded below by hunk #{prev_perfect['hunk_index'] + 1}")
+            log.debug("  Bounded below by hunk #%s", prev_perfect["hunk_index"] + 1)
         elif next_perfect:
             search_min = 0
             search_max = next_perfect["start_idx"]
-            log.debug(f"  Bounded above by hunk #{next_perfect['hunk_index'] + 1}")
+            log.debug("  Bounded above by hunk #%s", next_perfect["hunk_index"] + 1)
         else:
             # No perfect hunks to anchor on
-            log.debug(f"  No perfect anchors available")
+            log.debug("  No perfect anchors available")
             continue
 
         if search_max <= search_min:
-            log.debug(f"  ⚠️ Invalid search range, skipping refinement")
+            log.debug("  ⚠️ Invalid search range, skipping refinement")
             continue
 
         # Re-search with constraints
         h = loc["hunk"]
-        if h.get("new_start"):
-            start_hint = min(len(original_lines), max(0, int(h.get("new_start", 1)) - 1))
-        else:
+        start_hint = header_hints[loc["hunk_index"]]
+        if start_hint is None:
             start_hint = (search_min + search_max) // 2
 
         # Find new candidates in constrained region
         new_candidates = _find_all_hunk_candidates(
-            original_lines, h, threshold, start_hint, search_min, search_max, log=log
+            original_lines,
+            h,
+            threshold,
+            start_hint,
+            search_min,
+            search_max,
+            log=log,
+            line_index=line_index,
         )
 
         if new_candidates:
@@ -1993,12 +2264,12 @@ def patch_text(
                 new_location["hunk_index"] = loc["hunk_index"]
                 new_location["hunk"] = h
                 locations[i] = new_location
-                log.debug(f"  ✅ Refined (new confidence={new_location['confidence']:.2f})")
+                log.debug("  ✅ Refined (new confidence=%.2f)", new_location["confidence"])
             else:
-                log.debug(f"  ⚠️ All candidates overlap with existing assignments")
+                log.debug("  ⚠️ All candidates overlap with existing assignments")
                 # Continue with existing logic for merge conflict or failure
                 if prev_perfect and next_perfect:
-                    log.debug(f"  💡 Creating merge conflict between anchors")
+                    log.debug("  💡 Creating merge conflict between anchors")
 
                     # Calculate proportional position
                     patch_total = sum(
@@ -2011,7 +2282,7 @@ def patch_text(
                     insert_pos = search_min + int(ratio * file_range)
 
                     # Get what we expected vs what's there
-                    old_content, new_content, _ = _split_hunk_components(h["lines"])
+                    old_content, new_content, _ = _hunk_components(h)
                     window_size = (
                         min(len(old_content), search_max - insert_pos) if old_content else 5
                     )
@@ -2033,13 +2304,13 @@ def patch_text(
                         "match_type": "merge_conflict",
                         "confidence": 0.5,
                     }
-                    log.debug(f"  ✅ Merge conflict created at line {insert_pos}")
+                    log.debug("  ✅ Merge conflict created at line %s", insert_pos)
                 else:
-                    log.debug(f"  ✗ Still failed, no both-side anchors for merge conflict")
+                    log.debug("  ✗ Still failed, no both-side anchors for merge conflict")
         else:
             # Still can't find it - create merge conflict if we have both bounds
             if prev_perfect and next_perfect:
-                log.debug(f"  💡 Creating merge conflict between anchors")
+                log.debug("  💡 Creating merge conflict between anchors")
 
                 # Calculate proportional position
                 patch_total = sum(
@@ -2052,7 +2323,7 @@ def patch_text(
                 insert_pos = search_min + int(ratio * file_range)
 
                 # Get what we expected vs what's there
-                old_content, new_content, _ = _split_hunk_components(h["lines"])
+                old_content, new_content, _ = _hunk_components(h)
                 window_size = min(len(old_content), search_max - insert_pos) if old_content else 5
                 actual_content = original_lines[insert_pos : insert_pos + window_size]
 
@@ -2072,9 +2343,9 @@ def patch_text(
                     "match_type": "merge_conflict",
                     "confidence": 0.5,
                 }
-                log.debug(f"  ✅ Merge conflict created at line {insert_pos}")
+                log.debug("  ✅ Merge conflict created at line %s", insert_pos)
             else:
-                log.debug(f"  ✗ Still failed, no both-side anchors for merge conflict")
+                log.debug("  ✗ Still failed, no both-side anchors for merge conflict")
 
     # PHASE 4: Apply all changes bottom-to-top
     log.debug("\n" + "=" * 60)
@@ -2090,39 +2361,40 @@ def patch_text(
         next_loc = locations[i + 1]
         if curr["start_idx"] >= 0 and next_loc["start_idx"] >= 0:
             if curr["start_idx"] < next_loc["end_idx"] and curr["end_idx"] > next_loc["start_idx"]:
-                log.debug(f"\n⚠️ UNEXPECTED OVERLAP (BUG?):")
+                log.debug("\n⚠️ UNEXPECTED OVERLAP (BUG?):")
                 log.debug(
-                    f"  Hunk #{curr['hunk_index'] + 1} [{curr['start_idx']}:{curr['end_idx']}]"
+                    "  Hunk #%s [%s:%s]", curr["hunk_index"] + 1, curr["start_idx"], curr["end_idx"]
                 )
                 log.debug(
-                    f"  Hunk #{next_loc['hunk_index'] + 1} [{next_loc['start_idx']}:{next_loc['end_idx']}]"
+                    "  Hunk #%s [%s:%s]",
+                    next_loc["hunk_index"] + 1,
+                    next_loc["start_idx"],
+                    next_loc["end_idx"],
                 )
 
-    current_lines = original_lines[:]
-
+    placed = []
     for loc in locations:
         if loc["start_idx"] < 0:
-            log.debug(f"\nSkipping failed hunk #{loc['hunk_index'] + 1}")
+            log.debug("\nSkipping failed hunk #%s", loc["hunk_index"] + 1)
             continue
 
         log.debug(
-            f"\nApplying Hunk #{loc['hunk_index'] + 1} at [{loc['start_idx']}:{loc['end_idx']}]"
-        )
-        log.debug(f"  Type: {loc['match_type']}, Confidence: {loc['confidence']:.2f}")
-
-        current_lines = (
-            current_lines[: loc["start_idx"]]
-            + loc["replacement_lines"]
-            + current_lines[loc["end_idx"] :]
+            "\nApplying Hunk #%s at [%s:%s]",
+            loc["hunk_index"] + 1,
+            loc["start_idx"],
+            loc["end_idx"],
         )
+        log.debug("  Type: %s, Confidence: %.2f", loc["match_type"], loc["confidence"])
+        placed.append(loc)
 
-        log.debug(f"  ✅ Applied. File now has {len(current_lines)} lines")
+    current_lines, current_terms = _apply_locations(original_lines, original_terms, placed, eol)
+    log.debug("  ✅ Applied %s hunk(s). File now has %s lines", len(placed), len(current_lines))
 
     log.debug("\n" + "=" * 60)
     log.debug("PATCH APPLICATION COMPLETE")
     log.debug("=" * 60)
 
-    return (eol.join(current_lines)) + (eol if had_trailing_nl else "")
+    return _join_keepends(current_lines, current_terms, eol, had_trailing_nl)
 
 
 def fuzzy_patch_partial(
@@ -2137,13 +2409,6 @@ def fuzzy_patch_partial(
     if not patch_str.strip():
         return content, [], []
 
-    def _detect_eol(s: str) -> str:
-        if "\r\n" in s:
-            return "\r\n"
-        if "\r" in s:
-            return "\r"
-        return "\n"
-
     eol = _detect_eol(content)
     had_trailing_nl = content.endswith(("\r\n", "\n", "\r"))
     hunks = _parse_patch_hunks(patch_str.strip())
@@ -2151,19 +2416,26 @@ def fuzzy_patch_partial(
     # Split non-contiguous additions into separate hunks
     hunks = _split_noncontiguous_hunks(hunks)
 
-    original_lines = content.splitlines()
+    original_lines, original_terms = _split_keepends(content)
+    original_lines = _intern_lines(original_lines)
+    line_index = _build_line_index(original_lines)
+    header_hints = _header_hints(hunks, len(original_lines))
 
     # Phase 1: Find all candidates
     all_candidates = []
 
     for i, h in enumerate(hunks):
-        if h.get("new_start"):
-            start_hint = min(len(original_lines), max(0, int(h.get("new_start", 1)) - 1))
-        else:
-            start_hint = 0
+        start_hint = header_hints[i] if header_hints[i] is not None else 0
 
         candidates = _find_all_hunk_candidates(
-            original_lines, h, threshold, start_hint, 0, len(original_lines), log=log
+            original_lines,
+            h,
+            threshold,
+            start_hint,
+            0,
+            len(original_lines),
+            log=log,
+            line_index=line_index,
         )
         all_candidates.append(candidates)
 
@@ -2229,7 +2501,14 @@ def fuzzy_patch_partial(
         start_hint = (search_min + search_max) // 2
 
         new_candidates = _find_all_hunk_candidates(
-            original_lines, h, threshold, start_hint, search_min, search_max, log=log
+            original_lines,
+            h,
+            threshold,
+            start_hint,
+            search_min,
+            search_max,
+            log=log,
+            line_index=line_index,
         )
 
         if new_candidates:
@@ -2248,7 +2527,7 @@ def fuzzy_patch_partial(
 
                 insert_pos = search_min + int(ratio * (search_max - search_min))
 
-                old_content, new_content, _ = _split_hunk_components(h["lines"])
+                old_content, new_content, _ = _hunk_components(h)
                 window_size = min(len(old_content) if old_content else 5, search_max - insert_pos)
                 actual_content = original_lines[insert_pos : insert_pos + window_size]
 
@@ -2272,13 +2551,13 @@ def fuzzy_patch_partial(
     # Phase 4: Apply
     locations.sort(key=lambda x: (-x["start_idx"], x["hunk_index"]))
 
-    current_lines = original_lines[:]
+    placed = []
     applied = []
     failed = []
 
     for loc in locations:
         if loc["start_idx"] < 0:
-            old_content, new_content, _ = _split_hunk_components(loc["hunk"]["lines"])
+            old_content, new_content, _ = _hunk_components(loc["hunk"])
             lead_ctx, tail_ctx = _split_lead_tail_context(loc["hunk"]["lines"])
             failed.append(
                 {
@@ -2293,13 +2572,10 @@ def fuzzy_patch_partial(
             )
             continue
 
-        current_lines = (
-            current_lines[: loc["start_idx"]]
-            + loc["replacement_lines"]
-            + current_lines[loc["end_idx"] :]
-        )
+        placed.append(loc)
         applied.append(loc["hunk_index"])
 
-    new_text = eol.join(current_lines) + (eol if had_trailing_nl else "")
+    current_lines, current_terms = _apply_locations(original_lines, original_terms, placed, eol)
+    new_text = _join_keepends(current_lines, current_terms, eol, had_trailing_nl)
     return new_text, applied, failed
 
@@ -11,16 +11,17 @@ MAX_FILE_SIZE = 10_000_000
 
 def _build_context_string(request: Any) -> str:
     """Helper function to construct the full context string."""
-    context_str = "SYSTEM INSTRUCTIONS: read ENTIRE content and follow <user_instructions> at end"
+    # Collect pieces and join once; file bodies can be large, so avoid repeated concatenation.
+    parts = ["SYSTEM INSTRUCTIONS: read ENTIRE content and follow <user_instructions> at end"]
 
     if request.include_file_tree:
         base_path = request.base_path
         if os.path.isdir(base_path):
             spec = get_gitignore(base_path)
             tree_string = _generate_tree_string(base_path, spec)
-            context_str += "<file_tree>\n" + tree_string + "\n</file_tree>\n\n"
+            parts.append("<file_tree>\n" + tree_string + "\n</file_tree>\n\n")
 
-    context_str += "<file_contents>\n"
+    parts.append("<file_contents>\n")
     # Resolve the real, absolute path of the base directory to prevent path traversal.
     base_real_path = os.path.realpath(request.base_path)
 
@@ -35,7 +36,7 @@ def _build_context_string(request: Any) -> str:
 
             if common_path != base_real_path:
                 # Security violation: do not read the file; record an explicit error message instead.
-                context_str += (
+                parts.append(
                     f"File: {file_path}\n"
                     "---\n"
                     "Error: Security violation - file path is outside the project directory.\n"
@@ -47,7 +48,7 @@ def _build_context_string(request: Any) -> str:
             try:
                 file_size = os.path.getsize(resolved_path)
                 if file_size > MAX_FILE_SIZE:
-                    context_str += (
+                    parts.append(
                         f"File: {file_path}\n"
                         "---\n"
                         f"Info: File skipped because it is too large ({file_size} bytes > {MAX_FILE_SIZE} limit).\n"
@@ -59,7 +60,7 @@ def _build_context_string(request: Any) -> str:
                 with open(resolved_path, "rb") as f_bin:
                     raw_chunk = f_bin.read(8192)
                     if b"\0" in raw_chunk:
-                        context_str += f"File: {file_path}\n---\nInfo: File skipped because it appears to be binary.\n---\n\n"
+                        parts.append(f"File: {file_path}\n---\nInfo: File skipped because it appears to be binary.\n---\n\n")
                         continue
 
                 with open(resolved_path, encoding="utf-8", errors="replace") as f:
@@ -69,10 +70,10 @@ def _build_context_string(request: Any) -> str:
                  raise
 
             lang = os.path.splitext(file_path)[1].lstrip(".")
-            context_str += f"File: {file_path}\n```{lang}\n{content}\n```\n\n"
+            parts.append(f"File: {file_path}\n```{lang}\n{content}\n```\n\n")
         except FileNotFoundError as e:
             if getattr(request, "ignore_missing_files", False):
-                context_str += (
+                parts.append(
                     f"File: {file_path}\n"
                     "---\n"
                     "Info: File not found and was skipped as requested.\n"
@@ -84,12 +85,12 @@ def _build_context_string(request: Any) -> str:
         except OSError as e:
             raise ContextError(f"Failed to read file '{file_path}': {e}") from e
 
-    context_str += "</file_contents>\n\n"
+    parts.append("</file_contents>\n\n")
     if request.instructions:
-        context_str += f"<user_instructions>\n{request.instructions}\n</user_instructions>\n"
+        parts.append(f"<user_instructions>\n{request.instructions}\n</user_instructions>\n")
 
     # Stable, copy-pasteable formatting guidance for downstream tools.
-    context_str += (
+    parts.append(
         "\n<format_instruction>\n"
         "Output code changes like this:\n"
         "1) Use standard Git unified diffs for all changes, including renames and deletions.\n"
@@ -115,4 +116,4 @@ def _build_context_string(request: Any) -> str:
         "</format_instruction>\n"
     )
 
-    return context_str
+    return "".join(parts)
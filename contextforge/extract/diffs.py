@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from typing import Iterator
 
 from ..errors import ExtractError
 from ..models.fence import FenceToken
@@ -40,38 +42,34 @@ def _first_token(s: str) -> str:
     return s.split()[0].lower()
 
 
+_FENCE_RUN_RE = re.compile(r"`{3,}|~{3,}")
+
+
 def _tokenize_fences(text: str) -> list[FenceToken]:
     """Return all 3+ backtick/tilde runs found anywhere in the text."""
     tokens: list[FenceToken] = []
-    i, n = 0, len(text)
-    while i < n:
-        ch = text[i]
-        if ch in ("`", "~"):
-            j = i + 1
-            while j < n and text[j] == ch:
-                j += 1
-            run = j - i
-            if run >= 3:
-                ls, le = _line_bounds(text, i)
-                before = text[ls:i]
-                after = text[j:le]
-                info_tok = _first_token(after)
-                tokens.append(
-                    FenceToken(
-                        start=i,
-                        end=j,
-                        char=ch,
-                        length=run,
-                        before=before,
-                        after=after,
-                        info_first_token=info_tok,
-                        line_start=ls,
-                        line_end=le,
-                    )
-                )
-                i = j
-                continue
-        i += 1
+    if "```" not in text and "~~~" not in text:
+        return tokens
+    ls, le = -1, -1
+    for m in _FENCE_RUN_RE.finditer(text):
+        i, j = m.span()
+        if i > le:
+            # Runs arrive in order, so only a run past the current line needs a lookup.
+            ls, le = _line_bounds(text, i)
+        after = text[j:le]
+        tokens.append(
+            FenceToken(
+                start=i,
+                end=j,
+                char=text[i],
+                length=j - i,
+                before=text[ls:i],
+                after=after,
+                info_first_token=_first_token(after),
+                line_start=ls,
+                line_end=le,
+            )
+        )
     return tokens
 
 
@@ -80,24 +78,63 @@ def _tokenize_fences(text: str) -> list[FenceToken]:
 # =============================
 
 
+_HUNK_START_RE = re.compile(r"^\s*@@\s+-\d+", re.MULTILINE)
+
+
 def _looks_like_diff(text: str) -> bool:
     if "diff --git " in text:
         return True
     if "--- " in text and "+++ " in text:
         return True
-    return bool(re.search(r"^\s*@@\s+-\d+", text, flags=re.MULTILINE))
+    return bool(_HUNK_START_RE.search(text))
+
+
+# First characters of every line _diff_line_flags counts; others score nothing.
+_FLAGGED_FIRST_CHARS = frozenset("d-+@")
+_NO_FLAGS = (0, 0, 0, 0, 0)
+
+
+def _diff_line_flags(line: str) -> tuple[int, int, int, int, int]:
+    """Per-line counters used by _diff_score (diff --git, ---, +++, @@, +/-)."""
+    if line[:1] not in _FLAGGED_FIRST_CHARS:
+        return _NO_FLAGS
+    return (
+        int(line.startswith("diff --git ")),
+        int(line.startswith("--- ")),
+        int(line.startswith("+++ ")),
+        int(line.startswith("@@")),
+        int(line.startswith(("+", "-"))),
+    )
+
+
+# Line boundaries str.splitlines honours besides "\n" (a "\r" right before "\n" is harmless).
+_OTHER_LINE_BREAK_RE = re.compile("[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]|\r(?!\n)")
+
+
+def _line_prefix_count(text: str, prefix: str) -> int:
+    """Number of "\n"-separated lines of *text* starting with *prefix*."""
+    return int(text.startswith(prefix)) + text.count("\n" + prefix)
 
 
 def _diff_score(text: str) -> float:
     """Heuristic score: higher => more diff-like."""
     if not text.strip():
         return 0.0
-    lines = text.splitlines()
-    count_diff_git = sum(1 for ln in lines if ln.startswith("diff --git "))
-    count_minus_hdr = sum(1 for ln in lines if ln.startswith("--- "))
-    count_plus_hdr = sum(1 for ln in lines if ln.startswith("+++ "))
-    count_hunks = sum(1 for ln in lines if ln.startswith("@@"))
-    count_add_rm = sum(1 for ln in lines if ln.startswith("+") or ln.startswith("-"))
+    if _OTHER_LINE_BREAK_RE.search(text):
+        counts = [sum(col) for col in zip(*map(_diff_line_flags, text.splitlines()))]
+        return _score_diff_counts(counts or [0] * 5)
+    # Only "\n" breaks lines: count each prefix with C-level str.count instead.
+    return _score_diff_counts([
+        _line_prefix_count(text, "diff --git "),
+        _line_prefix_count(text, "--- "),
+        _line_prefix_count(text, "+++ "),
+        _line_prefix_count(text, "@@"),
+        _line_prefix_count(text, "+") + _line_prefix_count(text, "-"),
+    ])
+
+
+def _score_diff_counts(counts: list[int]) -> float:
+    count_diff_git, count_minus_hdr, count_plus_hdr, count_hunks, count_add_rm = counts
     score = 0.0
     score += 5.0 * count_diff_git
     if count_minus_hdr and count_plus_hdr:
@@ -112,7 +149,77 @@ def _diff_score(text: str) -> float:
 # =============================
 
 
-def _best_close_for_open(text: str, tokens: list[FenceToken], open_idx: int) -> int | None:
+class _SpanDiffScorer:
+    """
+    _diff_score for arbitrary [start, end) spans of one text. The text is split into
+    lines once, with prefix sums of each line's _diff_line_flags; a span then costs
+    two bisects plus classifying its partial first and last lines.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.starts: list[int] = []  # offset of each line
+        self.ends: list[int] = []  # offset of each line's terminator
+        self.prefix: list[tuple[int, ...]] = [(0, 0, 0, 0, 0)]
+        pos = 0
+        running = (0, 0, 0, 0, 0)
+        for raw in text.splitlines(keepends=True):
+            line = raw.splitlines()[0]
+            self.starts.append(pos)
+            self.ends.append(pos + len(line))
+            flags = _diff_line_flags(line)
+            if flags is not _NO_FLAGS:
+                running = tuple(a + b for a, b in zip(running, flags))
+            self.prefix.append(running)
+            pos += len(raw)
+
+    def score(self, start: int, end: int) -> float:
+        """Equal to _diff_score(text[start:end]) when neither bound splits a CRLF."""
+        if start >= end:
+            return 0.0
+        text = self.text
+        first = bisect_right(self.starts, start) - 1
+        last = bisect_right(self.starts, end - 1) - 1
+        if first == last or end <= self.ends[first]:
+            # Only part of one line (anything past its terminator is empty).
+            flags = _diff_line_flags(text[start : min(end, self.ends[first])])
+            return _score_diff_counts(list(flags))
+        head = _diff_line_flags(text[start : self.ends[first]])
+        tail = _diff_line_flags(text[self.starts[last] : min(end, self.ends[last])])
+        inner_end, inner_start = self.prefix[last], self.prefix[first + 1]
+        return _score_diff_counts(
+            [h + t + b - a for h, t, b, a in zip(head, tail, inner_end, inner_start)]
+        )
+
+
+_NOT_CLOSER, _CLOSER, _INLINE_OPENER = 0, 1, 2
+
+
+def _closer_kinds(tokens: list[FenceToken]) -> list[int]:
+    """
+    Classify each token as a closer candidate once per text, parallel to *tokens*:
+    _NOT_CLOSER (trailing text on its line), _CLOSER, or _INLINE_OPENER (trailing
+    text that starts another diff/patch).
+    """
+    kinds = []
+    for tok in tokens:
+        if not tok.after.strip():
+            kinds.append(_CLOSER)
+        elif tok.info_first_token in ("diff", "patch"):
+            kinds.append(_INLINE_OPENER)
+        else:
+            kinds.append(_NOT_CLOSER)
+    return kinds
+
+
+def _best_close_for_open(
+    text: str,
+    tokens: list[FenceToken],
+    open_idx: int,
+    scorer: _SpanDiffScorer | None = None,
+    kinds: list[int] | None = None,
+    closers: list[int] | None = None,
+) -> int | None:
     """
     Choose the best closing fence for tokens[open_idx] by scanning from the end backward.
     A valid closer:
@@ -120,7 +227,19 @@ def _best_close_for_open(text: str, tokens: list[FenceToken], open_idx: int) ->
       - length >= open.length,
       - has no non-whitespace AFTER the run on its line (supports '}```' / '}~~~').
     We pick the candidate that maximizes _diff_score(body). Prefer farthest (early exit).
+    Pass a _SpanDiffScorer over *text*, _closer_kinds(tokens) and the ascending
+    indices of its closer candidates to share them across openers.
     """
+    if kinds is None:
+        kinds = _closer_kinds(tokens)
+    if closers is None:
+        closers = [j for j, kind in enumerate(kinds) if kind != _NOT_CLOSER]
+    first = bisect_right(closers, open_idx)
+    # Scores are never negative, so a lone candidate always wins; skip scoring it.
+    if first >= len(closers) - 1:
+        return closers[first] if first < len(closers) else None
+    if scorer is None:
+        scorer = _SpanDiffScorer(text)
     open_tok = tokens[open_idx]
     best_j = None
     best_score = -1.0
@@ -128,20 +247,20 @@ def _best_close_for_open(text: str, tokens: list[FenceToken], open_idx: int) ->
 
     body_start = open_tok.end  # provisional; corrected by _body_slice_for_open
 
-    for j in range(len(tokens) - 1, open_idx, -1):
+    # Only closer candidates after the opener, farthest first.
+    for p in range(len(closers) - 1, first - 1, -1):
+        j = closers[p]
         close_tok = tokens[j]
         # if close_tok.char != open_tok.char or close_tok.length < open_tok.length:
         #     continue
         # Allow trailing text ONLY if it starts a new diff/patch (dual-purpose closer+opener)
-        after_stripped = close_tok.after.strip()
-        is_inline_opener = bool(after_stripped) and close_tok.info_first_token in ("diff", "patch")
-        if after_stripped and not is_inline_opener:
-            continue
+        is_inline_opener = kinds[j] == _INLINE_OPENER
 
         # Provisional body for scoring only
-        body = text[body_start : close_tok.start]
-        score = _diff_score(body)
-        if opener_lang in ("diff", "patch") and not _looks_like_diff(body):
+        score = scorer.score(body_start, close_tok.start)
+        if opener_lang in ("diff", "patch") and not _looks_like_diff(
+            text[body_start : close_tok.start]
+        ):
             score *= 0.2
 
         # Prefer boundaries that also start another diff on the same line
@@ -201,11 +320,41 @@ def _body_slice_for_open(text: str, open_tok: FenceToken, close_tok: FenceToken)
 # =============================
 
 
+_CUSTOM_BEGIN_RE = re.compile(r"^\s*\*\*\*\s*Begin Patch\s*$", re.MULTILINE)
+_CUSTOM_END_RE = re.compile(r"^\s*\*\*\*\s*End Patch\s*$", re.MULTILINE)
+_CUSTOM_PATH_RE = re.compile(r"^\s*\*\*\*\s*.*:\s*(\S+)", re.MULTILINE)
+
+
+def _iter_marker_matches(
+    pattern: re.Pattern[str], literal: str, text: str, pos: int = 0, endpos: int | None = None
+) -> Iterator[re.Match[str]]:
+    """Yields ``pattern`` matches like ``finditer``, jumping between ``literal`` hits.
+
+    Every match contains ``literal`` preceded only by whitespace and ``*``, so the
+    regex is started at the head of that run instead of at every line in between.
+    """
+    if endpos is None:
+        endpos = len(text)
+    while True:
+        k = text.find(literal, pos, endpos)
+        if k < 0:
+            return
+        while k > pos and (text[k - 1] == "*" or text[k - 1].isspace()):
+            k -= 1
+        m = pattern.search(text, k, endpos)
+        if m is None:
+            return
+        yield m
+        pos = m.end()
+
+
 def _extract_custom_patch_blocks(text: str) -> list[dict[str, object]]:
     """Extracts non-fenced diffs that use '*** Begin Patch' / '*** End Patch' delimiters."""
     results = []
-    begin_pattern = re.compile(r"^\s*\*\*\*\s*Begin Patch\s*$", re.MULTILINE)
-    begin_matches = list(begin_pattern.finditer(text))
+    # Every marker the scan accepts contains this literal; skip the regex without it.
+    if "Begin Patch" not in text:
+        return results
+    begin_matches = list(_iter_marker_matches(_CUSTOM_BEGIN_RE, "Begin Patch", text))
 
     for i, start_match in enumerate(begin_matches):
         block_start_pos = start_match.start()
@@ -218,8 +367,12 @@ def _extract_custom_patch_blocks(text: str) -> list[dict[str, object]]:
         next_begin_match = begin_matches[i + 1] if i + 1 < len(begin_matches) else None
         search_end_limit = next_begin_match.start() if next_begin_match else len(text)
 
-        end_patch_pattern = re.compile(r"^\s*\*\*\*\s*End Patch\s*$", re.MULTILINE)
-        end_match = end_patch_pattern.search(text, content_start_pos, search_end_limit)
+        end_match = next(
+            _iter_marker_matches(
+                _CUSTOM_END_RE, "End Patch", text, content_start_pos, search_end_limit
+            ),
+            None,
+        )
 
         content_end_pos = 0
         full_block_end_pos = 0
@@ -235,7 +388,7 @@ def _extract_custom_patch_blocks(text: str) -> list[dict[str, object]]:
         inner_content = text[content_start_pos:content_end_pos].strip()
 
         # Extract file path from a line like "*** Update File: path" or "*** File: path"
-        path_match = re.search(r"^\s*\*\*\*\s*.*:\s*(\S+)", inner_content, re.MULTILINE)
+        path_match = _CUSTOM_PATH_RE.search(inner_content)
 
         file_path = ""
         diff_code = inner_content
@@ -270,6 +423,29 @@ def _extract_custom_patch_blocks(text: str) -> list[dict[str, object]]:
 # =============================
 
 
+def _header_path_field(line: str, marker: str, prefix: str) -> str | None:
+    """
+    Path text after a '--- ' / '+++ ' header *marker*, minus an optional *prefix*
+    ('a/' or 'b/'); None when nothing follows the marker.
+    """
+    rest = line[len(marker) :]
+    if rest.startswith(prefix) and len(rest) > len(prefix):
+        return rest[len(prefix) :]
+    return rest or None
+
+
+def _diff_git_new_path(line: str) -> str | None:
+    """The 'b/' path of a 'diff --git a/<old> b/<new>' line (first ' b/' after <old>)."""
+    rest = line[len("diff --git a/") :]
+    idx = rest.find(" b/", 1)
+    if idx == -1 or idx + 3 >= len(rest):
+        return None
+    return rest[idx + 3 :]
+
+
+_HEADER_FIRST_CHARS = frozenset("d-+")
+
+
 def _split_multi_file_diff(diff_text: str) -> list[tuple[str, str]]:
     """
     Split a (possibly multi-file) diff into per-file chunks.
@@ -295,24 +471,31 @@ def _split_multi_file_diff(diff_text: str) -> list[tuple[str, str]]:
         cur_has_header = False
 
     def extract_path_from_line(line: str) -> str | None:
-        # Handles `diff --git a/old/path b/new/path` -> we want `new/path`
-        m = re.match(r"^diff --git a/.+? b/(.+)$", line)
-        if m:
-            return m.group(1).strip().split("\t")[0].replace("\\", "/")
-
-        m = re.match(r"^\+\+\+ (?:b/)?(.+)$", line)
-        if m:
-            return m.group(1).strip().split("\t")[0].replace("\\", "/")
-
-        m = re.match(r"^--- (?:a/)?(.+)$", line)
-        if m:
-            path = m.group(1).strip().split("\t")[0]
-            if path != "/dev/null":
-                return path.replace("\\", "/")
+        # Plain prefix checks and slicing; no backtracking on long header lines.
+        if line.startswith("diff --git a/"):
+            # Handles `diff --git a/old/path b/new/path` -> we want `new/path`
+            found = _diff_git_new_path(line)
+            if found is not None:
+                return found.strip().split("\t")[0].replace("\\", "/")
+
+        if line.startswith("+++ "):
+            found = _header_path_field(line, "+++ ", "b/")
+            if found is not None:
+                return found.strip().split("\t")[0].replace("\\", "/")
+
+        if line.startswith("--- "):
+            found = _header_path_field(line, "--- ", "a/")
+            if found is not None:
+                path = found.strip().split("\t")[0]
+                if path != "/dev/null":
+                    return path.replace("\\", "/")
         return None
 
     for ln in lines:
-        if ln.startswith("diff --git "):
+        # Header lines start with 'd', '-' or '+'; body lines skip the prefix checks.
+        if ln[:1] not in _HEADER_FIRST_CHARS:
+            pass
+        elif ln.startswith("diff --git "):
             flush()
             cur_has_diff_git = True
             cur_path = extract_path_from_line(ln)
@@ -376,6 +559,10 @@ def extract_diffs_from_text(
         return any(start <= idx < end for start, end in consumed_spans)
 
     tokens = _tokenize_fences(text)
+    kinds = _closer_kinds(tokens)
+    closers = [j for j, kind in enumerate(kinds) if kind != _NOT_CLOSER]
+    # With at most one closer candidate no opener ever needs span scoring.
+    scorer = _SpanDiffScorer(text) if len(closers) > 1 else None
     results: list[dict[str, object]] = []
     consumed_until = -1
     i = 0
@@ -392,7 +579,7 @@ def extract_diffs_from_text(
             i += 1
             continue
 
-        j = _best_close_for_open(text, tokens, i)
+        j = _best_close_for_open(text, tokens, i, scorer, kinds, closers)
         if j is None:
             i += 1
             continue
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 import textwrap
+from bisect import bisect_left
 
 # Path extraction helpers (retained for feature parity)
 _PATH_UNIX = r"(?:\.?/)?(?:[\w.\-]+/)+[\w.\-]+\.[A-Za-z0-9]{1,8}"
@@ -18,21 +19,60 @@ _LABELLED_PATH_RE = re.compile(
 _UNLABELLED_PATH_RE = re.compile(rf"(?P<path>{_PATH_ANY})")
 
 
+# Every _LABELLED_PATH_RE match contains one of these (case-insensitively).
+_PATH_LABEL_WORDS = ("file", "path", "new", "creat", "add", "write", "save")
+
+
+# textwrap.dedent blanks whitespace-only lines; this is its own pattern for them.
+_WHITESPACE_ONLY_LINE_RE = re.compile("^[ \t]+$", re.MULTILINE)
+
+
+def _dedent(code: str) -> str:
+    """textwrap.dedent, skipping its sub/findall passes when it would be a no-op.
+
+    A first line with a non-blank first character pins the common margin to
+    "", so without whitespace-only lines to blank there is nothing to strip.
+    """
+    if code[:1] not in ("", " ", "\t", "\n") and not _WHITESPACE_ONLY_LINE_RE.search(code):
+        return code
+    return textwrap.dedent(code)
+
+
 def _extract_path_hint_from_lines(lines: list[str]) -> str | None:
     buf = "\n".join(lines)
-    m = _LABELLED_PATH_RE.search(buf)
-    if m:
-        return m.group("path").replace("\\", "/")
+    # Every path alternative needs an extension dot.
+    if "." not in buf:
+        return None
+    # Non-ASCII text may fold onto a label under (?i) (e.g. U+017F), so only
+    # ASCII text is prefiltered.
+    low = buf.lower()
+    if not buf.isascii() or any(w in low for w in _PATH_LABEL_WORDS):
+        m = _LABELLED_PATH_RE.search(buf)
+        if m:
+            return m.group("path").replace("\\", "/")
     m = _UNLABELLED_PATH_RE.search(buf)
     if m:
         return m.group("path").replace("\\", "/")
     return None
 
 
+def _tail_lines(text: str, idx: int, lines: int) -> list[str]:
+    """Return the last ``lines`` lines of ``text[:idx]`` without splitting the whole prefix."""
+    start = idx
+    for _ in range(lines + 1):
+        start = text.rfind("\n", 0, start)
+        if start == -1:
+            break
+    return text[start + 1 : idx].splitlines()[-lines:]
+
+
 def _context_before(text: str, idx: int, lines: int = 5) -> str:
-    snippet = text[:idx]
-    parts = snippet.splitlines()[-lines:]
-    return "\n".join(parts)
+    return "\n".join(_tail_lines(text, idx, lines))
+
+
+# A fence of 3+ backticks or tildes (group 1) followed by another fence of 3+ of the
+# same character plus an info string (group 2).
+_FENCE_PAIR_RE = re.compile(r"([`~]{3,})\s*([`~]{3,}[^\n\r]+)")
 
 
 def _preprocess_fences(text: str) -> str:
@@ -43,9 +83,39 @@ def _preprocess_fences(text: str) -> str:
     Example: '``````diff' becomes '```\n```diff'.
     """
     text = f"```diff\n{text}\n```" if text.lstrip().startswith("--- a") else text
-    # This regex finds a fence of 3+ backticks or tildes (group 1)
-    # followed by another fence of 3+ of the same character plus an info string (group 2).
-    return re.sub(r"([`~]{3,})\s*([`~]{3,}[^\n\r]+)", r"\1\n\2", text)
+    return _FENCE_PAIR_RE.sub(r"\1\n\2", text)
+
+
+# A potential OPENER: a fence at the start of a line, followed by its info string.
+_OPENER_RE = re.compile(r"(?m)^[ \t]*(?P<fence>(?P<ch>`|~)\2{2,})(?P<info>[^\n\r]*)")
+
+# ANY fence-like sequence, used to collect closer/nested-opener candidates.
+_ANY_FENCE_RE = re.compile(r"`{3,}|~{3,}")
+
+
+def _scan_fence_candidates(text: str) -> list[tuple[int, int, str, int, bool, bool]]:
+    """
+    Collect every fence-like run in ``text`` once, as
+    ``(start, end, char, length, at_line_start, has_info)`` tuples.
+    """
+    candidates = []
+    for m in _ANY_FENCE_RE.finditer(text):
+        start, end = m.span()
+        line_end = text.find("\n", end)
+        if line_end == -1:
+            line_end = len(text)
+        line_start = text.rfind("\n", 0, start) + 1
+        candidates.append(
+            (
+                start,
+                end,
+                text[start],
+                end - start,
+                not text[line_start:start].strip(),
+                bool(text[end:line_end].strip()),
+            )
+        )
+    return candidates
 
 
 def extract_all_blocks_from_text(markdown_content: str) -> list[dict[str, object]]:
@@ -58,15 +128,12 @@ def extract_all_blocks_from_text(markdown_content: str) -> list[dict[str, object
     text = _preprocess_fences(markdown_content)
     blocks: list[dict[str, object]] = []
 
-    # Regex to find a potential OPENER at the start of a line.
-    opener_re = re.compile(r"(?m)^[ \t]*(?P<fence>(?P<ch>`|~)\2{2,})(?P<info>[^\n\r]*)")
-
-    # Regex to find ANY fence-like sequence for scanning inside a block.
-    any_fence_re = re.compile(r"(`{3,}|~{3,})")
+    candidates = _scan_fence_candidates(text)
+    candidate_starts = [c[0] for c in candidates]
 
     cursor = 0
     while cursor < len(text):
-        m = opener_re.search(text, cursor)
+        m = _OPENER_RE.search(text, cursor)
         if not m:
             break
 
@@ -88,47 +155,25 @@ def extract_all_blocks_from_text(markdown_content: str) -> list[dict[str, object
         content_end = -1
         next_search_start = m.end()
 
-        scan_pos = content_start
-        while scan_pos < len(text):
-            candidate_match = any_fence_re.search(text, scan_pos)
-            if not candidate_match:
-                break
-
-            candidate_start, candidate_end = candidate_match.span()
-            candidate_fence = text[candidate_start:candidate_end]
-            candidate_char = candidate_fence[0]
-            candidate_len = len(candidate_fence)
-
-            # Find the true end of the candidate's line.
-            line_end_pos = text.find("\n", candidate_end)
-            if line_end_pos == -1:
-                line_end_pos = len(text)
-
-            # An "info string" is ONLY the non-whitespace text on the SAME line.
-            info_on_same_line = text[candidate_end:line_end_pos].strip()
-
-            # An opener MUST be at the start of its line.
-            line_start_pos = text.rfind("\n", 0, candidate_start) + 1
-            is_at_line_start = not text[line_start_pos:candidate_start].strip()
+        for i in range(bisect_left(candidate_starts, content_start), len(candidates)):
+            (
+                candidate_start,
+                candidate_end,
+                candidate_char,
+                candidate_len,
+                is_at_line_start,
+                info_on_same_line,
+            ) = candidates[i]
 
             # Determine the candidate's type based on strict rules.
-            if is_at_line_start:
-                # If it's at the start of a line, it's either a nested opener or a closer.
-                if info_on_same_line:
-                    # Nested opener
-                    fence_stack.append((candidate_char, candidate_len))
-                else:
-                    # Potential closer
-                    if fence_stack:
-                        stack_char, stack_len = fence_stack[-1]
-                        if candidate_char == stack_char and candidate_len >= stack_len:
-                            fence_stack.pop()
-            else:
-                # If NOT at the start of a line, it can ONLY be a closer, never an opener.
-                if fence_stack and not info_on_same_line:
-                    stack_char, stack_len = fence_stack[-1]
-                    if candidate_char == stack_char and candidate_len >= stack_len:
-                        fence_stack.pop()
+            if is_at_line_start and info_on_same_line:
+                # A fence at the start of a line with an info string is a nested opener.
+                fence_stack.append((candidate_char, candidate_len))
+            elif not info_on_same_line:
+                # Anything else without trailing text can only be a closer.
+                stack_char, stack_len = fence_stack[-1]
+                if candidate_char == stack_char and candidate_len >= stack_len:
+                    fence_stack.pop()
 
             if not fence_stack:
                 # Stack is empty, so we've closed the top-level block.
@@ -136,9 +181,6 @@ def extract_all_blocks_from_text(markdown_content: str) -> list[dict[str, object
                 next_search_start = candidate_end
                 break
 
-            # Continue the scan from the end of the current candidate.
-            scan_pos = candidate_end
-
         if content_end != -1:
             code = text[content_start:content_end]
 
@@ -179,14 +221,14 @@ def extract_all_blocks_from_text(markdown_content: str) -> list[dict[str, object
                     break
 
             if not file_path_hint:
-                context_lines = text[: m.start()].splitlines()[-2:]
+                context_lines = _tail_lines(text, m.start(), 2)
                 file_path_hint = _extract_path_hint_from_lines(context_lines) or ""
 
             blocks.append(
                 {
                     "type": "code",
                     "language": lang or "plain",
-                    "code": textwrap.dedent(code),
+                    "code": _dedent(code),
                     "file_path": file_path_hint,
                     "start": content_start,
                     "end": content_end,
@@ -1,6 +1,7 @@
 import pprint
 import re
-from typing import Any, Dict, List, Optional
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
 
 from .diffs import _looks_like_diff, _extract_custom_patch_blocks, _split_multi_file_diff
 from .extract import extract_all_blocks_from_text, _extract_path_hint_from_lines
@@ -50,6 +51,23 @@ def _parse_fence_info_string(info_string: str) -> tuple[str, Optional[str]]:
     return (first_token.lower(), None)
 
 
+# "File: path/to/file.ext" on its own line
+_FILE_HEADER_RE = re.compile(r"^[Ff]ile:\s*(\S+\.\w+)\s*$", re.MULTILINE)
+# "File: path/to/file.ext" at the start of a (stripped) context line
+_FILE_PREFIX_RE = re.compile(r"^[Ff]ile:\s*(\S+\.\w+)")
+# "// path/to/file.ext" or "# path/to/file.ext" at the top of a fence body
+_COMMENT_PATH_RE = re.compile(r"^\s*(?://|#)\s*(\S+\.\w+)")
+
+# Fenced code block (standard markdown fence). The full info string is captured
+# (not just \w*) to support language:filepath.
+_FENCED_BLOCK_RE = re.compile(
+    r"```([^\n]*)\n"  # Opening fence with info string (group 1)
+    r"(.*?)"  # Content inside fence (group 2)
+    r"\n```(?:\s*$|\n|$)",  # Closing fence
+    re.DOTALL,
+)
+
+
 def _find_file_header_scopes(text: str) -> List[Dict[str, Any]]:
     """
     Find all "File: path/to/file.ext" headers and determine their scope.
@@ -63,14 +81,8 @@ def _find_file_header_scopes(text: str) -> List[Dict[str, Any]]:
     """
     scopes = []
 
-    # Pattern to match "File: path/to/file.ext" on its own line
-    file_header_pattern = re.compile(
-        r"^[Ff]ile:\s*(\S+\.\w+)\s*$",
-        re.MULTILINE
-    )
-
     # Find all File: headers
-    headers = list(file_header_pattern.finditer(text))
+    headers = list(_FILE_HEADER_RE.finditer(text))
 
     for i, header_match in enumerate(headers):
         file_path = header_match.group(1).replace("\\", "/")
@@ -96,13 +108,32 @@ def _get_file_path_from_scopes(
 ) -> Optional[str]:
     """
     Get file path from scopes if the fence falls within a File: header scope.
+
+    Scopes come from _find_file_header_scopes: sorted by start and non-overlapping,
+    so the candidate is found by binary search on start.
     """
-    for scope in scopes:
-        if scope["start"] <= fence_start < scope["end"]:
-            return scope["file_path"]
+    lo, hi = 0, len(scopes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if scopes[mid]["start"] <= fence_start:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo and fence_start < scopes[lo - 1]["end"]:
+        return scopes[lo - 1]["file_path"]
     return None
 
 
+def _last_split_lines(text: str, end: int, count: int) -> List[str]:
+    """``text[:end].split("\\n")[-count:]`` without splitting the whole prefix."""
+    start = end
+    for _ in range(count):
+        start = text.rfind("\n", 0, start)
+        if start < 0:
+            return text[:end].split("\n")
+    return text[start + 1 : end].split("\n")
+
+
 def _extract_file_path_from_context(
     text: str, fence_start: int, file_header_scopes: Optional[List[Dict[str, Any]]] = None
 ) -> Optional[str]:
@@ -120,8 +151,7 @@ def _extract_file_path_from_context(
         if scope_path:
             return scope_path
 
-    context_before = text[:fence_start]
-    lines_before = context_before.split("\n")[-5:]
+    lines_before = _last_split_lines(text, fence_start, 5)
 
     for line in reversed(lines_before):
         line = line.strip()
@@ -129,7 +159,7 @@ def _extract_file_path_from_context(
             continue
 
         # Try "File: path/to/file.ext" format
-        file_prefix_match = re.match(r"^[Ff]ile:\s*(\S+\.\w+)", line)
+        file_prefix_match = _FILE_PREFIX_RE.match(line)
         if file_prefix_match:
             return file_prefix_match.group(1).replace("\\", "/")
 
@@ -137,7 +167,40 @@ def _extract_file_path_from_context(
     return _extract_path_hint_from_lines(lines_before)
 
 
-def _extract_search_replace_blocks(text: str) -> List[Dict[str, Any]]:
+# Individual SEARCH/REPLACE pairs inside fence content.
+# Note: new_content can be empty (for deletions), so we make the content optional
+_SR_PAIR_RE = re.compile(
+    r"<<<<<<< SEARCH\s*\n"  # SEARCH marker
+    r"(.*?)"  # Old content - non-greedy (group 1)
+    r"\n=======[ \t]*\n"  # Separator with required newline after
+    r"(.*?)"  # New content - can be empty (group 2)
+    r"(?:\n)?>>>>>>> REPLACE",  # REPLACE marker (newline optional before if new_content is empty)
+    re.DOTALL,
+)
+
+# Individual chevron pairs (<<<<, ====, >>>>) inside fence content.
+_CHEVRON_PAIR_RE = re.compile(
+    r"<<<<\s*\n"  # Opening marker
+    r"(.*?)"  # Old content - non-greedy (group 1)
+    r"\n====[ \t]*\n"  # Separator with required newline after
+    r"(.*?)"  # New content - can be empty (group 2)
+    r"(?:\n)?>>>>",  # Closing marker (newline optional before if new_content is empty)
+    re.DOTALL,
+)
+
+# "+++ b/path" header inside a diff body
+_PLUS_B_PATH_RE = re.compile(r"^\+\+\+ b/(\S+)", re.MULTILINE)
+
+# Literals every fenced SEARCH/REPLACE (resp. chevron) block contains.
+_SR_LITERALS = ("<<<<<<< SEARCH", "=======", ">>>>>>> REPLACE", "```")
+_CHEVRON_LITERALS = ("<<<<", "====", ">>>>", "```")
+
+
+def _extract_search_replace_blocks(
+    text: str,
+    fence_matches: Optional[List[re.Match]] = None,
+    file_header_scopes: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
     """
     Extract SEARCH/REPLACE blocks from markdown-style fenced code.
 
@@ -202,37 +265,28 @@ def _extract_search_replace_blocks(text: str) -> List[Dict[str, Any]]:
         ```
 
     Returns list of dicts with: file_path, old, new, language, start, end
+    Pass fence_matches/file_header_scopes to reuse a fence scan already done on text.
     """
     results = []
+    # One substring search per marker rules out most texts before any regex runs.
+    if not all(marker in text for marker in _SR_LITERALS):
+        return results
 
     # Pre-scan for File: headers and their scopes
-    file_header_scopes = _find_file_header_scopes(text)
-
-    # Pattern to find fenced code blocks (standard markdown fence)
-    # Capture the full info string (not just \w*) to support language:filepath
-    fence_pattern = re.compile(
-        r"```([^\n]*)\n"  # Opening fence with info string (group 1)
-        r"(.*?)"  # Content inside fence (group 2)
-        r"\n```(?:\s*$|\n|$)",  # Closing fence
-        re.DOTALL,
-    )
+    if file_header_scopes is None:
+        file_header_scopes = _find_file_header_scopes(text)
+    if fence_matches is None:
+        fence_matches = list(_FENCED_BLOCK_RE.finditer(text))
 
-    # Pattern to extract individual SEARCH/REPLACE pairs from fence content
-    # Note: new_content can be empty (for deletions), so we make the content optional
-    sr_pattern = re.compile(
-        r"<<<<<<< SEARCH\s*\n"  # SEARCH marker
-        r"(.*?)"  # Old content - non-greedy (group 1)
-        r"\n=======[ \t]*\n"  # Separator with required newline after
-        r"(.*?)"  # New content - can be empty (group 2)
-        r"(?:\n)?>>>>>>> REPLACE",  # REPLACE marker (newline optional before if new_content is empty)
-        re.DOTALL,
-    )
-
-    for fence_match in fence_pattern.finditer(text):
+    for fence_match in fence_matches:
         fence_content = fence_match.group(2)
 
-        # Check if this fence contains any SEARCH/REPLACE blocks
-        sr_matches = list(sr_pattern.finditer(fence_content))
+        # Check if this fence contains any SEARCH/REPLACE blocks; every match
+        # starts with the marker, so the regex starts at its first occurrence.
+        first_marker = fence_content.find("<<<<<<< SEARCH")
+        if first_marker < 0:
+            continue
+        sr_matches = list(_SR_PAIR_RE.finditer(fence_content, first_marker))
         if not sr_matches:
             continue
 
@@ -266,7 +320,11 @@ def _extract_search_replace_blocks(text: str) -> List[Dict[str, Any]]:
     return results
 
 
-def _extract_chevron_blocks(text: str) -> List[Dict[str, Any]]:
+def _extract_chevron_blocks(
+    text: str,
+    fence_matches: Optional[List[re.Match]] = None,
+    file_header_scopes: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
     """
     Extract SEARCH/REPLACE blocks using chevron syntax (<<<<, ====, >>>>).
 
@@ -331,37 +389,28 @@ def _extract_chevron_blocks(text: str) -> List[Dict[str, Any]]:
         ```
 
     Returns list of dicts with: file_path, old, new, language, start, end
+    Pass fence_matches/file_header_scopes to reuse a fence scan already done on text.
     """
     results = []
+    # One substring search per marker rules out most texts before any regex runs.
+    if not all(marker in text for marker in _CHEVRON_LITERALS):
+        return results
 
     # Pre-scan for File: headers and their scopes
-    file_header_scopes = _find_file_header_scopes(text)
-
-    # Pattern to find fenced code blocks (standard markdown fence)
-    # Capture the full info string (not just \w*) to support language:filepath
-    fence_pattern = re.compile(
-        r"```([^\n]*)\n"  # Opening fence with info string (group 1)
-        r"(.*?)"  # Content inside fence (group 2)
-        r"\n```(?:\s*$|\n|$)",  # Closing fence
-        re.DOTALL,
-    )
+    if file_header_scopes is None:
+        file_header_scopes = _find_file_header_scopes(text)
+    if fence_matches is None:
+        fence_matches = list(_FENCED_BLOCK_RE.finditer(text))
 
-    # Pattern to extract individual chevron pairs from fence content
-    # Note: new_content can be empty (for deletions), so we make the content optional
-    chevron_pattern = re.compile(
-        r"<<<<\s*\n"  # Opening marker
-        r"(.*?)"  # Old content - non-greedy (group 1)
-        r"\n====[ \t]*\n"  # Separator with required newline after
-        r"(.*?)"  # New content - can be empty (group 2)
-        r"(?:\n)?>>>>",  # Closing marker (newline optional before if new_content is empty)
-        re.DOTALL,
-    )
-
-    for fence_match in fence_pattern.finditer(text):
+    for fence_match in fence_matches:
         fence_content = fence_match.group(2)
 
-        # Check if this fence contains any chevron blocks
-        chevron_matches = list(chevron_pattern.finditer(fence_content))
+        # Check if this fence contains any chevron blocks; every match starts
+        # with the marker, so the regex starts at its first occurrence.
+        first_marker = fence_content.find("<<<<")
+        if first_marker < 0:
+            continue
+        chevron_matches = list(_CHEVRON_PAIR_RE.finditer(fence_content, first_marker))
         if not chevron_matches:
             continue
 
@@ -373,7 +422,7 @@ def _extract_chevron_blocks(text: str) -> List[Dict[str, Any]]:
 
         # If no file path from info string, check comment at top of fence content
         if not file_path:
-            path_match = re.match(r"^\s*(?://|#)\s*(\S+\.\w+)", fence_content)
+            path_match = _COMMENT_PATH_RE.match(fence_content)
             if path_match:
                 file_path = path_match.group(1).replace("\\", "/")
 
@@ -401,6 +450,35 @@ def _extract_chevron_blocks(text: str) -> List[Dict[str, Any]]:
     return results
 
 
+def _filter_unconsumed(
+    blocks: List[Dict[str, Any]], consumed_ranges: List[Tuple[int, int]]
+) -> List[Dict[str, Any]]:
+    """
+    Drop blocks whose [start, end) span overlaps any non-empty consumed range.
+    Ranges are sorted once with a running max of their ends, so each block is a
+    single bisect instead of a scan over every range.
+    """
+    spans = sorted((r_start, r_end) for r_start, r_end in consumed_ranges if r_start < r_end)
+    if not spans:
+        return list(blocks)
+    starts = [r_start for r_start, _ in spans]
+    max_ends: List[int] = []
+    running = spans[0][1]
+    for _, r_end in spans:
+        running = max(running, r_end)
+        max_ends.append(running)
+
+    kept = []
+    for blk in blocks:
+        b_start, b_end = blk["start"], blk["end"]
+        # Ranges starting before b_end overlap iff the furthest of their ends passes b_start.
+        k = bisect_left(starts, b_end)
+        if b_start < b_end and k and max_ends[k - 1] > b_start:
+            continue
+        kept.append(blk)
+    return kept
+
+
 def extract_blocks_from_text(markdown_content: str) -> List[Dict[str, Any]]:
     """
     Unified extractor returning a list of dictionaries ordered by their
@@ -425,11 +503,20 @@ def extract_blocks_from_text(markdown_content: str) -> List[Dict[str, Any]]:
       - Only explicit ```diff fences are treated as diffs (for stable ordering).
       - Adjacent and nested fences are handled by the underlying extractors.
     """
+    # SEARCH/REPLACE markers contain the chevron ones, so whenever the first scanner
+    # runs the second does too; find their fences and File: headers once for both.
+    fence_matches = file_header_scopes = None
+    if all(marker in markdown_content for marker in _SR_LITERALS):
+        fence_matches = list(_FENCED_BLOCK_RE.finditer(markdown_content))
+        file_header_scopes = _find_file_header_scopes(markdown_content)
+
     # Step 0: Extract SEARCH/REPLACE blocks (they take priority)
-    search_replace_blocks = _extract_search_replace_blocks(markdown_content)
+    search_replace_blocks = _extract_search_replace_blocks(
+        markdown_content, fence_matches, file_header_scopes
+    )
 
     # Step 0b: Extract chevron-style blocks (<<<<, ====, >>>>)
-    chevron_blocks = _extract_chevron_blocks(markdown_content)
+    chevron_blocks = _extract_chevron_blocks(markdown_content, fence_matches, file_header_scopes)
 
     # Step 1: Extract all fenced code blocks (generic)
     all_blocks = extract_all_blocks_from_text(markdown_content)
@@ -441,17 +528,7 @@ def extract_blocks_from_text(markdown_content: str) -> List[Dict[str, Any]]:
     priority_blocks = search_replace_blocks + chevron_blocks + custom_patch_blocks
     consumed_ranges = [(b["start"], b["end"]) for b in priority_blocks]
 
-    filtered_all_blocks = []
-    for blk in all_blocks:
-        b_start, b_end = blk["start"], blk["end"]
-        is_consumed = False
-        for r_start, r_end in consumed_ranges:
-            # Check for significant overlap/containment
-            if max(b_start, r_start) < min(b_end, r_end):
-                is_consumed = True
-                break
-        if not is_consumed:
-            filtered_all_blocks.append(blk)
+    filtered_all_blocks = _filter_unconsumed(all_blocks, consumed_ranges)
 
     # Step 3: Process and classify each block
     results: List[Dict[str, Any]] = []
@@ -545,7 +622,7 @@ def extract_blocks_from_text(markdown_content: str) -> List[Dict[str, Any]]:
             is_diff = True
             # Try to extract file path from diff headers if not already hinted
             if not file_path:
-                path_match = re.search(r"^\+\+\+ b/(\S+)", code, re.MULTILINE)
+                path_match = _PLUS_B_PATH_RE.search(code)
                 if path_match:
                     diff_file_path = path_match.group(1).strip().split("\t")[0].replace("\\", "/")
         # Check if content looks like a diff even without explicit tag
@@ -4,13 +4,22 @@ import logging
 from typing import Dict, List, Optional
 
 log = logging.getLogger(__name__)
-from ..utils.parsing import _contains_truncation_marker
+
+
+_RENAME_FROM_RE = re.compile(r"^rename from (.+)$", re.MULTILINE)
+_RENAME_TO_RE = re.compile(r"^rename to (.+)$", re.MULTILINE)
+_DELETED_FILE_MODE_RE = re.compile(r"^deleted file mode \d+$", re.MULTILINE)
+_PLUS_DEVNULL_RE = re.compile(r"^\+\+\+ .*/dev/null$", re.MULTILINE)
+_MINUS_A_PATH_RE = re.compile(r"^--- a/(.+)$", re.MULTILINE)
 
 
 def detect_rename_from_diff(code: str) -> Optional[Dict[str, str]]:
     """Detects 'rename from'/'rename to' in a diff block."""
-    rename_from_match = re.search(r"^rename from (.+)$", code, re.MULTILINE)
-    rename_to_match = re.search(r"^rename to (.+)$", code, re.MULTILINE)
+    # Most fenced blocks are not renames; skip both line scans unless one can match.
+    if "rename from " not in code:
+        return None
+    rename_from_match = _RENAME_FROM_RE.search(code)
+    rename_to_match = _RENAME_TO_RE.search(code)
     if rename_from_match and rename_to_match and rename_from_match.group(1).strip() and rename_to_match.group(1).strip():
         return {
             "from_path": rename_from_match.group(1).strip(),
@@ -21,22 +30,53 @@ def detect_rename_from_diff(code: str) -> Optional[Dict[str, str]]:
 
 def detect_deletion_from_diff(code: str) -> Optional[str]:
     """Detects if a diff represents a file deletion and returns the path."""
+    # Both checks below only return a path taken from a '--- a/' header.
+    if "--- a/" not in code:
+        return None
     # Look for 'deleted file mode' header
-    if re.search(r"^deleted file mode \d+$", code, re.MULTILINE):
-        path_match = re.search(r"^--- a/(.+)$", code, re.MULTILINE)
+    if _DELETED_FILE_MODE_RE.search(code):
+        path_match = _MINUS_A_PATH_RE.search(code)
         if path_match:
             # .split('\t') handles cases like '--- a/path/to/file   <timestamp>'
             return path_match.group(1).strip().split("\t")[0]
 
     # Look for diff to /dev/null
-    if re.search(r"^\+\+\+ .*/dev/null$", code, re.MULTILINE):
-        path_match = re.search(r"^--- a/(.+)$", code, re.MULTILINE)
+    if _PLUS_DEVNULL_RE.search(code):
+        path_match = _MINUS_A_PATH_RE.search(code)
         if path_match:
             return path_match.group(1).strip().split("\t")[0]
 
     return None
 
 
+# File path patterns - ordered by specificity
+_FILE_PATH_PATTERNS = [
+    re.compile(p, re.MULTILINE)
+    for p in (
+        r"`([^`]+\.[a-zA-Z0-9]+)`",  # backticked filename
+        r"(?:^|\n)\s*[Ff]ile:\s*([^\s\n]+\.[a-zA-Z0-9]+)",  # "File: path/to.ext"
+        r"(?:^|\n)\s*[Ff]ile\s+([^\s\n]+\.[a-zA-Z0-9]+)",  # "File path/to.ext"
+        r'"([^"\s]+\.[a-zA-Z0-9]+)"',  # quoted filename
+        r"(?:^|\n)\s*##?\s*([^\s\n]+\.[a-zA-Z0-9]+)",  # Markdown header with filename
+        r"(?:^|\s)([a-zA-Z0-9_-]+(?:/[a-zA-Z0-9_.-]+)+\.[a-zA-Z0-9]+)(?=\s|$|[^a-zA-Z0-9_./\-])",
+    )
+]
+
+# Diff headers that carry a path
+_DIFF_INDICATOR_PATTERNS = [
+    re.compile(p, re.MULTILINE)
+    for p in (
+        r"^\s*\+\+\+\s+(?:b/)?(.+)$",
+        r"^\s*---\s+(?:a/)?(.+)$",
+        r"^\s*diff\s+--git\s+a/(\S+)",
+        r"^\s*Index:\s*(.+)$",
+    )
+]
+
+_HUNK_MARKER_RE = re.compile(r"^\s*@@.*@@", re.MULTILINE)
+_ADD_REMOVE_RE = re.compile(r"^\s*[+-]", re.MULTILINE)
+
+
 def extract_file_info_from_context_and_code(
     context: str, code: str, lang: str = ""
 ) -> Optional[Dict[str, str]]:
@@ -48,18 +88,9 @@ def extract_file_info_from_context_and_code(
     full_text = f"{context}\n{code}"
 
     # Pattern 1: File path patterns - ordered by specificity
-    file_patterns = [
-        r"`([^`]+\.[a-zA-Z0-9]+)`",  # backticked filename
-        r"(?:^|\n)\s*[Ff]ile:\s*([^\s\n]+\.[a-zA-Z0-9]+)",  # "File: path/to.ext"
-        r"(?:^|\n)\s*[Ff]ile\s+([^\s\n]+\.[a-zA-Z0-9]+)",  # "File path/to.ext"
-        r'"([^"\s]+\.[a-zA-Z0-9]+)"',  # quoted filename
-        r"(?:^|\n)\s*##?\s*([^\s\n]+\.[a-zA-Z0-9]+)",  # Markdown header with filename
-        r"(?:^|\s)([a-zA-Z0-9_-]+(?:/[a-zA-Z0-9_.-]+)+\.[a-zA-Z0-9]+)(?=\s|$|[^a-zA-Z0-9_./\-])",
-    ]
-
     file_path = None
-    for pattern in file_patterns:
-        matches = re.findall(pattern, full_text, re.MULTILINE)
+    for pattern in _FILE_PATH_PATTERNS:
+        matches = pattern.findall(full_text)
         for match in matches:
             potential_path = match.strip()
             if (
@@ -74,14 +105,8 @@ def extract_file_info_from_context_and_code(
             break
 
     # Pattern 2: Diff indicators in code
-    diff_indicators = [
-        r"^\s*\+\+\+\s+(?:b/)?(.+)$",
-        r"^\s*---\s+(?:a/)?(.+)$",
-        r"^\s*diff\s+--git\s+a/(\S+)",
-        r"^\s*Index:\s*(.+)$",
-    ]
-    for pattern in diff_indicators:
-        match = re.search(pattern, code, re.MULTILINE)
+    for pattern in _DIFF_INDICATOR_PATTERNS:
+        match = pattern.search(code)
         if match:
             path_candidate = match.group(1).strip()
             if "--- a/" in match.string and "dev/null" in path_candidate:
@@ -90,32 +115,27 @@ def extract_file_info_from_context_and_code(
             return {"file_path": file_path, "change_type": "diff"}
 
     # Pattern 3: Raw diff markers
-    has_diff_markers = bool(re.search(r"^\s*@@.*@@", code, re.MULTILINE))
-    has_add_remove = bool(re.search(r"^\s*[+-]", code, re.MULTILINE))
-    if has_diff_markers or (has_add_remove and any(x in code for x in ["--- a/", "+++ b/"])):
+    if _HUNK_MARKER_RE.search(code) or (
+        any(x in code for x in ["--- a/", "+++ b/"]) and _ADD_REMOVE_RE.search(code)
+    ):
         return {"file_path": file_path, "change_type": "diff"}
 
-    # Pattern 4: Full file indicators (non-diff)
+    # Pattern 4: Full file indicators (non-diff). Truncated bodies, recognizable file
+    # structure and everything else with a path all resolve to a full replacement, so
+    # the body is not scanned any further.
     if file_path:
-        if _contains_truncation_marker(code):
-            return {"file_path": file_path, "change_type": "full_replacement"}
-
-        file_structure_indicators = [
-            r"^\s*(?:import|from|#include|package|namespace)",
-            r"^\s*(?:class|def|function|var|let|const)\s+\w+",
-            r"^\s*<!DOCTYPE|<html|<\?xml",
-            r'^\s*\{[\s\n]*"',  # naive JSON
-        ]
-        for pattern in file_structure_indicators:
-            if re.search(pattern, code, re.MULTILINE | re.IGNORECASE):
-                return {"file_path": file_path, "change_type": "full_replacement"}
-
         # If we have a file path and it's not a diff, assume it's a full file replacement.
         return {"file_path": file_path, "change_type": "full_replacement"}
 
     return None
 
 
+_DEVNULL_OLD_RE = re.compile(r"^\s*---\s+(?:a/)?/dev/null\s*$", re.MULTILINE)
+_PLUS_PATH_RE = re.compile(r"^\s*\+\+\+\s+(?:b/)?(\S+)", re.MULTILINE)
+_NEW_FILE_MODE_RE = re.compile(r"^\s*new file mode\s+\d+", re.MULTILINE)
+_DIFF_GIT_NEW_PATH_RE = re.compile(r"^diff\s+--git\s+a/\S+\s+b/(\S+)", re.MULTILINE)
+
+
 def detect_new_files(markdown_content: str) -> List[str]:
     """
     Detect files that are newly created according to diff blocks in the text.
@@ -125,6 +145,11 @@ def detect_new_files(markdown_content: str) -> List[str]:
       - Unified diffs with `--- /dev/null` paired with `+++ b/<path>` (or `+++ <path>`).
     Returns a sorted, de-duplicated list of file paths.
     """
+    # Both rules need one of these literals in a block, and every block body is
+    # taken from the input text, so without them there is nothing to extract.
+    if "/dev/null" not in markdown_content and "new file mode" not in markdown_content:
+        return []
+
     from contextforge.extract.main import extract_blocks_from_text
 
     candidates = extract_blocks_from_text(
@@ -136,16 +161,16 @@ def detect_new_files(markdown_content: str) -> List[str]:
         code = blk.get("code", "")
 
         # Case 1: /dev/null old header + +++ new path (most reliable)
-        has_devnull = re.search(r"^\s*---\s+(?:a/)?/dev/null\s*$", code, re.MULTILINE)
+        has_devnull = "/dev/null" in code and _DEVNULL_OLD_RE.search(code)
         if has_devnull:
-            m2 = re.search(r"^\s*\+\+\+\s+(?:b/)?(\S+)", code, re.MULTILINE)
+            m2 = _PLUS_PATH_RE.search(code)
             if m2 and m2.group(1) != "/dev/null":
                 new_files.add(m2.group(1))
                 continue  # Found it, we're good for this block
 
         # Case 2: Explicit new file mode (often for empty files without a diff hunk)
-        if re.search(r"^\s*new file mode\s+\d+", code, re.MULTILINE):
-            m = re.search(r"^diff\s+--git\s+a/\S+\s+b/(\S+)", code, re.MULTILINE)
+        if "new file mode" in code and _NEW_FILE_MODE_RE.search(code):
+            m = _DIFF_GIT_NEW_PATH_RE.search(code)
             if m:
                 new_files.add(m.group(1))
 
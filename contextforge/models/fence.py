@@ -5,6 +5,19 @@ from dataclasses import dataclass
 class FenceToken:
     """A run of 3+ backticks or 3+ tildes anywhere in a line."""
 
+    # Declared by hand (dataclass(slots=True) needs 3.10); no field has a default.
+    __slots__ = (
+        "start",
+        "end",
+        "char",
+        "length",
+        "before",
+        "after",
+        "info_first_token",
+        "line_start",
+        "line_end",
+    )
+
     start: int  # absolute index of first fence char
     end: int  # absolute index AFTER last fence char
     char: str  # '`' or '~'
@@ -1,6 +1,6 @@
 import os
 import logging
-from typing import List, Dict, Any, Callable, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
 from .extract.metadata import extract_file_info_from_context_and_code
 from .utils.fs import resolve_filename
@@ -27,6 +27,9 @@ def plan_changes(
         List of dicts containing {'metadata': ..., 'block': ...}.
     """
     planned_changes = []
+    # Planning never touches the tree, so each path is resolved (and possibly
+    # searched for via os.walk) once per call, however many blocks target it.
+    resolved_paths: Dict[str, Tuple[str, List[str], bool]] = {}
     
     def _log(msg: str):
         if log_callback:
@@ -70,14 +73,18 @@ def plan_changes(
         # 4. Resolve Filenames and Refine Change Type
         original_path = metadata.get('file_path')
         if original_path:
-            resolved_path, path_logs = resolve_filename(original_path, codebase_dir)
+            cached = resolved_paths.get(original_path)
+            if cached is None:
+                resolved_path, path_logs = resolve_filename(original_path, codebase_dir)
+                exists = os.path.exists(os.path.join(codebase_dir, resolved_path))
+                cached = resolved_paths[original_path] = (resolved_path, path_logs, exists)
+            resolved_path, path_logs, exists = cached
             for msg in path_logs:
                 _log(msg)
             metadata['file_path'] = resolved_path
             
             # If file doesn't exist, force 'full_replacement' (creation)
-            target_path = os.path.join(codebase_dir, resolved_path)
-            if not os.path.exists(target_path):
+            if not exists:
                 if metadata.get('change_type') != 'full_replacement':
                     _log(f"  - File does not exist. Forcing 'full_replacement' for new file: {resolved_path}")
                     metadata['change_type'] = 'full_replacement'
@@ -13,6 +13,22 @@ from .utils.text import cleanup_llm_output
 
 log = logging.getLogger(__name__)
 
+def _apply_search_replace(
+    original_content: str, block: Dict[str, Any], _log: Callable[[str], None]
+) -> Optional[str]:
+    """Apply a SEARCH/REPLACE block's old/new pair to the original content."""
+    _log("  - Applying SEARCH/REPLACE transformation.")
+    try:
+        old_sr = block.get('old_content', '')
+        new_sr = block.get('new_content', '')
+        new_content = patch_text(original_content, [{"old": old_sr, "new": new_sr}])
+        _log("  ✔ SEARCH/REPLACE successful.")
+        return new_content
+    except Exception as e:
+        _log(f"  ✘ SEARCH/REPLACE failed: {e}")
+        return None
+
+
 def apply_change_smartly(
     plan: Dict[str, Any],
     codebase_dir: str,
@@ -49,32 +65,31 @@ def apply_change_smartly(
     target_path = os.path.join(codebase_dir, file_path)
     original_content = ""
     
-    # Read Original Content
-    if os.path.exists(target_path):
-        try:
-            with open(target_path, 'r', encoding='utf-8') as f:
-                original_content = f.read()
-        except Exception as e:
+    # Read Original Content (open first; only stat when the open fails for another reason)
+    file_exists = True
+    try:
+        with open(target_path, 'r', encoding='utf-8') as f:
+            original_content = f.read()
+    except (FileNotFoundError, NotADirectoryError):
+        file_exists = False
+    except Exception as e:
+        file_exists = os.path.exists(target_path)
+        if file_exists:
             _log(f"  - WARNING: Could not read original file: {e}")
     
     new_content = None
     
-    # === Strategy: Full Replacement OR Search/Replace ===
-    if change_type == 'full_replacement' or change_type == 'search_replace':
-        # Special handling for SEARCH/REPLACE blocks
-        if change_type == 'search_replace' or (block.get('is_search_replace')):
-            _log("  - Applying SEARCH/REPLACE transformation.")
-            try:
-                # removed inner import that was causing UnboundLocalError
-                old_sr = block.get('old_content', '')
-                new_sr = block.get('new_content', '')
-                new_content = patch_text(original_content, [{"old": old_sr, "new": new_sr}])
-                _log("  ✔ SEARCH/REPLACE successful.")
-            except Exception as e:
-                _log(f"  ✘ SEARCH/REPLACE failed: {e}")
-                new_content = None
-        
-        elif _contains_truncation_marker(block['code']):
+    # === Strategy: Search/Replace ===
+    # Decided once up front: an SR block stays SR even when planning forced
+    # 'full_replacement' because the target file does not exist yet.
+    if change_type == 'search_replace' or (
+        change_type == 'full_replacement' and block.get('is_search_replace')
+    ):
+        new_content = _apply_search_replace(original_content, block, _log)
+
+    # === Strategy: Full Replacement ===
+    elif change_type == 'full_replacement':
+        if _contains_truncation_marker(block['code']):
             _log("  - Detected truncation markers.")
             if not original_content:
                 _log("  - WARNING: No original file to merge with. Using replacement as-is.")
@@ -142,7 +157,7 @@ def apply_change_smartly(
             "file_path": file_path,
             "new_content": new_content,
             "original_content": original_content,
-            "is_new": not os.path.exists(target_path),
+            "is_new": not file_exists,
             "original_change_type": change_type,
             "block_id": block.get('block_id')
         }
@@ -2,6 +2,7 @@ import os
 import pytest
 from contextforge.commit.patch import patch_text
 import difflib
+from pathlib import Path
 
 # Define the directory containing the test files.
 # The path is constructed relative to the current test file's location.
@@ -11,16 +12,15 @@ TEST_FILES_DIR = os.path.join(TESTS_DIR, '..', '..', 'files', 'diff')
 # Discover test files in the directory
 test_files = []
 if os.path.isdir(TEST_FILES_DIR):
-    test_files = [f for f in os.listdir(TEST_FILES_DIR) if f.endswith('.test.txt')]
+    with os.scandir(TEST_FILES_DIR) as entries:
+        test_files = [e.name for e in entries if e.name.endswith('.test.txt') and e.is_file()]
 
-print(test_files)
 
 def _write_result_to_file(directory, original_filename, actual_content):
     """Writes the actual result to a file for easy comparison."""
     output_filename = f"{original_filename}.actual"
     output_path = os.path.join(directory, output_filename)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(actual_content)
+    Path(output_path).write_text(actual_content, encoding='utf-8')
     return output_path
 
 
@@ -33,20 +33,15 @@ def test_patch_from_file_scenario(filename):
     """
     file_path = os.path.join(TEST_FILES_DIR, filename)
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = Path(file_path).read_text(encoding='utf-8')
 
     # Split the content into initial, test, and result sections
-    try:
-        if content.startswith('# === TEST ==='):
-            initial_raw = ''
-            remaining = content[len('# === TEST ===\n'):]
-            print(remaining)
-            print(remaining.split('\n# === RESULT ===\n', 1))
-        else:
-            initial_raw, remaining = content.split('\n# === TEST ===\n', 1)
-        diff_raw, expected_raw = remaining.split('\n# === RESULT ===\n', 1)
-    except ValueError:
+    if content.startswith('# === TEST ==='):
+        initial_raw, test_sep, remaining = '', '# === TEST ===\n', content[len('# === TEST ===\n'):]
+    else:
+        initial_raw, test_sep, remaining = content.partition('\n# === TEST ===\n')
+    diff_raw, result_sep, expected_raw = remaining.partition('\n# === RESULT ===\n')
+    if not (test_sep and result_sep):
         pytest.fail(
             f"Test file '{filename}' is not in the expected format of "
             "CONTENT\\n# === TEST ===\\nDIFF\\n# === RESULT ===\\nEXPECTED"
@@ -74,5 +69,6 @@ def test_patch_from_file_scenario(filename):
         pytest.fail(
             f"Patch result for '{filename}' does not match the expected output.\n"
             f"Actual result has been written to: {output_path}\n\n"
-            f"Visual Difference:\n{diff_output}"
+            f"Visual Difference:\n{diff_output}",
+            pytrace=False,
         )
\ No newline at end of file
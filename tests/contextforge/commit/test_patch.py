@@ -39,19 +39,29 @@ from contextforge.commit.patch import (
     _leading_ws,
     _normalize_quotes,
     _similarity,
+    _seq_ratio,
+    _line_ids,
     _strip_line_numbers_block,
     _reindent_relative,
     _surgical_reconstruct_block,
     _middle_out_best_window,
     _structure_penalty,
+    _wanted_indent,
     _split_lead_tail_context,
+    _iter_patch_hunks,
     _parse_patch_hunks,
     _parse_simplified_patch_hunks,
+    _build_line_index,
     _find_block_matches,
     _split_hunk_components,
+    _hunk_components,
     _adaptive_ctx_window,
     _locate_insertion_index,
+    _header_hints,
     _split_noncontiguous_hunks,
+    _splice_terminators,
+    _detect_eol,
+    _apply_locations,
 )
 from contextforge.errors.patch import PatchFailedError
 
@@ -207,6 +217,14 @@ def test_flatten_ws_escaped_quotes():
     assert "\\" in result
 
 
+def test_flatten_ws_state_edge_cases():
+    """Escapes keep their next char, literals span lines, unterminated ones run to the end."""
+    assert _flatten_ws_outside_quotes(r"x = 'a\ b'  // c") == r"x='a\ b'"
+    assert _flatten_ws_outside_quotes("s = '''a # b\n c''' # d\ne") == "s='''a#bc'''e"
+    assert _flatten_ws_outside_quotes('u = "open  # x\ny') == 'u="open#xy'
+    assert _flatten_ws_outside_quotes("a / b // c\nd") == "a/bd"
+
+
 # ---------------------------------------------------------------------------
 # Tests for _leading_ws
 # ---------------------------------------------------------------------------
@@ -229,6 +247,14 @@ def test_leading_ws_none():
     assert _leading_ws("hello") == ""
 
 
+def test_leading_ws_mixed_and_blank():
+    """Mixed tabs/spaces are kept verbatim; other whitespace ends the indent."""
+    assert _leading_ws(" \t  x") == " \t  "
+    assert _leading_ws("\t \n") == "\t "
+    assert _leading_ws("   ") == "   "
+    assert _leading_ws("") == ""
+
+
 # ---------------------------------------------------------------------------
 # Tests for _normalize_quotes
 # ---------------------------------------------------------------------------
@@ -274,6 +300,82 @@ def test_similarity_partial():
     assert 0.5 < ratio < 1.0
 
 
+def test_seq_ratio_difflib_fallback(monkeypatch):
+    """Without RapidFuzz the ratio is difflib's, for strings and line lists alike."""
+    import contextforge.commit.patch as patch_mod
+
+    monkeypatch.setattr(patch_mod, "_rf_indel", None)
+    a, b = ["x = 1", "y = 2", "z"], ["x = 1", "z"]
+    assert _seq_ratio(a, b) == difflib.SequenceMatcher(None, a, b).ratio()
+    assert _seq_ratio("abcd", "abce") == 0.75
+    assert _seq_ratio([], []) == 1.0
+
+
+@pytest.mark.parametrize("backend", ["difflib", "rapidfuzz"])
+def test_seq_ratio_backends_agree_with_difflib(backend, monkeypatch):
+    """Both paths return difflib's ratio; below the cutoff it may be reported as 0.0."""
+    import random
+
+    import contextforge.commit.patch as patch_mod
+
+    if backend == "rapidfuzz":
+        pytest.importorskip("rapidfuzz")
+        assert patch_mod._rf_indel is not None
+    else:
+        monkeypatch.setattr(patch_mod, "_rf_indel", None)
+    rng = random.Random(7)
+    for _ in range(500):
+        a = [rng.choice("abcde") for _ in range(rng.randint(0, 10))]
+        b = [rng.choice("abcde") for _ in range(rng.randint(0, 10))]
+        ratio = difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+        assert _seq_ratio(a, b) == ratio
+        for cutoff in (0.5, 0.6, 0.8, ratio):
+            score = _seq_ratio(a, b, cutoff)
+            assert score == ratio if ratio >= cutoff else score in (0.0, ratio)
+
+
+def test_seq_ratio_cutoff():
+    """Scores under the cutoff collapse to 0.0; scores at or above it are exact."""
+    a, b = ["x", "y", "z", "w"], ["x", "y", "q", "r"]
+    full = _seq_ratio(a, b)
+    assert full == 0.5
+    assert _seq_ratio(a, b, 0.5) == full
+    assert _seq_ratio(a, b, 0.9) == 0.0
+    assert _seq_ratio(["a"] * 2, ["b"] * 8, 0.6) == 0.0
+
+
+def test_seq_ratio_cutoff_is_inclusive_with_rapidfuzz():
+    """On the RapidFuzz path a score exactly at the cutoff is kept, as with difflib."""
+    pytest.importorskip("rapidfuzz")
+    import contextforge.commit.patch as patch_mod
+
+    assert patch_mod._rf_indel is not None
+    a, b = list("abcdefghij"), list("abcdefklmn")
+    assert _seq_ratio(a, b) == 0.6
+    assert _seq_ratio(a, b, 0.6) == 0.6
+    assert _seq_ratio(a, b, 0.61) == 0.0
+
+
+def test_window_scan_scores_needle_as_first_sequence(monkeypatch):
+    """difflib's ratio depends on argument order; scans score SequenceMatcher(needle, window)."""
+    import contextforge.commit.patch as patch_mod
+
+    monkeypatch.setattr(patch_mod, "_rf_indel", None)
+    content = "e\nd\ne\ne\na\ne\ne\nc\nd\nb\n"
+    result = patch_text(content, [{"old": "d\nc\ne", "new": "X\nY\nZ"}])
+    assert result == "X\nY\nZ\ne\na\ne\ne\nc\nd\nb\n"
+
+
+def test_line_ids_shared_table():
+    """Equal lines get equal ids across sequences numbered with one table."""
+    ids: dict = {}
+    a = _line_ids(["x", "y", "x"], ids)
+    b = _line_ids(["y", "z"], ids)
+    assert a == [0, 1, 0]
+    assert b == [1, 2]
+    assert _seq_ratio(a, b) == _seq_ratio(["x", "y", "x"], ["y", "z"])
+
+
 # ---------------------------------------------------------------------------
 # Tests for _strip_line_numbers_block
 # ---------------------------------------------------------------------------
@@ -386,6 +488,14 @@ def test_middle_out_best_window_fuzzy():
     assert ratio > 0.5
 
 
+def test_middle_out_best_window_prefers_nearest_perfect():
+    """Of several perfect windows, the one nearest the hint wins."""
+    target = ["x", "y", "q", "x", "y", "q", "x", "y"]
+    assert _middle_out_best_window(target, ["x", "y"], 4, 0, 8) == (3, 1.0)
+    assert _middle_out_best_window(target, ["x", "y"], 7, 0, 8) == (6, 1.0)
+    assert _middle_out_best_window(target, ["x", "'y'"], 0, 0, 8)[1] < 1.0
+
+
 def test_middle_out_best_window_empty_target():
     """Test with empty target."""
     idx, ratio = _middle_out_best_window([], ["a"], 0, 0, 0)
@@ -420,6 +530,16 @@ def test_structure_penalty_mismatched_indent():
     assert penalty > 0
 
 
+def test_structure_penalty_precomputed_want_indent():
+    """A precomputed wanted indent gives the same penalty as deriving it per call."""
+    target = ["    ctx", "line"]
+    want = _wanted_indent(["  new"], ["ctx"])
+    assert want == 2
+    assert _structure_penalty(target, 1, ["  new"], ["ctx"], want_indent=want) == (
+        _structure_penalty(target, 1, ["  new"], ["ctx"])
+    )
+
+
 # ---------------------------------------------------------------------------
 # Tests for _split_lead_tail_context
 # ---------------------------------------------------------------------------
@@ -496,6 +616,16 @@ def test_parse_patch_hunks_multiple():
     assert len(hunks) == 2
 
 
+def test_iter_patch_hunks_yields_lazily():
+    """Each hunk is yielded once the next header closes it."""
+    patch = "@@ -1 +1 @@\n-a\n+b\n@@ -4 +4 @@\n-c\n+d"
+    it = _iter_patch_hunks(patch)
+    first = next(it)
+    assert first["lines"] == ["-a", "+b"]
+    assert [h["old_start"] for h in it] == [4]
+    assert list(_iter_patch_hunks("not a diff")) == []
+
+
 def test_parse_patch_hunks_no_hunks_raises():
     """Test that parsing fails when no hunks are found."""
     with pytest.raises(PatchFailedError, match="no valid hunks"):
@@ -571,6 +701,15 @@ def test_parse_simplified_patch_hunks_with_headers():
     assert not any("---" in str(line) for line in hunks[0]["lines"])
 
 
+def test_parse_simplified_patch_hunks_interns_lines():
+    """Repeated lines across simplified hunks share one string object."""
+    patch = "@@\n x = 1\n-old\n+new\n @@ not a separator\n@@\n x = 1\n-old2\n+new2"
+    hunks = _parse_simplified_patch_hunks(patch)
+    assert len(hunks) == 2
+    assert hunks[0]["lines"][-1] == " @@ not a separator"
+    assert hunks[0]["lines"][0] is hunks[1]["lines"][0]
+
+
 # ---------------------------------------------------------------------------
 # Tests for _find_block_matches
 # ---------------------------------------------------------------------------
@@ -592,6 +731,13 @@ def test_find_block_matches_loose():
     assert 1 in matches
 
 
+def test_find_block_matches_loose_ignores_ws_and_semicolons():
+    """Loose matches agree with _eq_loose line by line."""
+    target = ["  x = 1;", "y", "x = 1", "  y;  "]
+    assert _find_block_matches(target, ["x = 1", "y"], loose=True) == [0, 2]
+    assert _find_block_matches(target, ["x = 1", "y"], loose=False) == []
+
+
 def test_find_block_matches_no_match():
     """Test when no matches are found."""
     target = ["a", "b"]
@@ -600,6 +746,25 @@ def test_find_block_matches_no_match():
     assert matches == []
 
 
+def test_find_block_matches_exact_overlapping_and_tail():
+    """Exact matches may overlap and may end on the last target line."""
+    target = ["x", "x", "x", "y", "x"]
+    assert _find_block_matches(target, ["x", "x"], loose=False) == [0, 1]
+    assert _find_block_matches(target, ["y", "x"], loose=False) == [3]
+    assert _find_block_matches(target, ["x"] * 6, loose=False) == []
+
+
+def test_find_block_matches_with_line_index():
+    """An index over the target gives the same exact matches as a scan."""
+    target = ["x", "a", "b", "x", "a", "b", "a"]
+    index = _build_line_index(target)
+    assert index["a"] == [1, 4, 6]
+    for block in (["a", "b"], ["x", "a"], ["b", "a"], ["a"], ["a", "c"], ["b", "a", "z"]):
+        assert _find_block_matches(target, block, line_index=index) == _find_block_matches(
+            target, block
+        )
+
+
 def test_find_block_matches_empty_block():
     """Test with empty block."""
     target = ["a", "b"]
@@ -648,6 +813,14 @@ def test_split_hunk_components_empty_lines():
     assert ctx == [""]
 
 
+def test_hunk_components_memoized_on_hunk():
+    """The split is computed once and reused for the same hunk dict."""
+    hunk = {"lines": [" ctx", "-old", "+new"]}
+    first = _hunk_components(hunk)
+    assert first == (["ctx", "old"], ["ctx", "new"], ["ctx"])
+    assert _hunk_components(hunk) is first
+
+
 # ---------------------------------------------------------------------------
 # Tests for _adaptive_ctx_window
 # ---------------------------------------------------------------------------
@@ -712,6 +885,12 @@ def test_locate_insertion_index_tail_only():
     assert pos >= 0
 
 
+def test_header_hints():
+    """Header hints are 0-based, clamped to the file, and None without a header."""
+    hunks = [{"new_start": 3, "lines": []}, {"lines": []}, {"new_start": 99, "lines": []}]
+    assert _header_hints(hunks, 10) == [2, None, 10]
+
+
 # ---------------------------------------------------------------------------
 # Tests for _split_noncontiguous_hunks
 # ---------------------------------------------------------------------------
@@ -818,6 +997,58 @@ def test_patch_text_crlf_preservation():
     assert "LINE1" in result
 
 
+def test_detect_eol_prefers_crlf_then_cr():
+    """Any CRLF wins, then any bare CR; text without CR is LF."""
+    assert _detect_eol("a\nb\n") == "\n"
+    assert _detect_eol("") == "\n"
+    assert _detect_eol("a\nb\r\nc") == "\r\n"
+    assert _detect_eol("a\rb\r") == "\r"
+    assert _detect_eol("a\rb\r\n") == "\r\n"
+
+
+def test_splice_terminators_in_place():
+    """Replacement terminators borrow the first replaced line's, falling back to eol."""
+    terms = ["\r\n", "\n", "\n", ""]
+    _splice_terminators(terms, 1, 3, 3, "\r\n")
+    assert terms == ["\r\n", "\n", "\n", "\n", ""]
+    _splice_terminators(terms, 5, 5, 1, "\r\n")
+    assert terms == ["\r\n", "\n", "\n", "\n", "", "\r\n"]
+
+
+def _loc(start, end, repl):
+    return {"start_idx": start, "end_idx": end, "replacement_lines": repl}
+
+
+def test_apply_locations_forward_pass_and_overlap_fallback():
+    """Disjoint edits are stitched in one pass; overlaps splice bottom-to-top."""
+    lines = ["a", "b", "c", "d"]
+    terms = ["\n", "\r\n", "\n", ""]
+    # Bottom-to-top order, including an insertion tied with a replacement at index 1.
+    locs = [_loc(3, 4, ["D"]), _loc(1, 2, ["B1", "B2"]), _loc(1, 1, ["ins"])]
+    out, out_terms = _apply_locations(lines, terms, locs, "\n")
+    assert out == ["a", "ins", "B1", "B2", "c", "D"]
+    assert out_terms == ["\n", "\r\n", "\r\n", "\r\n", "\n", "\n"]
+
+    overlapping = [_loc(1, 3, ["X"]), _loc(0, 2, ["Y"])]
+    out, _ = _apply_locations(lines, terms, overlapping, "\n")
+    assert out == ["Y", "d"]
+    assert lines == ["a", "b", "c", "d"]
+
+
+def test_patch_text_keeps_terminators_outside_hunks():
+    """Lines untouched by a hunk keep their own line terminators."""
+    content = "a\r\nb\r\nc\nd\n"
+    patch = "@@ -1,2 +1,2 @@\n a\n-b\n+B\n"
+    assert patch_text(content, patch) == "a\r\nB\r\nc\nd\n"
+
+
+def test_patch_text_contextless_addition_uses_header_position():
+    """Hunks with only '+' lines insert at the header line, clamped to the file."""
+    content = "a\nb\nc\n"
+    assert patch_text(content, "@@ -0,0 +2,1 @@\n+new\n") == "a\nnew\nb\nc\n"
+    assert patch_text(content, "@@ -0,0 +40,1 @@\n+end\n") == "a\nb\nc\nend\n"
+
+
 def test_patch_text_no_trailing_newline():
     """Test file without trailing newline."""
     content = "line1\nline2"
@@ -26,26 +26,29 @@ logging.basicConfig(
 )
 
 
+_YOLO_SERVICE_FALSE_POSITIVE_FENCE_IN_STRING = textwrap.dedent("""
+    Here are the changes for `backend/app/services/yolo_service.py`:
+
+    ```python
+    # some python code...
+    def construct_prompt():
+        evaluation_prompt = "..."
+        # This line should be treated as simple text content
+        evaluation_prompt += "```diff\\n" 
+        evaluation_prompt += "--- a/file.txt\\n"
+        return evaluation_prompt
+    
+    # more python code...
+    ```
+""")
+
+
 def test_yolo_service_false_positive_fence_in_string():
     """
     Ensures that a fence-like sequence inside a string literal does not
     prematurely close the top-level block. This was the original bug.
     """
-    markdown_content = textwrap.dedent("""
-        Here are the changes for `backend/app/services/yolo_service.py`:
-
-        ```python
-        # some python code...
-        def construct_prompt():
-            evaluation_prompt = "..."
-            # This line should be treated as simple text content
-            evaluation_prompt += "```diff\\n" 
-            evaluation_prompt += "--- a/file.txt\\n"
-            return evaluation_prompt
-        
-        # more python code...
-        ```
-    """)
+    markdown_content = _YOLO_SERVICE_FALSE_POSITIVE_FENCE_IN_STRING
     
     blocks = extract_all_blocks_from_text(markdown_content)
     
@@ -59,25 +62,28 @@ def test_yolo_service_false_positive_fence_in_string():
     assert 'evaluation_prompt += "```diff\\n"' in block["code"]
 
 
+_DEEPLY_NESTED_BLOCKS_ARE_HANDLED_CORRECTLY = textwrap.dedent("""
+    File: `README.md`
+    ```md
+    # Main Document
+    
+    Here is an example of a shell command:
+    
+    ```sh
+    echo "Hello World"
+    ```
+    
+    And that's how you do it.
+    ```
+""")
+
+
 def test_deeply_nested_blocks_are_handled_correctly():
     """
     The parser should only return the outermost block, treating all
     inner fences as part of the content.
     """
-    markdown_content = textwrap.dedent("""
-        File: `README.md`
-        ```md
-        # Main Document
-        
-        Here is an example of a shell command:
-        
-        ```sh
-        echo "Hello World"
-        ```
-        
-        And that's how you do it.
-        ```
-    """)
+    markdown_content = _DEEPLY_NESTED_BLOCKS_ARE_HANDLED_CORRECTLY
 
     blocks = extract_all_blocks_from_text(markdown_content)
     
@@ -108,22 +114,25 @@ def test_same_line_closer_with_content():
     assert 'println("ok")' in block["code"]
 
 
+_UNCLOSED_BLOCK_AT_END_OF_FILE_IS_IGNORED = textwrap.dedent("""
+    ```json
+    { "key": "value" }
+    ```
+    
+    Now for a block that never closes...
+    
+    ```python
+    def incomplete_function():
+        pass
+""")
+
+
 def test_unclosed_block_at_end_of_file_is_ignored():
     """
     If a file ends with an unclosed block, the parser should not crash
     and should return any valid blocks that were completed before it.
     """
-    markdown_content = textwrap.dedent("""
-        ```json
-        { "key": "value" }
-        ```
-        
-        Now for a block that never closes...
-        
-        ```python
-        def incomplete_function():
-            pass
-    """)
+    markdown_content = _UNCLOSED_BLOCK_AT_END_OF_FILE_IS_IGNORED
     
     blocks = extract_all_blocks_from_text(markdown_content)
     
@@ -132,23 +141,26 @@ def test_unclosed_block_at_end_of_file_is_ignored():
     assert blocks[0]["language"] == "json"
 
 
+_MIXED_FENCE_CHARACTERS_NESTING = textwrap.dedent("""
+    ```javascript
+    function demo() {
+        const message = `
+    ~~~text
+    This is a tilde-fenced block inside a backtick one.
+    ~~~
+        `;
+        return message;
+    }
+    ```
+""")
+
+
 def test_mixed_fence_characters_nesting():
     """
     Tests that nesting different fence types (e.g., tildes inside backticks)
     is handled correctly.
     """
-    markdown_content = textwrap.dedent("""
-        ```javascript
-        function demo() {
-            const message = `
-        ~~~text
-        This is a tilde-fenced block inside a backtick one.
-        ~~~
-            `;
-            return message;
-        }
-        ```
-    """)
+    markdown_content = _MIXED_FENCE_CHARACTERS_NESTING
     
     blocks = extract_all_blocks_from_text(markdown_content)
 
@@ -157,19 +169,22 @@ def test_mixed_fence_characters_nesting():
     assert "~~~text" in blocks[0]["code"]
 
 
+_ADJACENT_BLOCKS_ARE_HANDLED = textwrap.dedent("""
+    ```python
+    print("Block 1")
+    ```
+    ```typescript
+    console.log("Block 2");
+    ```
+""")
+
+
 def test_adjacent_blocks_are_handled():
     """
     A simple sanity check to ensure two top-level blocks right after
     one another are both extracted correctly.
     """
-    markdown_content = textwrap.dedent("""
-        ```python
-        print("Block 1")
-        ```
-        ```typescript
-        console.log("Block 2");
-        ```
-    """)
+    markdown_content = _ADJACENT_BLOCKS_ARE_HANDLED
     
     blocks = extract_all_blocks_from_text(markdown_content)
     
@@ -180,16 +195,19 @@ def test_adjacent_blocks_are_handled():
     assert "Block 2" in blocks[1]["code"]
 
 
+_EMPTY_CODE_BLOCK_IS_PARSED = textwrap.dedent("""
+    Here is an empty block:
+    ```python
+    ```
+""")
+
+
 def test_empty_code_block_is_parsed():
     """
     An empty code block should be parsed correctly as a block with
     an empty string for its content.
     """
-    markdown_content = textwrap.dedent("""
-        Here is an empty block:
-        ```python
-        ```
-    """)
+    markdown_content = _EMPTY_CODE_BLOCK_IS_PARSED
     
     blocks = extract_all_blocks_from_text(markdown_content)
     
@@ -198,18 +216,36 @@ def test_empty_code_block_is_parsed():
     assert blocks[0]["code"] == ""
 
 
+_LONGER_CLOSING_FENCE_IS_VALID = textwrap.dedent("""
+    ```python
+    x = 1
+    `````
+""")
+
+
 def test_longer_closing_fence_is_valid():
     """
     A block opened with N fences can be closed by N or more.
     e.g., ``` opened can be closed by `````.
     """
-    markdown_content = textwrap.dedent("""
-        ```python
-        x = 1
-        `````
-    """)
+    markdown_content = _LONGER_CLOSING_FENCE_IS_VALID
     
     blocks = extract_all_blocks_from_text(markdown_content)
     
     assert len(blocks) == 1, "Failed to close with a longer fence"
-    assert "x = 1" in blocks[0]["code"]
\ No newline at end of file
+    assert "x = 1" in blocks[0]["code"]
+
+
+def test_many_blocks_keep_context_and_path_hints():
+    """
+    Context and path hints only look at the lines just before each opener,
+    regardless of how much text precedes the block.
+    """
+    sections = [f"Update src/mod{i}.py\n```python\nx = {i}\n```\n" for i in range(50)]
+    blocks = extract_all_blocks_from_text("\n".join(sections))
+
+    assert len(blocks) == 50
+    assert blocks[49]["file_path"] == "src/mod49.py"
+    assert blocks[49]["code"] == "x = 49\n"
+    assert blocks[49]["context"].endswith("Update src/mod49.py")
+    assert "x = 48" in blocks[49]["context"]
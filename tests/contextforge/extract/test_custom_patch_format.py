@@ -3,20 +3,22 @@ import textwrap
 
 from contextforge.extract.diffs import extract_diffs_from_text
 
+_CONTENT_BASIC_CUSTOM_PATCH = textwrap.dedent("""
+    Some introductory text.
+
+    *** Begin Patch
+    *** Update File: backend/app/core/db.py
+    @@
+    - from .session import SessionLocal
+    + from app.core.session import SessionLocal
+    *** End Patch
+
+    Some trailing text.
+""")
+
 
 def test_extract_basic_custom_patch_format():
-    content = textwrap.dedent("""
-        Some introductory text.
-
-        *** Begin Patch
-        *** Update File: backend/app/core/db.py
-        @@
-        - from .session import SessionLocal
-        + from app.core.session import SessionLocal
-        *** End Patch
-
-        Some trailing text.
-    """)
+    content = _CONTENT_BASIC_CUSTOM_PATCH
     blocks = extract_diffs_from_text(content)
     assert len(blocks) == 1
     block = blocks[0]
@@ -28,25 +30,28 @@ def test_extract_basic_custom_patch_format():
     assert block["close_fence"] is None
 
 
+_CONTENT_MIXED_CUSTOM_AND_FENCED = textwrap.dedent("""
+    Here is a custom patch first.
+    *** Begin Patch
+    *** File: path/to/first.py
+    @@ -1 +1 @@
+    -a
+    +b
+    *** End Patch
+
+    Now for a standard fenced diff.
+    ```diff
+    --- a/path/to/second.py
+    +++ b/path/to/second.py
+    @@ -1 +1 @@
+    -x
+    +y
+    ```
+""")
+
+
 def test_extract_mixed_custom_and_fenced_patches():
-    content = textwrap.dedent("""
-        Here is a custom patch first.
-        *** Begin Patch
-        *** File: path/to/first.py
-        @@ -1 +1 @@
-        -a
-        +b
-        *** End Patch
-
-        Now for a standard fenced diff.
-        ```diff
-        --- a/path/to/second.py
-        +++ b/path/to/second.py
-        @@ -1 +1 @@
-        -x
-        +y
-        ```
-    """)
+    content = _CONTENT_MIXED_CUSTOM_AND_FENCED
     blocks = extract_diffs_from_text(content)
     assert len(blocks) == 2
 
@@ -63,20 +68,23 @@ def test_extract_mixed_custom_and_fenced_patches():
     assert fenced_block["open_fence"] is not None
 
 
+_CONTENT_FLEXIBLE_PREFIX_AND_NO_PATH = textwrap.dedent("""
+    *** Begin Patch
+    *** Patched File Is: a/flexible/path.txt
+    @@
+    -1
+    +2
+    *** End Patch
+
+    *** Begin Patch
+    @@
+    - no path here
+    *** End Patch
+""")
+
+
 def test_custom_patch_flexible_prefix_and_no_path():
-    content = textwrap.dedent("""
-        *** Begin Patch
-        *** Patched File Is: a/flexible/path.txt
-        @@
-        -1
-        +2
-        *** End Patch
-
-        *** Begin Patch
-        @@
-        - no path here
-        *** End Patch
-    """)
+    content = _CONTENT_FLEXIBLE_PREFIX_AND_NO_PATH
     blocks = extract_diffs_from_text(content)
     assert len(blocks) == 2
 
@@ -89,23 +97,36 @@ def test_custom_patch_flexible_prefix_and_no_path():
     assert block_no_path["code"].strip() == "- no path here"
 
 
-def test_extract_unclosed_and_mixed_custom_patches():
-    # Test case with one unclosed patch followed by a regular one.
-    content1 = textwrap.dedent("""
-        Some introductory text.
+_CONTENT_UNCLOSED_THEN_CLOSED = textwrap.dedent("""
+    Some introductory text.
+
+    *** Begin Patch
+    *** Update File: path/to/unclosed.py
+    @@
+    - unclosed patch content
+
+    *** Begin Patch
+    *** File: path/to/closed.py
+    - closed patch content
+    *** End Patch
+
+    Trailing text.
+""")
+
 
-        *** Begin Patch
-        *** Update File: path/to/unclosed.py
-        @@
-        - unclosed patch content
+_CONTENT_UNCLOSED_AT_END = textwrap.dedent("""
+    Another file.
 
-        *** Begin Patch
-        *** File: path/to/closed.py
-        - closed patch content
-        *** End Patch
+    *** Begin Patch
+    *** Update File: contextforge/commit/patch.py
+    @@
+    -def _find_block_matches(target: list[str], block: list[str], loose: bool = False) -> list[int]:
+""")
 
-        Trailing text.
-    """)
+
+def test_extract_unclosed_and_mixed_custom_patches():
+    # Test case with one unclosed patch followed by a regular one.
+    content1 = _CONTENT_UNCLOSED_THEN_CLOSED
     blocks1 = extract_diffs_from_text(content1)
     assert len(blocks1) == 2
 
@@ -119,16 +140,38 @@ def test_extract_unclosed_and_mixed_custom_patches():
     assert closed_block["code"].strip() == "- closed patch content"
 
     # Test case with an unclosed patch at the end of the file.
-    content2 = textwrap.dedent("""
-        Another file.
-
-        *** Begin Patch
-        *** Update File: contextforge/commit/patch.py
-        @@
-        -def _find_block_matches(target: list[str], block: list[str], loose: bool = False) -> list[int]:
-    """)
+    content2 = _CONTENT_UNCLOSED_AT_END
     blocks2 = extract_diffs_from_text(content2)
     assert len(blocks2) == 1
     block_user = blocks2[0]
     assert block_user["file_path"] == "contextforge/commit/patch.py"
-    assert block_user["code"].strip() == "-def _find_block_matches(target: list[str], block: list[str], loose: bool = False) -> list[int]:"
\ No newline at end of file
+    assert block_user["code"].strip() == "-def _find_block_matches(target: list[str], block: list[str], loose: bool = False) -> list[int]:"
+
+
+def test_unfenced_text_without_markers_falls_back_to_raw_diff():
+    content = "*** notes ***\n--- a/f.txt\n+++ b/f.txt\n@@ -1 +1 @@\n-a\n+b\n"
+    blocks = extract_diffs_from_text(content)
+    assert len(blocks) == 1
+    assert blocks[0]["file_path"] == "f.txt"
+    assert blocks[0]["open_fence"] is None
+    assert extract_diffs_from_text("*** just prose ***") == []
+
+
+_CONTENT_MARKER_PHRASES_IN_PROSE = textwrap.dedent("""
+    Wrap edits in *** Begin Patch and *** End Patch lines.
+
+    *** Begin Patch
+    *** Update File: src/a.py
+    - old
+    + new
+    Do not stop at End Patch mid-line.
+    *** End Patch
+""")
+
+
+def test_marker_phrases_inside_prose_are_not_patch_delimiters():
+    content = _CONTENT_MARKER_PHRASES_IN_PROSE
+    blocks = extract_diffs_from_text(content)
+    assert len(blocks) == 1
+    assert blocks[0]["file_path"] == "src/a.py"
+    assert blocks[0]["code"] == "- old\n+ new\nDo not stop at End Patch mid-line."
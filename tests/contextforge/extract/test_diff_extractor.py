@@ -161,3 +161,110 @@ def test_run_base_tests() -> None:
         r11[1]["code"].strip() == "--- a/c\n+++ b/c\n@@ -1 +1 @@\n-c\n+d",
         "second diff body incorrect",
     )
+
+
+def test_multi_file_header_paths() -> None:
+    s = (
+        "```diff\n"
+        "diff --git a/a b/c.py b/a b/c.py\n"
+        "--- a/a b/c.py\n"
+        "+++ b/a b/c.py\n"
+        "@@ -1 +1 @@\n"
+        "-a\n"
+        "+b\n"
+        "diff --git a/new.txt b/new.txt\n"
+        "--- /dev/null\n"
+        "+++ b/new.txt\t2024-01-01\n"
+        "@@ -0,0 +1 @@\n"
+        "+n\n"
+        "```\n"
+    )
+    r = cf_extract_diffs(s)
+    _assert([b["file_path"] for b in r] == ["a b/c.py", "new.txt"], "header paths wrong")
+
+
+def test_span_diff_scorer_matches_diff_score() -> None:
+    from contextforge.extract.diffs import _diff_score, _SpanDiffScorer
+
+    text = "```diff\n--- a/x\n+++ b/x\n@@ -1 +1 @@\n-a\n+b\n}```\nmore\r\n+c\n```\n"
+    scorer = _SpanDiffScorer(text)
+    for start in range(len(text)):
+        for end in range(start, len(text) + 1):
+            if text[end - 1 : end + 1] == "\r\n" or text[start - 1 : start + 1] == "\r\n":
+                continue
+            _assert(scorer.score(start, end) == _diff_score(text[start:end]), f"{start}:{end}")
+
+
+def test_tokenize_fences_runs_anywhere_in_line() -> None:
+    from contextforge.extract.diffs import _tokenize_fences
+
+    text = "a ``~~~ diff x\n}````\n``\n"
+    toks = _tokenize_fences(text)
+    _assert([(t.char, t.length) for t in toks] == [("~", 3), ("`", 4)], "unexpected runs")
+    _assert(toks[0].before == "a ``" and toks[0].info_first_token == "diff", "bad line split")
+    _assert((toks[1].line_start, toks[1].line_end) == (15, 20), "bad line bounds")
+
+
+def test_tokenize_fences_shares_line_bounds_within_a_line() -> None:
+    from contextforge.extract.diffs import _tokenize_fences
+
+    text = "x\n```a~~~b````\n~~~"
+    toks = _tokenize_fences(text)
+    _assert([(t.line_start, t.line_end) for t in toks] == [(2, 14)] * 3 + [(15, 18)], "bounds")
+    _assert([t.after for t in toks[:3]] == ["a~~~b````", "b````", ""], "after text")
+
+
+_DIFF_SCORE_CASES = [
+    ("", 0.0),
+    ("hello world\nfoo", 0.0),
+    ("--- a/x\n+++ b/x\n@@ -1 +1 @@\n-a\n+b", 4.2),
+    ("@@\n-a\n+b", 1.1),
+    ("diff --git a/x b/x\nindex 1..2", 5.0),
+    ("- item\n- item2", 0.1),
+    ("@@\r-a\r+b", 1.1),
+    ("x\n+a\x0c-b\r\n+c", 0.15),
+]
+
+
+def test_diff_score_cases() -> None:
+    from contextforge.extract.diffs import _diff_score, _SpanDiffScorer
+
+    for body, expected in _DIFF_SCORE_CASES:
+        _assert(abs(_diff_score(body) - expected) < 1e-9, f"{body!r}: {_diff_score(body)}")
+        _assert(_SpanDiffScorer(body).score(0, len(body)) == _diff_score(body), f"{body!r}")
+
+
+def test_fence_tokens_are_slotted_and_replaceable() -> None:
+    from dataclasses import replace
+
+    from contextforge.extract.diffs import _tokenize_fences
+
+    tok = _tokenize_fences("```\nx")[0]
+    _assert(not hasattr(tok, "__dict__"), "FenceToken should use __slots__")
+    moved = replace(tok, line_end=None)
+    _assert(moved.line_end is None and moved.start == tok.start, "replace lost fields")
+
+
+def test_closer_kinds_parallel_to_tokens() -> None:
+    from contextforge.extract.diffs import (
+        _CLOSER,
+        _INLINE_OPENER,
+        _NOT_CLOSER,
+        _closer_kinds,
+        _tokenize_fences,
+    )
+
+    toks = _tokenize_fences("```diff\n-a\n```  \n~~~ patch\n+b\n}```python\n")
+    _assert(
+        _closer_kinds(toks) == [_INLINE_OPENER, _CLOSER, _INLINE_OPENER, _NOT_CLOSER],
+        "closer kinds",
+    )
+
+
+def test_best_close_for_open_single_candidate() -> None:
+    from contextforge.extract.diffs import _best_close_for_open, _tokenize_fences
+
+    text = "```diff\nnot a diff\n```\nprose ```python\n"
+    toks = _tokenize_fences(text)
+    _assert(_best_close_for_open(text, toks, 0) == 1, "lone closer should win")
+    _assert(_best_close_for_open(text, toks, 1) is None, "no closer after the last one")
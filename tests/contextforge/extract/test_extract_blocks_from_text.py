@@ -400,3 +400,33 @@ print("hello")
     _assert(len(blocks) == 1, f"expected 1 block, got {len(blocks)}")
     _assert(blocks[0]["language"] == "python", f"unexpected language: {blocks[0]['language']}")
 
+
+def test_plain_block_between_search_replace_blocks_is_kept() -> None:
+    """Fences consumed by SEARCH/REPLACE blocks are dropped; the one between them is not."""
+    sr = "```python\n<<<<<<< SEARCH\n{0} = 1\n=======\n{0} = 2\n>>>>>>> REPLACE\n```\n"
+    s = (
+        "File: a.py\n" + sr.format("x") + "\n"
+        "File: b.py\n```python\nprint('b')\n```\n\n"
+        "File: c.py\n" + sr.format("y")
+    )
+    blocks = cf_extract_blocks(s)
+    _assert([b["file_path"] for b in blocks] == ["a.py", "b.py", "c.py"], "unexpected paths")
+    _assert(blocks[1]["code"] == "print('b')\n", "plain block not preserved")
+    _assert(blocks[0]["is_search_replace"] and blocks[2]["is_search_replace"], "S/R lost")
+
+
+def test_path_hint_labels_and_fallbacks() -> None:
+    from contextforge.extract.extract import _extract_path_hint_from_lines as hint
+
+    _assert(hint(["Here is a file path:", "src/my_app/main.py"]) == "src/my_app/main.py", "label")
+    _assert(hint(["see docs/a.md then", "SAVE: out\\b.txt"]) == "out/b.txt", "labelled first")
+    _assert(hint(["see docs/a.md"]) == "docs/a.md", "unlabelled fallback")
+    _assert(hint(["ſave: x.py"]) == "x.py", "non-ascii label")
+    _assert(hint(["no path here", "File:"]) is None, "no dot")
+
+
+def test_dedent_matches_textwrap() -> None:
+    from contextforge.extract.extract import _dedent
+
+    for code in ["x = 1\n    y\n", "x\n  \ny\n", "  a\n  b\n", "\n  a\n", "\ta\n", "", "a\n\t\n"]:
+        _assert(_dedent(code) == textwrap.dedent(code), f"dedent mismatch for {code!r}")
@@ -2,6 +2,7 @@ import json
 import os
 import pytest
 import difflib
+from pathlib import Path
 from contextforge.extract import extract_blocks_from_text as cf_extract_blocks
 
 
@@ -13,17 +14,15 @@ TEST_FILES_DIR = os.path.join(TESTS_DIR, "..", "..", "files", "extract")
 # Discover test files in the directory
 test_files = []
 if os.path.isdir(TEST_FILES_DIR):
-    test_files = [f for f in os.listdir(TEST_FILES_DIR) if f.endswith(".test.txt")]
-
-print(test_files)
+    with os.scandir(TEST_FILES_DIR) as entries:
+        test_files = [e.name for e in entries if e.name.endswith(".test.txt") and e.is_file()]
 
 
 def _write_result_to_file(directory, original_filename, actual_content):
     """Writes the actual result to a file for easy comparison."""
     output_filename = f"{original_filename}.actual"
     output_path = os.path.join(directory, output_filename)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(actual_content)
+    Path(output_path).write_text(actual_content, encoding="utf-8")
     return output_path
 
 
@@ -36,13 +35,11 @@ def test_extract_from_file_scenario(filename):
     """
     file_path = os.path.join(TEST_FILES_DIR, filename)
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = Path(file_path).read_text(encoding="utf-8")
 
     # Split the content into initial, test, and result sections
-    try:
-        diff_raw, expected_raw = content.split("\n# === RESULT ===\n", 1)
-    except ValueError:
+    diff_raw, result_sep, expected_raw = content.partition("\n# === RESULT ===\n")
+    if not result_sep:
         pytest.fail(
             f"Test file '{filename}' is not in the expected format of "
             "CONTENT\\n# === TEST ===\\nDIFF\\n# === RESULT ===\\nEXPECTED"
@@ -73,5 +70,6 @@ def test_extract_from_file_scenario(filename):
         pytest.fail(
             f"Hunk count for '{filename}' does not match the expected output.\n"
             f"Actual result has been written to: {output_path}\n\n"
-            f"Visual Difference:\n{diff_output}"
+            f"Visual Difference:\n{diff_output}",
+            pytrace=False,
         )
@@ -1,70 +1,78 @@
 # tests/contextforge/extract/test_file_deduplication.py
 import textwrap
 
+import pytest
+
 from contextforge.extract import extract_blocks_from_text
 
+# When a model outputs the same full file twice, only the last version should be
+# returned.
+_FULL_FILE_TWICE = textwrap.dedent("""
+    Here is the first version of the file.
 
-def test_uses_last_full_file_block_for_same_path():
-    """
-    When a model outputs the same full file twice, only the last
-    version should be returned.
-    """
-    markdown_content = textwrap.dedent("""
-        Here is the first version of the file.
+    File: src/app.js
+    ```javascript
+    console.log("old version");
+    ```
 
-        File: src/app.js
-        ```javascript
-        console.log("old version");
-        ```
+    Oh wait, I made a mistake. Here is the corrected version.
 
-        Oh wait, I made a mistake. Here is the corrected version.
+    File: src/app.js
+    ```javascript
+    console.log("new and improved version");
+    ```
+""")
 
-        File: src/app.js
-        ```javascript
-        console.log("new and improved version");
-        ```
-    """)
+# The deduplication logic should apply to diffs. Multiple diffs for the same file
+# should only return the last diff.
+_DIFF_TWICE = textwrap.dedent("""
+    Here are some changes.
 
-    blocks = extract_blocks_from_text(markdown_content)
+    ```diff
+    --- a/src/app.js
+    +++ b/src/app.js
+    @@ -1,1 +1,1 @@
+    - console.log("one");
+    + console.log("two");
+    ```
 
-    assert len(blocks) == 1
-    block = blocks[0]
-    assert block["type"] == "file"
-    assert block["file_path"] == "src/app.js"
-    assert "new and improved version" in block["code"]
-    assert "old version" not in block["code"]
+    And another change for the same file.
 
+    ```diff
+    --- a/src/app.js
+    +++ b/src/app.js
+    @@ -5,1 +5,1 @@
+    - const x = 1;
+    + const x = 2;
+    ```
+""")
 
-def test_also_replaces_diffs_for_same_file():
-    """
-    The deduplication logic should apply to diffs. Multiple diffs
-    for the same file should only return the last diff.
-    """
-    markdown_content = textwrap.dedent("""
-        Here are some changes.
+# (markdown, block type, kept snippet, dropped snippet)
+_DEDUP_CASES = [
+    pytest.param(
+        _FULL_FILE_TWICE,
+        "file",
+        "new and improved version",
+        "old version",
+        id="uses_last_full_file_block_for_same_path",
+    ),
+    pytest.param(
+        _DIFF_TWICE,
+        "diff",
+        "const x = 2",
+        'console.log("two")',
+        id="also_replaces_diffs_for_same_file",
+    ),
+]
 
-        ```diff
-        --- a/src/app.js
-        +++ b/src/app.js
-        @@ -1,1 +1,1 @@
-        - console.log("one");
-        + console.log("two");
-        ```
-
-        And another change for the same file.
-
-        ```diff
-        --- a/src/app.js
-        +++ b/src/app.js
-        @@ -5,1 +5,1 @@
-        - const x = 1;
-        + const x = 2;
-        ```
-    """)
 
+@pytest.mark.parametrize("markdown_content, block_type, kept, dropped", _DEDUP_CASES)
+def test_keeps_last_block_for_same_path(markdown_content, block_type, kept, dropped):
     blocks = extract_blocks_from_text(markdown_content)
 
     assert len(blocks) == 1
-    assert all(b["type"] == "diff" for b in blocks)
-    assert all(b["file_path"] == "src/app.js" for b in blocks)
-    assert "const x = 2" in blocks[0]["code"]
+    block = blocks[0]
+    assert block["type"] == block_type
+    assert block["file_path"] == "src/app.js"
+    assert kept in block["code"]
+    assert dropped not in block["code"]
@@ -25,6 +25,15 @@ def test_extract_file_info_patterns():
     assert info["change_type"] == "full_replacement"
 
 
+def test_extract_file_info_raw_markers_and_no_path():
+    # Hunk markers without any header still classify as a diff
+    info = extract_file_info_from_context_and_code("", "@@ -1 +1 @@\n-a\n+b", "")
+    assert info == {"file_path": None, "change_type": "diff"}
+
+    # Structured code with no path anywhere cannot be classified
+    assert extract_file_info_from_context_and_code("Here:", "def f():\n    pass", "python") is None
+
+
 def test_detect_new_files():
     # Git new file mode
     md_content_1 = """
@@ -67,3 +76,9 @@ def test_detect_new_files():
     ```
     """
     assert detect_new_files(md_content_3) == ["a.txt", "z.txt"]
+
+
+def test_detect_new_files_without_markers():
+    md = "```diff\n--- a/x.txt\n+++ b/x.txt\n@@ -1 +1 @@\n-a\n+b\n```\n"
+    assert detect_new_files(md) == []
+    assert detect_new_files(md.replace("a/x.txt", "/dev/null")) == ["x.txt"]
@@ -1,122 +1,97 @@
 import textwrap
+
 import pytest
 
 from contextforge.extract import extract_blocks_from_text
 from contextforge.plan import plan_changes
 from contextforge.transform import apply_change_smartly
 
+_EXTRACT_BASIC_SEARCH_REPLACE_BLOCK = textwrap.dedent("""
+    Here's the change for src/file.ts:
+
+    ```typescript
+    <<<<<<< SEARCH
+    const old = 1;
+    =======
+    const old = 2;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+_EXTRACT_SEARCH_REPLACE_WITH_MULTILINE_CONTENT = textwrap.dedent("""
+    src/types/index.ts
+    ```typescript
+    <<<<<<< SEARCH
+    export interface FileTreeNode {
+      name: string;
+      path: string;
+    }
+    =======
+    export interface FileTreeNode {
+      name: string;
+      path: string;
+      selection_state?: 'checked' | 'unchecked' | 'indeterminate';
+    }
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+_EXTRACT_SEARCH_REPLACE_COMPLEX_EXAMPLE = textwrap.dedent("""
+    src_v2/types/index.ts
+    ```typescript
+    <<<<<<< SEARCH
+    export interface FileTreeNode {
+      name: string;
+      path: string;
+      type: 'file' | 'directory';
+      children?: FileTreeNode[];
+      is_expanded?: boolean;
+      children_loaded?: boolean;
+      token_count?: number;
+      is_binary?: boolean;
+      is_test?: boolean;
+      extension?: string;
+      file_count?: number;
+      total_tokens?: number;
+      token_count?: number;
+    }
 
-def test_extract_basic_search_replace_block():
-    """Test extraction of a basic SEARCH/REPLACE block."""
-    content = textwrap.dedent("""
-        Here's the change for src/file.ts:
-
-        ```typescript
-        <<<<<<< SEARCH
-        const old = 1;
-        =======
-        const old = 2;
-        >>>>>>> REPLACE
-        ```
-    """)
-
-    blocks = extract_blocks_from_text(content)
-
-    assert len(blocks) == 1
-    block = blocks[0]
-
-    assert block["type"] == "file"
-    assert block["language"] == "typescript"
-    assert block["is_search_replace"] is True
-    assert block["old_content"] == "const old = 1;"
-    assert block["new_content"] == "const old = 2;"
-    assert block["file_path"] == "src/file.ts"
-
-
-def test_extract_search_replace_with_multiline_content():
-    """Test SEARCH/REPLACE block with multiline content."""
-    content = textwrap.dedent("""
-        src/types/index.ts
-        ```typescript
-        <<<<<<< SEARCH
-        export interface FileTreeNode {
-          name: string;
-          path: string;
-        }
-        =======
-        export interface FileTreeNode {
-          name: string;
-          path: string;
-          selection_state?: 'checked' | 'unchecked' | 'indeterminate';
-        }
-        >>>>>>> REPLACE
-        ```
-    """)
-
-    blocks = extract_blocks_from_text(content)
-
-    assert len(blocks) == 1
-    block = blocks[0]
+    export interface FileTreeData {
+      tree: FileTreeNode[];
+      state_version: number;
+    }
+    =======
+    export interface FileTreeNode {
+      name: string;
+      path: string;
+      type: 'file' | 'directory';
+      children?: FileTreeNode[];
+      is_expanded?: boolean;
+      children_loaded?: boolean;
+      token_count?: number;
+      is_binary?: boolean;
+      is_test?: boolean;
+      extension?: string;
+      file_count?: number;
+      total_tokens?: number;
+      selection_state?: 'checked' | 'unchecked' | 'indeterminate';
+    }
 
-    assert block["type"] == "file"
-    assert block["is_search_replace"] is True
-    assert "export interface FileTreeNode" in block["old_content"]
-    assert "selection_state?" in block["new_content"]
-    assert "selection_state?" not in block["old_content"]
-    assert block["file_path"] == "src/types/index.ts"
+    export interface FileTreeData {
+      tree: FileTreeNode[];
+      state_version: number;
+      selected_token_count?: number;
+    }
+    >>>>>>> REPLACE
+    ```
+""")
 
 
 def test_extract_search_replace_complex_example():
     """Test the exact SEARCH/REPLACE example from the user instructions."""
-    content = textwrap.dedent("""
-        src_v2/types/index.ts
-        ```typescript
-        <<<<<<< SEARCH
-        export interface FileTreeNode {
-          name: string;
-          path: string;
-          type: 'file' | 'directory';
-          children?: FileTreeNode[];
-          is_expanded?: boolean;
-          children_loaded?: boolean;
-          token_count?: number;
-          is_binary?: boolean;
-          is_test?: boolean;
-          extension?: string;
-          file_count?: number;
-          total_tokens?: number;
-          token_count?: number;
-        }
-
-        export interface FileTreeData {
-          tree: FileTreeNode[];
-          state_version: number;
-        }
-        =======
-        export interface FileTreeNode {
-          name: string;
-          path: string;
-          type: 'file' | 'directory';
-          children?: FileTreeNode[];
-          is_expanded?: boolean;
-          children_loaded?: boolean;
-          token_count?: number;
-          is_binary?: boolean;
-          is_test?: boolean;
-          extension?: string;
-          file_count?: number;
-          total_tokens?: number;
-          selection_state?: 'checked' | 'unchecked' | 'indeterminate';
-        }
-
-        export interface FileTreeData {
-          tree: FileTreeNode[];
-          state_version: number;
-          selected_token_count?: number;
-        }
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _EXTRACT_SEARCH_REPLACE_COMPLEX_EXAMPLE
 
     blocks = extract_blocks_from_text(content)
 
@@ -146,26 +121,35 @@ def test_extract_search_replace_complex_example():
     assert "selected_token_count?: number;" in block["new_content"]
 
 
-def test_plan_changes_recognizes_search_replace(tmp_path):
+_PLAN_CHANGES_RECOGNIZES_SEARCH_REPLACE = textwrap.dedent("""
+    src/app.ts
+    ```typescript
+    <<<<<<< SEARCH
+    const x = 1;
+    =======
+    const x = 2;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+@pytest.fixture(scope="module")
+def app_ts_root(tmp_path_factory):
+    """Read-only project shared by the planning and transform tests below."""
+    root = tmp_path_factory.mktemp("sr")
+    # Ensure src/app.ts exists so plan_changes doesn't force 'full_replacement'
+    (root / "src").mkdir()
+    (root / "src" / "app.ts").write_text("const x = 1;")
+    (root / "app.ts").write_text("const x = 1;\nconst y = 2;\n")
+    return root
+
+
+def test_plan_changes_recognizes_search_replace(app_ts_root):
     """Test that plan_changes correctly handles SEARCH/REPLACE blocks."""
-    content = textwrap.dedent("""
-        src/app.ts
-        ```typescript
-        <<<<<<< SEARCH
-        const x = 1;
-        =======
-        const x = 2;
-        >>>>>>> REPLACE
-        ```
-    """)
-
-    # Ensure the file exists so plan_changes doesn't force 'full_replacement'
-    p = tmp_path / "src" / "app.ts"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text("const x = 1;")
+    content = _PLAN_CHANGES_RECOGNIZES_SEARCH_REPLACE
 
     blocks = extract_blocks_from_text(content)
-    plans = plan_changes(blocks, str(tmp_path))
+    plans = plan_changes(blocks, str(app_ts_root))
 
     assert len(plans) == 1
     plan = plans[0]
@@ -176,12 +160,8 @@ def test_plan_changes_recognizes_search_replace(tmp_path):
     assert plan["block"]["is_search_replace"] is True
 
 
-def test_apply_change_smartly_with_search_replace(tmp_path):
+def test_apply_change_smartly_with_search_replace(app_ts_root):
     """Test that apply_change_smartly applies SEARCH/REPLACE correctly."""
-    # Create a file with original content
-    test_file = tmp_path / "app.ts"
-    test_file.write_text("const x = 1;\nconst y = 2;\n")
-
     # Create a SEARCH/REPLACE plan
     plan = {
         "metadata": {
@@ -197,7 +177,8 @@ def test_apply_change_smartly_with_search_replace(tmp_path):
         },
     }
 
-    result, logs = apply_change_smartly(plan, str(tmp_path))
+    # apply_change_smartly only reads app.ts, so the shared project stays pristine
+    result, logs = apply_change_smartly(plan, str(app_ts_root))
 
     assert result is not None
     assert "const x = 10;" in result["new_content"]
@@ -205,27 +186,30 @@ def test_apply_change_smartly_with_search_replace(tmp_path):
     assert "const x = 1;" not in result["new_content"]  # Old line replaced
 
 
+_MULTIPLE_SEARCH_REPLACE_BLOCKS = textwrap.dedent("""
+    First change for src/a.ts:
+    ```typescript
+    <<<<<<< SEARCH
+    const a = 1;
+    =======
+    const a = 2;
+    >>>>>>> REPLACE
+    ```
+
+    Second change for src/b.ts:
+    ```typescript
+    <<<<<<< SEARCH
+    const b = 1;
+    =======
+    const b = 2;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
 def test_multiple_search_replace_blocks():
     """Test extraction of multiple SEARCH/REPLACE blocks."""
-    content = textwrap.dedent("""
-        First change for src/a.ts:
-        ```typescript
-        <<<<<<< SEARCH
-        const a = 1;
-        =======
-        const a = 2;
-        >>>>>>> REPLACE
-        ```
-
-        Second change for src/b.ts:
-        ```typescript
-        <<<<<<< SEARCH
-        const b = 1;
-        =======
-        const b = 2;
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _MULTIPLE_SEARCH_REPLACE_BLOCKS
 
     blocks = extract_blocks_from_text(content)
 
@@ -240,58 +224,121 @@ def test_multiple_search_replace_blocks():
     assert blocks[1]["new_content"] == "const b = 2;"
 
 
-def test_search_replace_without_file_path():
-    """Test SEARCH/REPLACE block without explicit file path."""
-    content = textwrap.dedent("""
-        ```python
-        <<<<<<< SEARCH
-        x = 1
-        =======
-        x = 2
-        >>>>>>> REPLACE
-        ```
-    """)
+_SEARCH_REPLACE_WITHOUT_FILE_PATH = textwrap.dedent("""
+    ```python
+    <<<<<<< SEARCH
+    x = 1
+    =======
+    x = 2
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+_EXTRACT_CHEVRON_BLOCK_BASIC = textwrap.dedent("""
+    Here are the changes:
+
+    ```tsx
+    // src/components/Example.tsx
+
+    <<<<
+    const old = 1;
+    ====
+    const old = 2;
+    >>>>
+    ```
+""")
+
+
+_EXTRACT_CHEVRON_BLOCK_WITH_DELETION = textwrap.dedent("""
+    ```tsx
+    // src/components/Panel.tsx
+
+    // Remove the block
+    <<<<
+    {/* Old content to remove */}
+    <div className="old-stuff">
+      Remove this
+    </div>
+    ====
+    >>>>
+    ```
+""")
+
+
+_EXTRACT_MULTIPLE_CHEVRON_BLOCKS_SAME_FILE = textwrap.dedent("""
+    ```tsx
+    // src/components/ContextPanel.tsx
+
+    // Modify the first block
+    <<<<
+    {enableAutoContext && (filteredSuggestions.length > 0) && (
+    ====
+    {enableAutoContext && isOpen && (filteredSuggestions.length > 0) && (
+    >>>>
+
+    // Remove the second block
+    <<<<
+    {/* Dependency Suggestions */}
+    <div className="dependency-block">
+      Content here
+    </div>
+    ====
+    >>>>
+    ```
+""")
+
+
+def test_extract_multiple_chevron_blocks_same_file():
+    """Test multiple chevron blocks in the same fence."""
+    content = _EXTRACT_MULTIPLE_CHEVRON_BLOCKS_SAME_FILE
 
     blocks = extract_blocks_from_text(content)
 
-    assert len(blocks) == 1
-    block = blocks[0]
-
-    assert block["type"] == "file"
-    assert block["is_search_replace"] is True
-    assert block["file_path"] is None  # No path hint found
-    assert block["old_content"] == "x = 1"
-    assert block["new_content"] == "x = 2"
+    assert len(blocks) == 2
+    assert all(b["type"] == "file" for b in blocks)
+    assert all(b["is_search_replace"] for b in blocks)
+    assert all(b["file_path"] == "src/components/ContextPanel.tsx" for b in blocks)
+
+    # First block is a modification
+    assert "isOpen" in blocks[0]["new_content"]
+
+    # Second block is a deletion
+    assert blocks[1]["new_content"] == ""
+    assert "Dependency Suggestions" in blocks[1]["old_content"]
+
+
+_MULTIPLE_SEARCH_REPLACE_BLOCKS_IN_SAME_FENCE = textwrap.dedent("""
+    src_v2/components/workspace/ContextPanel.tsx
+    ```tsx
+    <<<<<<< SEARCH
+    const x = 1;
+    const y = 2;
+    =======
+    const x = 10;
+    const y = 20;
+    >>>>>>> REPLACE
+    <<<<<<< SEARCH
+    function doSomething() {
+      console.log("old");
+    }
+    =======
+    function doSomething() {
+      console.log("new");
+    }
+    >>>>>>> REPLACE
+    <<<<<<< SEARCH
+    export default App;
+    =======
+    export default ContextPanel;
+    >>>>>>> REPLACE
+    ```
+""")
 
 
 def test_multiple_search_replace_blocks_in_same_fence():
     """Test extraction of multiple SEARCH/REPLACE blocks within the same fenced code block."""
-    content = textwrap.dedent("""
-        src_v2/components/workspace/ContextPanel.tsx
-        ```tsx
-        <<<<<<< SEARCH
-        const x = 1;
-        const y = 2;
-        =======
-        const x = 10;
-        const y = 20;
-        >>>>>>> REPLACE
-        <<<<<<< SEARCH
-        function doSomething() {
-          console.log("old");
-        }
-        =======
-        function doSomething() {
-          console.log("new");
-        }
-        >>>>>>> REPLACE
-        <<<<<<< SEARCH
-        export default App;
-        =======
-        export default ContextPanel;
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _MULTIPLE_SEARCH_REPLACE_BLOCKS_IN_SAME_FENCE
 
     blocks = extract_blocks_from_text(content)
 
@@ -317,48 +364,51 @@ def test_multiple_search_replace_blocks_in_same_fence():
     assert blocks[2]["new_content"] == "export default ContextPanel;"
 
 
+_MULTIPLE_SEARCH_REPLACE_BLOCKS_REALISTIC_EXAMPLE = textwrap.dedent("""
+    src_v2/components/workspace/ContextPanel.tsx
+    ```tsx
+    <<<<<<< SEARCH
+      const { 
+        items: conversationItems, 
+        clearItems: clearConversationItems,
+        getTotalTokenCount: getContextTokenCount 
+      } = useConversationContextStore();
+    =======
+      const { 
+        items: conversationItems, 
+        clearItems: clearConversationItems,
+        getTotalTokenCount: getContextTokenCount 
+      } = useConversationContextStore();
+
+      // New wrapper function added
+      const onGenerateProposal = useCallback(() => {
+        onGenerate();
+      }, [onGenerate]);
+    >>>>>>> REPLACE
+    <<<<<<< SEARCH
+        // Ctrl/Cmd + Enter to generate
+        if ((e.ctrlKey || e.metaKey) && e.key === 'Enter') {
+          e.preventDefault();
+          if (!isGenerating && instructions.trim()) {
+            onGenerate();
+          }
+        }
+    =======
+        // Ctrl/Cmd + Enter to generate
+        if ((e.ctrlKey || e.metaKey) && e.key === 'Enter') {
+          e.preventDefault();
+          if (!isGenerating && instructions.trim()) {
+            onGenerateProposal();
+          }
+        }
+    >>>>>>> REPLACE
+    ```
+""")
+
+
 def test_multiple_search_replace_blocks_realistic_example():
     """Test the exact pattern from user's example with multiple blocks in same fence."""
-    content = textwrap.dedent("""
-        src_v2/components/workspace/ContextPanel.tsx
-        ```tsx
-        <<<<<<< SEARCH
-          const { 
-            items: conversationItems, 
-            clearItems: clearConversationItems,
-            getTotalTokenCount: getContextTokenCount 
-          } = useConversationContextStore();
-        =======
-          const { 
-            items: conversationItems, 
-            clearItems: clearConversationItems,
-            getTotalTokenCount: getContextTokenCount 
-          } = useConversationContextStore();
-
-          // New wrapper function added
-          const onGenerateProposal = useCallback(() => {
-            onGenerate();
-          }, [onGenerate]);
-        >>>>>>> REPLACE
-        <<<<<<< SEARCH
-            // Ctrl/Cmd + Enter to generate
-            if ((e.ctrlKey || e.metaKey) && e.key === 'Enter') {
-              e.preventDefault();
-              if (!isGenerating && instructions.trim()) {
-                onGenerate();
-              }
-            }
-        =======
-            // Ctrl/Cmd + Enter to generate
-            if ((e.ctrlKey || e.metaKey) && e.key === 'Enter') {
-              e.preventDefault();
-              if (!isGenerating && instructions.trim()) {
-                onGenerateProposal();
-              }
-            }
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _MULTIPLE_SEARCH_REPLACE_BLOCKS_REALISTIC_EXAMPLE
 
     blocks = extract_blocks_from_text(content)
 
@@ -379,32 +429,35 @@ def test_multiple_search_replace_blocks_realistic_example():
     assert "onGenerateProposal();" in blocks[1]["new_content"]
 
 
+_MULTIPLE_FILES_WITH_MULTIPLE_SEARCH_REPLACE_BLOCKS = textwrap.dedent("""
+    src/file1.ts
+    ```typescript
+    <<<<<<< SEARCH
+    const a = 1;
+    =======
+    const a = 10;
+    >>>>>>> REPLACE
+    <<<<<<< SEARCH
+    const b = 2;
+    =======
+    const b = 20;
+    >>>>>>> REPLACE
+    ```
+
+    src/file2.ts
+    ```typescript
+    <<<<<<< SEARCH
+    const c = 3;
+    =======
+    const c = 30;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
 def test_multiple_files_with_multiple_search_replace_blocks():
     """Test extraction from multiple files, each with multiple SEARCH/REPLACE blocks."""
-    content = textwrap.dedent("""
-        src/file1.ts
-        ```typescript
-        <<<<<<< SEARCH
-        const a = 1;
-        =======
-        const a = 10;
-        >>>>>>> REPLACE
-        <<<<<<< SEARCH
-        const b = 2;
-        =======
-        const b = 20;
-        >>>>>>> REPLACE
-        ```
-
-        src/file2.ts
-        ```typescript
-        <<<<<<< SEARCH
-        const c = 3;
-        =======
-        const c = 30;
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _MULTIPLE_FILES_WITH_MULTIPLE_SEARCH_REPLACE_BLOCKS
 
     blocks = extract_blocks_from_text(content)
 
@@ -421,100 +474,148 @@ def test_multiple_files_with_multiple_search_replace_blocks():
     assert blocks[2]["old_content"] == "const c = 3;"
 
 
-def test_file_prefix_format():
-    """Test extraction with 'File: path/to/file.ext' format."""
-    content = textwrap.dedent("""
-        File: V2/app/services/llm.py
-        ```python
-        <<<<<<< SEARCH
-        queue = asyncio.Queue()
-        =======
-        queue = asyncio.Queue()
-        proposal_ref = {"id": None}
-        >>>>>>> REPLACE
-        ```
-    """)
-
-    blocks = extract_blocks_from_text(content)
-
-    assert len(blocks) == 1
-    block = blocks[0]
-
-    assert block["type"] == "file"
-    assert block["is_search_replace"] is True
-    assert block["file_path"] == "V2/app/services/llm.py"
-    assert block["language"] == "python"
-    assert "queue = asyncio.Queue()" in block["old_content"]
-    assert "proposal_ref" in block["new_content"]
-
-
-def test_language_filepath_format():
-    """Test extraction with 'language:filepath' fence format."""
-    content = textwrap.dedent("""
-        ```python:src/utils/helpers.py
-        <<<<<<< SEARCH
-        def old_func():
-            pass
-        =======
-        def new_func():
-            return True
-        >>>>>>> REPLACE
-        ```
-    """)
-
-    blocks = extract_blocks_from_text(content)
-
-    assert len(blocks) == 1
-    block = blocks[0]
-
-    assert block["type"] == "file"
-    assert block["is_search_replace"] is True
-    assert block["file_path"] == "src/utils/helpers.py"
-    assert block["language"] == "python"
-    assert "def old_func():" in block["old_content"]
-    assert "def new_func():" in block["new_content"]
-
-
-def test_chevron_with_file_prefix():
-    """Test chevron-style blocks with 'File: path' format."""
-    content = textwrap.dedent("""
-        File: V2/app/services/llm.py
-        ```python
-        <<<<
-        queue = asyncio.Queue()
-        ====
-        queue = asyncio.Queue()
-        proposal_ref = {"id": None}
-        >>>>
-        ```
-    """)
-
-    blocks = extract_blocks_from_text(content)
-
-    assert len(blocks) == 1
-    block = blocks[0]
-
-    assert block["type"] == "file"
-    assert block["is_search_replace"] is True
-    assert block["file_path"] == "V2/app/services/llm.py"
-    assert "queue = asyncio.Queue()" in block["old_content"]
-    assert "proposal_ref" in block["new_content"]
-
-
-def test_chevron_with_language_filepath():
-    """Test chevron-style blocks with 'language:filepath' format."""
-    content = textwrap.dedent("""
-        ```tsx:src_v2/components/workspace/WorkspacePage.tsx
-        <<<<
-        } else if (msg.type === 'chunk') {
-        ====
-        } else if (msg.type === 'error') {
-          toast.error(msg.message);
-        } else if (msg.type === 'chunk') {
-        >>>>
-        ```
-    """)
-
+_FILE_PREFIX_FORMAT = textwrap.dedent("""
+    File: V2/app/services/llm.py
+    ```python
+    <<<<<<< SEARCH
+    queue = asyncio.Queue()
+    =======
+    queue = asyncio.Queue()
+    proposal_ref = {"id": None}
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+_LANGUAGE_FILEPATH_FORMAT = textwrap.dedent("""
+    ```python:src/utils/helpers.py
+    <<<<<<< SEARCH
+    def old_func():
+        pass
+    =======
+    def new_func():
+        return True
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+_CHEVRON_WITH_FILE_PREFIX = textwrap.dedent("""
+    File: V2/app/services/llm.py
+    ```python
+    <<<<
+    queue = asyncio.Queue()
+    ====
+    queue = asyncio.Queue()
+    proposal_ref = {"id": None}
+    >>>>
+    ```
+""")
+
+
+_CHEVRON_WITH_LANGUAGE_FILEPATH = textwrap.dedent("""
+    ```tsx:src_v2/components/workspace/WorkspacePage.tsx
+    <<<<
+    } else if (msg.type === 'chunk') {
+    ====
+    } else if (msg.type === 'error') {
+      toast.error(msg.message);
+    } else if (msg.type === 'chunk') {
+    >>>>
+    ```
+""")
+
+
+# Fences holding a single SEARCH/REPLACE or chevron block: (content, expected fields).
+_SINGLE_BLOCK_CASES = [
+    pytest.param(
+        _EXTRACT_BASIC_SEARCH_REPLACE_BLOCK,
+        {
+            "language": "typescript",
+            "old_content": "const old = 1;",
+            "new_content": "const old = 2;",
+            "file_path": "src/file.ts",
+        },
+        id="basic_search_replace",
+    ),
+    pytest.param(
+        _EXTRACT_SEARCH_REPLACE_WITH_MULTILINE_CONTENT,
+        {
+            "old_content": "export interface FileTreeNode {\n  name: string;\n  path: string;\n}",
+            "new_content": (
+                "export interface FileTreeNode {\n  name: string;\n  path: string;\n"
+                "  selection_state?: 'checked' | 'unchecked' | 'indeterminate';\n}"
+            ),
+            "file_path": "src/types/index.ts",
+        },
+        id="multiline_content",
+    ),
+    pytest.param(
+        _SEARCH_REPLACE_WITHOUT_FILE_PATH,
+        {"file_path": None, "old_content": "x = 1", "new_content": "x = 2"},
+        id="no_path_hint",
+    ),
+    pytest.param(
+        _EXTRACT_CHEVRON_BLOCK_BASIC,
+        {
+            "language": "tsx",
+            "old_content": "const old = 1;",
+            "new_content": "const old = 2;",
+            "file_path": "src/components/Example.tsx",
+        },
+        id="chevron_basic",
+    ),
+    pytest.param(
+        _EXTRACT_CHEVRON_BLOCK_WITH_DELETION,
+        {
+            "old_content": (
+                '{/* Old content to remove */}\n<div className="old-stuff">\n  Remove this\n</div>'
+            ),
+            "new_content": "",
+            "file_path": "src/components/Panel.tsx",
+        },
+        id="chevron_deletion",
+    ),
+    pytest.param(
+        _FILE_PREFIX_FORMAT,
+        {
+            "file_path": "V2/app/services/llm.py",
+            "language": "python",
+            "old_content": "queue = asyncio.Queue()",
+            "new_content": 'queue = asyncio.Queue()\nproposal_ref = {"id": None}',
+        },
+        id="file_prefix",
+    ),
+    pytest.param(
+        _LANGUAGE_FILEPATH_FORMAT,
+        {
+            "file_path": "src/utils/helpers.py",
+            "language": "python",
+            "old_content": "def old_func():\n    pass",
+            "new_content": "def new_func():\n    return True",
+        },
+        id="language_filepath",
+    ),
+    pytest.param(
+        _CHEVRON_WITH_FILE_PREFIX,
+        {
+            "file_path": "V2/app/services/llm.py",
+            "old_content": "queue = asyncio.Queue()",
+            "new_content": 'queue = asyncio.Queue()\nproposal_ref = {"id": None}',
+        },
+        id="chevron_file_prefix",
+    ),
+    pytest.param(
+        _CHEVRON_WITH_LANGUAGE_FILEPATH,
+        {"file_path": "src_v2/components/workspace/WorkspacePage.tsx", "language": "tsx"},
+        id="chevron_language_filepath",
+    ),
+]
+
+
+@pytest.mark.parametrize("content,expected", _SINGLE_BLOCK_CASES)
+def test_extract_single_search_replace_block(content, expected):
+    """Each fixture yields exactly one SEARCH/REPLACE block with the expected fields."""
     blocks = extract_blocks_from_text(content)
 
     assert len(blocks) == 1
@@ -522,34 +623,37 @@ def test_chevron_with_language_filepath():
 
     assert block["type"] == "file"
     assert block["is_search_replace"] is True
-    assert block["file_path"] == "src_v2/components/workspace/WorkspacePage.tsx"
-    assert block["language"] == "tsx"
+    for key, value in expected.items():
+        assert block[key] == value, key
+
+
+_MULTIPLE_CHEVRON_BLOCKS_WITH_FILE_PREFIX = textwrap.dedent("""
+    File: V2/app/services/llm.py
+    ```python
+    <<<<
+    queue = asyncio.Queue()
+    ====
+    queue = asyncio.Queue()
+    proposal_ref = {"id": None}
+    >>>>
+    ```
+
+    File: src_v2/components/workspace/WorkspacePage.tsx
+    ```tsx
+    <<<<
+    } else if (msg.type === 'chunk') {
+    ====
+    } else if (msg.type === 'error') {
+      toast.error(msg.message);
+    } else if (msg.type === 'chunk') {
+    >>>>
+    ```
+""")
 
 
 def test_multiple_chevron_blocks_with_file_prefix():
     """Test multiple chevron blocks for different files with File: prefix."""
-    content = textwrap.dedent("""
-        File: V2/app/services/llm.py
-        ```python
-        <<<<
-        queue = asyncio.Queue()
-        ====
-        queue = asyncio.Queue()
-        proposal_ref = {"id": None}
-        >>>>
-        ```
-
-        File: src_v2/components/workspace/WorkspacePage.tsx
-        ```tsx
-        <<<<
-        } else if (msg.type === 'chunk') {
-        ====
-        } else if (msg.type === 'error') {
-          toast.error(msg.message);
-        } else if (msg.type === 'chunk') {
-        >>>>
-        ```
-    """)
+    content = _MULTIPLE_CHEVRON_BLOCKS_WITH_FILE_PREFIX
 
     blocks = extract_blocks_from_text(content)
 
@@ -562,88 +666,91 @@ def test_multiple_chevron_blocks_with_file_prefix():
     assert blocks[1]["language"] == "tsx"
 
 
-def test_file_header_with_multiple_separate_fences_search_replace():
-    """Test File: header applying to multiple separate SEARCH/REPLACE fences."""
-    content = textwrap.dedent("""
-        File: src_v2/components/workspace/ContextPanel.tsx
-
-        ```tsx
-        <<<<<<< SEARCH
-          const handleGenerateButtonTouchEnd = useCallback((e: React.TouchEvent) => {
-            if (longPressTimer) {
-              e.preventDefault();
-              clearTimeout(longPressTimer);
-              setLongPressTimer(null);
-
-              const touch = e.changedTouches[0];
-              if (touchStartPos) {
-                const dx = Math.abs(touch.clientX - touchStartPos.x);
-                const dy = Math.abs(touch.clientY - touchStartPos.y);
-
-                if (dx < 10 && dy < 10) {
-                   if (!isGenerating && instructions.trim()) {
-                     handleGenerateWithContext();
-                   }
-                }
-              }
+_FILE_HEADER_WITH_MULTIPLE_SEPARATE_FENCES_SEARCH_REPLACE = textwrap.dedent("""
+    File: src_v2/components/workspace/ContextPanel.tsx
+
+    ```tsx
+    <<<<<<< SEARCH
+      const handleGenerateButtonTouchEnd = useCallback((e: React.TouchEvent) => {
+        if (longPressTimer) {
+          e.preventDefault();
+          clearTimeout(longPressTimer);
+          setLongPressTimer(null);
+
+          const touch = e.changedTouches[0];
+          if (touchStartPos) {
+            const dx = Math.abs(touch.clientX - touchStartPos.x);
+            const dy = Math.abs(touch.clientY - touchStartPos.y);
+
+            if (dx < 10 && dy < 10) {
+               if (!isGenerating && instructions.trim()) {
+                 handleGenerateWithContext();
+               }
             }
-            setTouchStartPos(null);
-          }, [longPressTimer, touchStartPos, isGenerating, instructions, handleGenerateWithContext]);
-        =======
-          const handleGenerateButtonTouchEnd = useCallback((e: React.TouchEvent) => {
-            if (longPressTimer) {
-              e.preventDefault();
-              clearTimeout(longPressTimer);
-              setLongPressTimer(null);
-
-              const touch = e.changedTouches[0];
-              if (touchStartPos) {
-                const dx = Math.abs(touch.clientX - touchStartPos.x);
-                const dy = Math.abs(touch.clientY - touchStartPos.y);
-
-                if (dx < 10 && dy < 10) {
-                   if (instructions.trim() && filesForClipboard.length > 0) {
-                     handleGenerateWithContext();
-                   }
-                }
-              }
+          }
+        }
+        setTouchStartPos(null);
+      }, [longPressTimer, touchStartPos, isGenerating, instructions, handleGenerateWithContext]);
+    =======
+      const handleGenerateButtonTouchEnd = useCallback((e: React.TouchEvent) => {
+        if (longPressTimer) {
+          e.preventDefault();
+          clearTimeout(longPressTimer);
+          setLongPressTimer(null);
+
+          const touch = e.changedTouches[0];
+          if (touchStartPos) {
+            const dx = Math.abs(touch.clientX - touchStartPos.x);
+            const dy = Math.abs(touch.clientY - touchStartPos.y);
+
+            if (dx < 10 && dy < 10) {
+               if (instructions.trim() && filesForClipboard.length > 0) {
+                 handleGenerateWithContext();
+               }
             }
-            setTouchStartPos(null);
-          }, [longPressTimer, touchStartPos, instructions, filesForClipboard, handleGenerateWithContext]);
-        >>>>>>> REPLACE
-        ```
-
-        ```tsx
-        <<<<<<< SEARCH
-                  <Button
-                    onClick={handleGenerateWithContext}
-                    disabled={isGenerating || !instructions.trim()}
-                    className="flex-1"
-                  >
-                    {isGenerating ? (
-                      <>
-                        <Loader2 className="mr-2 h-4 w-4 animate-spin" />
-                        Generating...
-                      </>
-                    ) : (
-                      <>
-                        <Sparkles className="mr-2 h-4 w-4" />
-                        {selectedModelName}
-                      </>
-                    )}
-                  </Button>
-        =======
-                  <Button
-                    onClick={handleGenerateWithContext}
-                    disabled={!instructions.trim() || filesForClipboard.length === 0}
-                    className="flex-1"
-                  >
+          }
+        }
+        setTouchStartPos(null);
+      }, [longPressTimer, touchStartPos, instructions, filesForClipboard, handleGenerateWithContext]);
+    >>>>>>> REPLACE
+    ```
+
+    ```tsx
+    <<<<<<< SEARCH
+              <Button
+                onClick={handleGenerateWithContext}
+                disabled={isGenerating || !instructions.trim()}
+                className="flex-1"
+              >
+                {isGenerating ? (
+                  <>
+                    <Loader2 className="mr-2 h-4 w-4 animate-spin" />
+                    Generating...
+                  </>
+                ) : (
+                  <>
                     <Sparkles className="mr-2 h-4 w-4" />
                     {selectedModelName}
-                  </Button>
-        >>>>>>> REPLACE
-        ```
-    """)
+                  </>
+                )}
+              </Button>
+    =======
+              <Button
+                onClick={handleGenerateWithContext}
+                disabled={!instructions.trim() || filesForClipboard.length === 0}
+                className="flex-1"
+              >
+                <Sparkles className="mr-2 h-4 w-4" />
+                {selectedModelName}
+              </Button>
+    >>>>>>> REPLACE
+    ```
+""")
+
+
+def test_file_header_with_multiple_separate_fences_search_replace():
+    """Test File: header applying to multiple separate SEARCH/REPLACE fences."""
+    content = _FILE_HEADER_WITH_MULTIPLE_SEPARATE_FENCES_SEARCH_REPLACE
 
     blocks = extract_blocks_from_text(content)
 
@@ -666,32 +773,35 @@ def test_file_header_with_multiple_separate_fences_search_replace():
     assert "disabled={!instructions.trim() || filesForClipboard.length === 0}" in blocks[1]["new_content"]
 
 
+_FILE_HEADER_WITH_MULTIPLE_SEPARATE_FENCES_CHEVRON = textwrap.dedent("""
+    File: src/utils/helpers.py
+
+    ```python
+    <<<<
+    def old_func():
+        pass
+    ====
+    def new_func():
+        return True
+    >>>>
+    ```
+
+    ```python
+    <<<<
+    class OldClass:
+        pass
+    ====
+    class NewClass:
+        def __init__(self):
+            self.value = 42
+    >>>>
+    ```
+""")
+
+
 def test_file_header_with_multiple_separate_fences_chevron():
     """Test File: header applying to multiple separate chevron-style fences."""
-    content = textwrap.dedent("""
-        File: src/utils/helpers.py
-
-        ```python
-        <<<<
-        def old_func():
-            pass
-        ====
-        def new_func():
-            return True
-        >>>>
-        ```
-
-        ```python
-        <<<<
-        class OldClass:
-            pass
-        ====
-        class NewClass:
-            def __init__(self):
-                self.value = 42
-        >>>>
-        ```
-    """)
+    content = _FILE_HEADER_WITH_MULTIPLE_SEPARATE_FENCES_CHEVRON
 
     blocks = extract_blocks_from_text(content)
 
@@ -710,45 +820,48 @@ def test_file_header_with_multiple_separate_fences_chevron():
     assert "class NewClass:" in blocks[1]["new_content"]
 
 
+_MULTIPLE_FILE_HEADERS_WITH_MULTIPLE_FENCES = textwrap.dedent("""
+    File: src/file1.ts
+
+    ```typescript
+    <<<<<<< SEARCH
+    const a = 1;
+    =======
+    const a = 10;
+    >>>>>>> REPLACE
+    ```
+
+    ```typescript
+    <<<<<<< SEARCH
+    const b = 2;
+    =======
+    const b = 20;
+    >>>>>>> REPLACE
+    ```
+
+    File: src/file2.ts
+
+    ```typescript
+    <<<<<<< SEARCH
+    const c = 3;
+    =======
+    const c = 30;
+    >>>>>>> REPLACE
+    ```
+
+    ```typescript
+    <<<<<<< SEARCH
+    const d = 4;
+    =======
+    const d = 40;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
 def test_multiple_file_headers_with_multiple_fences():
     """Test multiple File: headers, each with multiple fences."""
-    content = textwrap.dedent("""
-        File: src/file1.ts
-
-        ```typescript
-        <<<<<<< SEARCH
-        const a = 1;
-        =======
-        const a = 10;
-        >>>>>>> REPLACE
-        ```
-
-        ```typescript
-        <<<<<<< SEARCH
-        const b = 2;
-        =======
-        const b = 20;
-        >>>>>>> REPLACE
-        ```
-
-        File: src/file2.ts
-
-        ```typescript
-        <<<<<<< SEARCH
-        const c = 3;
-        =======
-        const c = 30;
-        >>>>>>> REPLACE
-        ```
-
-        ```typescript
-        <<<<<<< SEARCH
-        const d = 4;
-        =======
-        const d = 40;
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _MULTIPLE_FILE_HEADERS_WITH_MULTIPLE_FENCES
 
     blocks = extract_blocks_from_text(content)
 
@@ -767,29 +880,32 @@ def test_multiple_file_headers_with_multiple_fences():
     assert blocks[3]["old_content"] == "const d = 4;"
 
 
+_FILE_HEADER_SCOPE_ENDS_AT_NEXT_FILE_HEADER = textwrap.dedent("""
+    File: src/first.ts
+
+    ```typescript
+    <<<<<<< SEARCH
+    const first = 1;
+    =======
+    const first = 10;
+    >>>>>>> REPLACE
+    ```
+
+    File: src/second.ts
+
+    ```typescript
+    <<<<<<< SEARCH
+    const second = 2;
+    =======
+    const second = 20;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
 def test_file_header_scope_ends_at_next_file_header():
     """Test that a File: header scope ends when the next File: header starts."""
-    content = textwrap.dedent("""
-        File: src/first.ts
-
-        ```typescript
-        <<<<<<< SEARCH
-        const first = 1;
-        =======
-        const first = 10;
-        >>>>>>> REPLACE
-        ```
-
-        File: src/second.ts
-
-        ```typescript
-        <<<<<<< SEARCH
-        const second = 2;
-        =======
-        const second = 20;
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _FILE_HEADER_SCOPE_ENDS_AT_NEXT_FILE_HEADER
 
     blocks = extract_blocks_from_text(content)
 
@@ -798,35 +914,38 @@ def test_file_header_scope_ends_at_next_file_header():
     assert blocks[1]["file_path"] == "src/second.ts"
 
 
+_MIXED_FILE_HEADER_FORMATS = textwrap.dedent("""
+    File: src/file1.ts
+
+    ```typescript
+    <<<<<<< SEARCH
+    const a = 1;
+    =======
+    const a = 10;
+    >>>>>>> REPLACE
+    ```
+
+    ```typescript
+    <<<<<<< SEARCH
+    const b = 2;
+    =======
+    const b = 20;
+    >>>>>>> REPLACE
+    ```
+
+    ```typescript:src/file2.ts
+    <<<<<<< SEARCH
+    const c = 3;
+    =======
+    const c = 30;
+    >>>>>>> REPLACE
+    ```
+""")
+
+
 def test_mixed_file_header_formats():
     """Test mixing File: header format with other path formats."""
-    content = textwrap.dedent("""
-        File: src/file1.ts
-
-        ```typescript
-        <<<<<<< SEARCH
-        const a = 1;
-        =======
-        const a = 10;
-        >>>>>>> REPLACE
-        ```
-
-        ```typescript
-        <<<<<<< SEARCH
-        const b = 2;
-        =======
-        const b = 20;
-        >>>>>>> REPLACE
-        ```
-
-        ```typescript:src/file2.ts
-        <<<<<<< SEARCH
-        const c = 3;
-        =======
-        const c = 30;
-        >>>>>>> REPLACE
-        ```
-    """)
+    content = _MIXED_FILE_HEADER_FORMATS
 
     blocks = extract_blocks_from_text(content)
 
@@ -1,5 +1,4 @@
 import logging
-import os
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -29,20 +28,20 @@ def test_parse_markdown_string(mock_extract_blocks):
     ]
 
     with patch("contextforge.core.extract_file_info_from_context_and_code") as mock_extract_info:
-        # Configure mock for different calls
-        mock_extract_info.side_effect = [
-            # Call for item 1
-            {"file_path": "file1.py", "change_type": "diff"},
-            # Call for item 3
-            {"file_path": "path/to/file3.py", "change_type": "full_replacement"},
-            # Call for item 4
-            {"file_path": "file4.py", "change_type": "full_replacement"}, # Not a 'diff' change_type
-            # Call for item 5
-            None,
-        ]
+        # Classification per block, keyed by code so call order doesn't matter
+        infos = {
+            "diff_code": {"file_path": "file1.py", "change_type": "diff"},
+            "file_code_2": {"file_path": "path/to/file3.py", "change_type": "full_replacement"},
+            "diff_code_2": {"file_path": "file4.py", "change_type": "full_replacement"}, # Not a 'diff' change_type
+            "file_code_3": None,
+        }
+        mock_extract_info.side_effect = lambda context, code: infos[code]
 
         result = list(parse_markdown_string("some markdown"))
 
+        # Item 2 carries a path hint, so only the other four are classified
+        assert sorted(c.args[1] for c in mock_extract_info.call_args_list) == sorted(infos)
+
         assert len(result) == 5
 
         # 1. Test synthetic diff
@@ -93,14 +92,19 @@ def test_plan_and_generate_changes_full_replacement_with_truncation(tmp_path, ca
         assert len(result) == 1  # sanity
 
 
-def test_plan_and_generate_changes_read_error(tmp_path, caplog):
+@pytest.fixture(scope="module")
+def seeded_dir(tmp_path_factory):
+    """A directory holding test.txt, shared by the tests that only ever read it."""
+    d = tmp_path_factory.mktemp("seed")
+    (d / "test.txt").write_text("original content")
+    return d
+
+
+def test_plan_and_generate_changes_read_error(seeded_dir, caplog, monkeypatch):
     """
     Tests that a warning is logged if reading an existing file fails.
     """
-    file_path = tmp_path / "test.txt"
-    # Create the file but then cause a read error
-    file_path.write_text("initial content")
-
+    # The file exists, but reading it fails
     planned_changes = [
         {
             "metadata": {"file_path": "test.txt", "change_type": "full_replacement"},
@@ -108,109 +112,97 @@ def test_plan_and_generate_changes_read_error(tmp_path, caplog):
         }
     ]
 
-    with patch("builtins.open", side_effect=IOError("Read failed")):
-        with caplog.at_level(logging.WARNING):
-            result = plan_and_generate_changes(planned_changes, str(tmp_path))
-            assert "WARNING: Could not read original file" in caplog.text
-            # It should proceed as if the file was empty
-            assert result[0].original_content == ""
-            assert result[0].new_content == "new content"
-
-@patch("contextforge.core.patch_text")
-@patch("contextforge.core.patch_fromstring")
-def test_diff_patch_standard_success(mock_fromstring, mock_patch_text, tmp_path):
-    file_path = tmp_path / "test.txt"
-    file_path.write_text("original content")
-    diff_block = {
-        "code": "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1 @@\n-original content\n+new content",
-        "block_id": 0
-    }
-    plan = [{"metadata": {"file_path": "test.txt", "change_type": "diff"}, "block": diff_block}]
-    mock_patch_set_success = MagicMock()
-    mock_patch_set_success.apply.return_value = b"successfully patched content"
-    mock_fromstring.return_value = mock_patch_set_success
-
-    result = plan_and_generate_changes(plan, str(tmp_path))
-    assert len(result) == 1
-    assert result[0].new_content == "successfully patched content"
-    assert not mock_patch_text.called
-
-@patch("contextforge.core.patch_text")
-@patch("contextforge.core.patch_fromstring")
-def test_diff_patch_standard_fails_fuzzy_succeeds(mock_fromstring, mock_patch_text, tmp_path):
-    file_path = tmp_path / "test.txt"
-    file_path.write_text("original content")
-    diff_block = {
-        "code": "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1 @@\n-original content\n+new content",
-        "block_id": 0
-    }
-    plan = [{"metadata": {"file_path": "test.txt", "change_type": "diff"}, "block": diff_block}]
-    mock_fromstring.side_effect = ValueError("standard patch failed")
-    mock_patch_text.return_value = "fuzzy patched content"
-
-    result = plan_and_generate_changes(plan, str(tmp_path))
-    assert len(result) == 1
-    assert result[0].new_content == "fuzzy patched content"
-    mock_patch_text.assert_called_once_with("original content", diff_block["code"])
-
-@patch("contextforge.core.patch_text")
-@patch("contextforge.core.patch_fromstring")
-def test_diff_patch_standard_returns_false_fuzzy_succeeds(mock_fromstring, mock_patch_text, tmp_path):
-    file_path = tmp_path / "test.txt"
-    file_path.write_text("original content")
-    diff_block = {
-        "code": "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1 @@\n-original content\n+new content",
-        "block_id": 0
-    }
-    plan = [{"metadata": {"file_path": "test.txt", "change_type": "diff"}, "block": diff_block}]
-    mock_patch_set = MagicMock()
-    mock_patch_set.apply.return_value = False
-    mock_fromstring.return_value = mock_patch_set
-    mock_patch_text.return_value = "fuzzy patched content"
-
-    result = plan_and_generate_changes(plan, str(tmp_path))
-    assert len(result) == 1
-    assert result[0].new_content == "fuzzy patched content"
-    mock_patch_text.assert_called_once_with("original content", diff_block["code"])
-
-@patch("contextforge.core.patch_text")
-@patch("contextforge.core.patch_fromstring")
-def test_diff_patch_both_fail(mock_fromstring, mock_patch_text, tmp_path, caplog):
-    file_path = tmp_path / "test.txt"
-    file_path.write_text("original content")
-    diff_block = {
-        "code": "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1 @@\n-original content\n+new content",
-        "block_id": 0
-    }
-    plan = [{"metadata": {"file_path": "test.txt", "change_type": "diff"}, "block": diff_block}]
-    mock_fromstring.side_effect = ValueError("standard patch failed")
-    mock_patch_text.side_effect = PatchFailedError("fuzzy patch failed")
-
-    with caplog.at_level(logging.ERROR):
-        result = plan_and_generate_changes(plan, str(tmp_path))
-        assert len(result) == 0
-        assert "ERROR: Fuzzy patch failed" in caplog.text
-
-@patch("contextforge.core.patch_text")
-@patch("contextforge.core.patch_fromstring")
-def test_diff_patch_bytes_decode_fails_fuzzy_succeeds(mock_fromstring, mock_patch_text, tmp_path, caplog):
-    file_path = tmp_path / "test.txt"
-    file_path.write_text("original content")
-    diff_block = {
-        "code": "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1 @@\n-original content\n+new content",
-        "block_id": 0
-    }
-    plan = [{"metadata": {"file_path": "test.txt", "change_type": "diff"}, "block": diff_block}]
-    mock_patch_set_bad_bytes = MagicMock()
-    mock_patch_set_bad_bytes.apply.return_value = b"\xff\xfe"
-    mock_fromstring.return_value = mock_patch_set_bad_bytes
-    mock_patch_text.return_value = "fuzzy patched content"
+    def failing_open(*args, **kwargs):
+        raise IOError("Read failed")
+
+    # Shadow open() in contextforge.core only, leaving pytest's own file I/O alone
+    monkeypatch.setattr("contextforge.core.open", failing_open, raising=False)
+    with caplog.at_level(logging.WARNING):
+        result = plan_and_generate_changes(planned_changes, str(seeded_dir))
+        assert "WARNING: Could not read original file" in caplog.text
+        # It should proceed as if the file was empty
+        assert result[0].original_content == ""
+        assert result[0].new_content == "new content"
+
+
+_DIFF_PATCH_CODE = "--- a/test.txt\n+++ b/test.txt\n@@ -1 +1 @@\n-original content\n+new content"
+
+# (standard apply() result, standard error, fuzzy result, fuzzy error, expected content, log text)
+_DIFF_PATCH_TIERS = [
+    pytest.param(
+        b"successfully patched content", None, None, None, "successfully patched content", None,
+        id="standard_ok",
+    ),
+    pytest.param(
+        None, ValueError("standard patch failed"), "fuzzy patched content", None,
+        "fuzzy patched content", None,
+        id="standard_raises_fuzzy_ok",
+    ),
+    pytest.param(
+        False, None, "fuzzy patched content", None, "fuzzy patched content", None,
+        id="standard_false_fuzzy_ok",
+    ),
+    pytest.param(
+        None, ValueError("standard patch failed"), None, PatchFailedError("fuzzy patch failed"),
+        None, "ERROR: Fuzzy patch failed",
+        id="both_fail",
+    ),
+    pytest.param(
+        b"\xff\xfe", None, "fuzzy patched content", None, "fuzzy patched content", None,
+        id="bad_bytes_fuzzy_ok",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "apply_result, standard_error, fuzzy_result, fuzzy_error, expected_content, expected_log",
+    _DIFF_PATCH_TIERS,
+)
+def test_diff_patch_tiers(
+    apply_result,
+    standard_error,
+    fuzzy_result,
+    fuzzy_error,
+    expected_content,
+    expected_log,
+    seeded_dir,
+    caplog,
+    monkeypatch,
+):
+    """Standard patch first; fuzzy patch_text only when it raises, returns False or bad bytes."""
+    mock_fromstring = MagicMock()
+    mock_patch_text = MagicMock()
+    monkeypatch.setattr("contextforge.core.patch_fromstring", mock_fromstring)
+    monkeypatch.setattr("contextforge.core.patch_text", mock_patch_text)
+    plan = [
+        {
+            "metadata": {"file_path": "test.txt", "change_type": "diff"},
+            "block": {"code": _DIFF_PATCH_CODE, "block_id": 0},
+        }
+    ]
+    if standard_error is not None:
+        mock_fromstring.side_effect = standard_error
+    else:
+        mock_fromstring.return_value.apply.return_value = apply_result
+    if fuzzy_error is not None:
+        mock_patch_text.side_effect = fuzzy_error
+    else:
+        mock_patch_text.return_value = fuzzy_result
 
     with caplog.at_level(logging.DEBUG):
-        result = plan_and_generate_changes(plan, str(tmp_path))
+        result = plan_and_generate_changes(plan, str(seeded_dir))
+
+    if expected_content is None:
+        assert result == []
+    else:
         assert len(result) == 1
-        assert result[0].new_content == "fuzzy patched content"
-        mock_patch_text.assert_called_once_with("original content", diff_block["code"])
+        assert result[0].new_content == expected_content
+    if fuzzy_result is None and fuzzy_error is None:
+        assert not mock_patch_text.called
+    else:
+        mock_patch_text.assert_called_once_with("original content", _DIFF_PATCH_CODE)
+    if expected_log:
+        assert expected_log in caplog.text
 
 
 def test_plan_and_generate_changes_unknown_change_type(tmp_path, caplog):
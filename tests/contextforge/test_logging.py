@@ -1,6 +1,6 @@
 import logging
 
-from contextforge._logging import NoopLogger, resolve_logger
+from contextforge._logging import NoopLogger, debug_enabled, resolve_logger
 
 
 def test_resolve_logger_default_noop():
@@ -24,4 +24,19 @@ def test_resolve_logger_uses_passed_logger(caplog):
         custom = logging.getLogger("x")
         lg = resolve_logger(logger=custom)
         lg.debug("from custom")
-    assert any("from custom" in rec.message for rec in caplog.records)
\ No newline at end of file
+    assert any("from custom" in rec.message for rec in caplog.records)
+
+
+def test_debug_enabled():
+    assert not debug_enabled(resolve_logger())
+    lg = logging.getLogger("contextforge.test.debug_enabled")
+    lg.setLevel(logging.INFO)
+    assert not debug_enabled(lg)
+    lg.setLevel(logging.DEBUG)
+    assert debug_enabled(lg)
+
+    class DuckLogger:
+        def debug(self, *args, **kwargs):
+            pass
+
+    assert debug_enabled(DuckLogger())
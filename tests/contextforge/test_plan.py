@@ -73,4 +73,36 @@ def test_plan_changes_forces_replacement_for_new_files(tmp_path):
     plans = plan_changes(blocks, str(tmp_path), classifier_callback=mock_cb)
     
     assert plans[0]["metadata"]["change_type"] == "full_replacement"
-    assert plans[0]["metadata"]["file_path"] == "missing.py"
\ No newline at end of file
+    assert plans[0]["metadata"]["file_path"] == "missing.py"
+
+
+def test_plan_changes_resolves_each_path_once(tmp_path, monkeypatch):
+    """Repeated blocks for one bare filename share a single resolution and replay its logs."""
+    import contextforge.plan as plan_mod
+
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "deep.py").touch()
+    calls = []
+    real_resolve = plan_mod.resolve_filename
+
+    def counting_resolve(path, root):
+        calls.append(path)
+        return real_resolve(path, root)
+
+    monkeypatch.setattr(plan_mod, "resolve_filename", counting_resolve)
+    blocks = [
+        {
+            "is_pre_classified": True,
+            "pre_classification": {"file_path": "deep.py", "change_type": "diff"},
+            "code": "content",
+        }
+        for _ in range(3)
+    ]
+    messages = []
+
+    plans = plan_changes(blocks, str(tmp_path), log_callback=messages.append)
+
+    assert calls == ["deep.py"]
+    assert [p["metadata"]["file_path"] for p in plans] == ["src/deep.py"] * 3
+    assert [p["metadata"]["change_type"] for p in plans] == ["diff"] * 3
+    assert sum("Found unique match" in m for m in messages) == 3
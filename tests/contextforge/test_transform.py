@@ -83,3 +83,28 @@ def test_apply_change_smartly_unknown_change_type(tmp_path):
     result, logs = apply_change_smartly(plan, str(tmp_path))
     assert result is None
     assert any("Unknown change type" in l for l in logs)
+
+
+def test_apply_change_smartly_is_new_tracks_original_read(tmp_path):
+    """is_new follows the read attempt: missing paths are new, unreadable ones are not."""
+    def plan_for(path):
+        return {
+            "metadata": {"file_path": path, "change_type": "full_replacement"},
+            "block": {"code": "x", "block_id": 1},
+        }
+
+    (tmp_path / "file.txt").write_text("old")
+    (tmp_path / "adir").mkdir()
+
+    result, _ = apply_change_smartly(plan_for("file.txt"), str(tmp_path))
+    assert result["is_new"] is False and result["original_content"] == "old"
+
+    result, logs = apply_change_smartly(plan_for("missing/new.txt"), str(tmp_path))
+    assert result["is_new"] is True and not any("WARNING" in msg for msg in logs)
+
+    result, _ = apply_change_smartly(plan_for("file.txt/child.txt"), str(tmp_path))
+    assert result["is_new"] is True
+
+    result, logs = apply_change_smartly(plan_for("adir"), str(tmp_path))
+    assert result["is_new"] is False
+    assert any("Could not read original file" in msg for msg in logs)